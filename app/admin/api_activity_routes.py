@@ -0,0 +1,22 @@
+# Arquivo: app/admin/api_activity_routes.py
+
+from flask import jsonify, request
+from app.utils import get_db_connection, admin_required
+from app import commission_store
+from .routes import admin_bp
+
+@admin_bp.route('/api/activity', methods=['GET'])
+@admin_required
+def get_activity_feed():
+    """Feed de atividade de todas as comissões, do mais recente ao mais antigo (?before=<id>, ?limit=)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        page = commission_store.list_activity(
+            conn, cursor,
+            before=request.args.get('before', type=int), limit=request.args.get('limit', type=int)
+        )
+        return jsonify(page)
+    finally:
+        cursor.close()
+        conn.close()
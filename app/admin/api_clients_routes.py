@@ -4,6 +4,10 @@ import os
 from flask import request, jsonify, session
 from werkzeug.security import generate_password_hash
 from app.utils import get_db_connection, admin_required
+from app.versioned_cache import bump_version
+from app.page_cache import PUBLIC_CONTENT_VERSION_KEY
+from app import commission_sync, notification_counters, notification_history
+from app.realtime import emit_unread_count
 from .routes import admin_bp
 
 @admin_bp.route('/api/clients', methods=['GET'])
@@ -100,6 +104,8 @@ def manage_single_client(client_id):
             query = f"UPDATE users SET {', '.join(updates)} WHERE id = {placeholder}"
             
             cursor.execute(query, tuple(params))
+            # O nome aparece nos créditos da galeria pública.
+            bump_version(conn, cursor, PUBLIC_CONTENT_VERSION_KEY)
             conn.commit()
             
             return jsonify({'success': True, 'message': 'Dados do cliente atualizados com sucesso.'})
@@ -118,15 +124,18 @@ def manage_single_client(client_id):
 
         try:
             # Anula a referência do cliente nas comissões para manter o histórico financeiro
+            commission_sync.touch_client_commissions(conn, cursor, client_id)
             cursor.execute(f"UPDATE comissoes SET client_id = NULL WHERE client_id = {placeholder}", (client_id,))
             # Exclui notificações associadas
             cursor.execute(f"DELETE FROM notifications WHERE user_id = {placeholder}", (client_id,))
+            notification_counters.forget(conn, cursor, client_id)
             # Exclui dados de plugins associados
             cursor.execute(f"DELETE FROM plugin_data WHERE user_id = {placeholder}", (client_id,))
             # Exclui os serviços do artista (se for um)
             cursor.execute(f"DELETE FROM artist_services WHERE artist_id = {placeholder}", (client_id,))
             # Finalmente, exclui o usuário
             cursor.execute(f"DELETE FROM users WHERE id = {placeholder}", (client_id,))
+            bump_version(conn, cursor, PUBLIC_CONTENT_VERSION_KEY)
             
             conn.commit()
             return jsonify({'success': True, 'message': 'Cliente excluído com sucesso.'})
@@ -154,6 +163,7 @@ def toggle_admin_status(client_id):
         # Usar 'NOT is_admin' é compatível com booleanos no PostgreSQL
         query = f'UPDATE users SET is_admin = NOT is_admin WHERE id = {placeholder}'
         cursor.execute(query, (client_id,))
+        bump_version(conn, cursor, PUBLIC_CONTENT_VERSION_KEY)
         conn.commit()
         
         cursor.execute(f'SELECT is_admin FROM users WHERE id = {placeholder}', (client_id,))
@@ -219,8 +229,7 @@ def update_client_prefs(client_id):
 def get_unread_count():
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(id) as count FROM notifications WHERE is_read = 0 AND user_id IS NULL')
-    count = cursor.fetchone()['count']
+    count = notification_counters.unread_count(conn, cursor, None)
     cursor.close()
     conn.close()
     return jsonify({'count': count})
@@ -228,13 +237,15 @@ def get_unread_count():
 @admin_bp.route('/api/notifications', methods=['GET'])
 @admin_required
 def get_all_notifications():
+    """Notificações do painel, mais recentes primeiro (?before=<id>, ?limit=)."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM notifications WHERE user_id IS NULL ORDER BY timestamp DESC LIMIT 20')
-    notifications = cursor.fetchall()
+    page = notification_history.notifications_page(
+        conn, cursor, None, before=request.args.get('before', type=int), limit=request.args.get('limit', type=int)
+    )
     cursor.close()
     conn.close()
-    return jsonify([dict(row) for row in notifications])
+    return jsonify(page)
 
 @admin_bp.route('/api/notifications/mark_read', methods=['POST'])
 @admin_required
@@ -242,10 +253,13 @@ def mark_notifications_as_read():
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('UPDATE notifications SET is_read = 1 WHERE is_read = 0 AND user_id IS NULL')
+    notification_counters.decrement(conn, cursor, None, cursor.rowcount)
     conn.commit()
+    count = notification_counters.unread_count(conn, cursor, None)
     cursor.close()
     conn.close()
-    return jsonify({'success': True})
+    emit_unread_count(None)
+    return jsonify({'success': True, 'unread_count': count})
 
 @admin_bp.route('/api/artists', methods=['GET'])
 @admin_required
@@ -1,56 +1,119 @@
 # --- Código do arquivo modificado: app/admin/api_comissoes_routes.py ---
 
 import json
-import time
 import os
 from datetime import datetime
 from flask import request, jsonify, session
-from app import socketio
-from app.utils import get_db_connection, add_event_to_log, admin_required, add_notification, translate_status
+from app.realtime import emit_commission_updated
+from app.utils import get_db_connection, add_event_to_log, admin_required, add_notification, translate_status, parse_date_field
+from app.queries import Query
+from app import commission_store, commission_sync, revenue_rollup
+from app.commission_ids import new_commission_id
+from app.commission_list import list_commissions, commissions_summary, InvalidListQuery
+from app.settings_cache import get_settings
 
 from .routes import admin_bp
 
+# 'comments', 'preview' e 'event_log' vêm das tabelas filhas (commission_store), não do JSON da linha.
+JSON_FIELDS = ['reference_files', 'phases', 'assigned_artist_ids']
+
+COMISSAO_BY_ID = Query('SELECT * FROM comissoes WHERE id = ?', name='comissao_by_id', prepare=True)
+COMISSAO_CLIENT_ID = Query('SELECT client_id FROM comissoes WHERE id = ?', name='comissao_client_id', prepare=True)
+COMISSAO_INSERT = Query(
+    'INSERT INTO comissoes (id, client, type, date, deadline, price, status, description, preview, comments, reference_files, phases, current_phase_index, revisions_used, event_log, payment_status) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+COMISSAO_DELETE = Query('DELETE FROM comissoes WHERE id = ?')
+COMISSAO_SET_STATUS = Query('UPDATE comissoes SET status = ? WHERE id = ?', name='comissao_set_status', prepare=True)
+COMISSAO_UPDATE = Query('UPDATE comissoes SET client = ?, type = ?, price = ?, deadline = ?, description = ? WHERE id = ?')
+COMISSAO_PHASE_SELECT = Query('SELECT phases, current_phase_index, client_id, status FROM comissoes WHERE id = ?')
+COMISSAO_PREVIEW_UPDATE = Query('UPDATE comissoes SET current_preview = ?, status = ? WHERE id = ?')
+COMISSAO_CONFIRM_PAYMENT = Query("UPDATE comissoes SET payment_status = 'paid', status = 'in_progress' WHERE id = ?")
+
+def decode_comissao(row):
+    comissao = dict(row)
+    for key in JSON_FIELDS:
+        comissao[key] = json.loads(comissao[key]) if (comissao[key] and comissao[key] != '[]') else []
+    return comissao
+
 @admin_bp.route('/api/comissoes', methods=['GET'])
 @admin_required
 def get_comissoes():
+    """
+    Lista paginada por cursor, com filtros e projeção de colunas feitos no banco
+    (ver commission_list). Sem 'fields', devolve só as colunas de resumo.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM comissoes ORDER BY date DESC')
-    comissoes_db = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    
-    comissoes_lista = [dict(row) for row in comissoes_db]
-    for comissao in comissoes_lista:
-        for key in ['comments', 'reference_files', 'preview', 'phases', 'event_log', 'assigned_artist_ids']:
-            comissao[key] = json.loads(comissao[key]) if (comissao[key] and comissao[key] != '[]') else []
-    return jsonify(comissoes_lista)
+    try:
+        return jsonify(list_commissions(conn, cursor, request.args))
+    except InvalidListQuery as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/api/comissoes/summary', methods=['GET'])
+@admin_required
+def get_comissoes_summary():
+    """Totais para os cards do dashboard (contagem por status e receita do mês)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        return jsonify(commissions_summary(conn, cursor))
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/api/comissoes/changes', methods=['GET'])
+@admin_required
+def get_comissoes_changes():
+    """
+    Comissões alteradas/excluídas desde ?since=<cursor> (ver commission_sync).
+    Sem 'since', devolve só o cursor atual, para o painel começar a sincronizar.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        since = request.args.get('since')
+        if since is None or since == '':
+            return jsonify({'changed': [], 'deleted': [], 'cursor': commission_sync.current_cursor(conn, cursor), 'has_more': False})
+        changes = commission_sync.changes_since(
+            conn, cursor, since, limit=request.args.get('limit', type=int), fields=request.args.get('fields')
+        )
+        return jsonify(changes)
+    except InvalidListQuery as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Cursor inválido.'}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
 @admin_bp.route('/api/comissoes', methods=['POST'])
 @admin_required
 def create_comissao():
     data = request.get_json()
-    new_id = f"ART-{int(time.time())}"
+    new_id = new_commission_id()
     today = datetime.now().strftime('%Y-%m-%d')
+    try:
+        deadline = parse_date_field(data.get('deadline'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Prazo inválido (use AAAA-MM-DD).'}), 400
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
 
     try:
-        cursor.execute("SELECT value FROM settings WHERE key = 'default_phases'")
-        default_phases_str = cursor.fetchone()
-        default_phases = json.loads(default_phases_str['value']) if default_phases_str else []
+        default_phases = get_settings(conn)['default_phases']
         
-        initial_event = [{"timestamp": datetime.now().isoformat(), "actor": "Artista", "message": "Pedido criado manualmente."}]
-        
-        query = f'INSERT INTO comissoes (id, client, type, date, deadline, price, status, description, preview, comments, reference_files, phases, current_phase_index, revisions_used, event_log, payment_status) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder})'
-        cursor.execute(query, (new_id, data['client'], data['type'], today, data['deadline'], data['price'], 'pending_payment', data.get('description', ''), '[]', '[]', '[]', json.dumps(default_phases), 0, 0, json.dumps(initial_event), 'unpaid'))
+        COMISSAO_INSERT.execute(conn, cursor, (new_id, data['client'], data['type'], today, deadline, data['price'], 'pending_payment', data.get('description', ''), '[]', '[]', '[]', json.dumps(default_phases), 0, 0, '[]', 'unpaid'))
+        commission_sync.touch(conn, cursor, new_id)
+        add_event_to_log(conn, new_id, "Artista", "Pedido criado manualmente.")
+        add_notification(f"Nova comissão #{new_id} para {data['client']} foi criada.", conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': new_id})
-        add_notification(f"Nova comissão #{new_id} para {data['client']} foi criada.")
+        emit_commission_updated(new_id)
         return jsonify({'success': True, 'message': 'Comissão criada com sucesso', 'id': new_id})
     except Exception as e:
         conn.rollback()
@@ -64,45 +127,90 @@ def create_comissao():
 def get_single_comissao(comissao_id):
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
-    
-    query = f'SELECT * FROM comissoes WHERE id = {placeholder}'
-    cursor.execute(query, (comissao_id,))
-    comissao = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    comissao = COMISSAO_BY_ID.execute(conn, cursor, (comissao_id,)).fetchone()
     
     if comissao is None:
+        cursor.close()
+        conn.close()
         return jsonify({'error': 'Comissão não encontrada'}), 404
     
-    comissao_dict = dict(comissao)
-    for key in ['comments', 'reference_files', 'preview', 'phases', 'event_log', 'assigned_artist_ids']:
-        comissao_dict[key] = json.loads(comissao_dict[key]) if (comissao_dict[key] and comissao_dict[key] != '[]') else []
+    comissao_dict = decode_comissao(comissao)
+    commission_store.attach_threads(conn, cursor, [comissao_dict])
+    cursor.close()
+    conn.close()
     return jsonify(comissao_dict)
 
+@admin_bp.route('/api/comissoes/<string:comissao_id>/comments', methods=['GET'])
+@admin_required
+def get_comissao_comments(comissao_id):
+    """Comentários da comissão paginados por id (?before=, ?after=, ?limit=)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        page = commission_store.list_comments(
+            conn, cursor, comissao_id,
+            before=request.args.get('before', type=int), after=request.args.get('after', type=int),
+            limit=request.args.get('limit', type=int)
+        )
+        return jsonify(page)
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/api/comissoes/<string:comissao_id>/events', methods=['GET'])
+@admin_required
+def get_comissao_events(comissao_id):
+    """Linha do tempo da comissão paginada por id (?before=, ?after=, ?limit=)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        page = commission_store.list_events(
+            conn, cursor, comissao_id,
+            before=request.args.get('before', type=int), after=request.args.get('after', type=int),
+            limit=request.args.get('limit', type=int)
+        )
+        return jsonify(page)
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/api/comissoes/<string:comissao_id>/previews', methods=['GET'])
+@admin_required
+def get_comissao_previews(comissao_id):
+    """Prévias da comissão paginadas por id (?before=, ?after=, ?limit=)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        page = commission_store.list_previews(
+            conn, cursor, comissao_id,
+            before=request.args.get('before', type=int), after=request.args.get('after', type=int),
+            limit=request.args.get('limit', type=int)
+        )
+        return jsonify(page)
+    finally:
+        cursor.close()
+        conn.close()
+
 @admin_bp.route('/api/comissoes/<string:comissao_id>', methods=['DELETE'])
 @admin_required
 def delete_comissao(comissao_id):
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        query_select = f'SELECT client_id FROM comissoes WHERE id = {placeholder}'
-        cursor.execute(query_select, (comissao_id,))
-        comissao = cursor.fetchone()
+        comissao = COMISSAO_CLIENT_ID.execute(conn, cursor, (comissao_id,)).fetchone()
         client_id = comissao['client_id'] if comissao else None
 
-        query_delete = f'DELETE FROM comissoes WHERE id = {placeholder}'
-        cursor.execute(query_delete, (comissao_id,))
+        COMISSAO_DELETE.execute(conn, cursor, (comissao_id,))
+        commission_store.delete_threads(conn, cursor, comissao_id)
+        commission_sync.mark_deleted(conn, cursor, comissao_id)
+        revenue_rollup.refresh(conn, cursor, comissao_id)
+        add_notification(f"A comissão #{comissao_id} foi excluída.", conn=conn)
+        if client_id:
+            add_notification(f"Sua comissão #{comissao_id} foi removida pelo artista.", commission_id=comissao_id, user_id=client_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': comissao_id, 'deleted': True})
-        add_notification(f"A comissão #{comissao_id} foi excluída.")
-        if client_id:
-            add_notification(f"Sua comissão #{comissao_id} foi removida pelo artista.", commission_id=comissao_id, user_id=client_id)
+        emit_commission_updated(comissao_id, deleted=True, client_id=client_id)
         
         return jsonify({'success': True, 'message': 'Comissão excluída com sucesso'})
     except Exception as e:
@@ -119,24 +227,23 @@ def update_comissao_status(comissao_id):
     novo_status = data.get('status')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        cursor.execute(f'SELECT client_id FROM comissoes WHERE id = {placeholder}', (comissao_id,))
-        comissao = cursor.fetchone()
+        comissao = COMISSAO_CLIENT_ID.execute(conn, cursor, (comissao_id,)).fetchone()
         client_id = comissao['client_id'] if comissao else None
 
-        cursor.execute(f'UPDATE comissoes SET status = {placeholder} WHERE id = {placeholder}', (novo_status, comissao_id))
+        COMISSAO_SET_STATUS.execute(conn, cursor, (novo_status, comissao_id))
+        commission_sync.touch(conn, cursor, comissao_id)
+        revenue_rollup.refresh(conn, cursor, comissao_id)
         
         status_traduzido = translate_status(novo_status)
         add_event_to_log(conn, comissao_id, "Artista", f"Alterou o status para '{status_traduzido}'.")
+        add_notification(f"O status da comissão #{comissao_id} foi alterado para '{status_traduzido}'.", conn=conn)
+        if client_id:
+            add_notification(f"O status do seu pedido #{comissao_id} foi atualizado para '{status_traduzido}'.", commission_id=comissao_id, user_id=client_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': comissao_id})
-        add_notification(f"O status da comissão #{comissao_id} foi alterado para '{status_traduzido}'.")
-        if client_id:
-            add_notification(f"O status do seu pedido #{comissao_id} foi atualizado para '{status_traduzido}'.", commission_id=comissao_id, user_id=client_id)
+        emit_commission_updated(comissao_id)
         
         return jsonify({'success': True, 'message': 'Status atualizado com sucesso'})
     except Exception as e:
@@ -150,25 +257,27 @@ def update_comissao_status(comissao_id):
 @admin_required
 def update_comissao(comissao_id):
     data = request.get_json()
+    try:
+        deadline = parse_date_field(data.get('deadline'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Prazo inválido (use AAAA-MM-DD).'}), 400
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        cursor.execute(f'SELECT client_id FROM comissoes WHERE id = {placeholder}', (comissao_id,))
-        comissao = cursor.fetchone()
+        comissao = COMISSAO_CLIENT_ID.execute(conn, cursor, (comissao_id,)).fetchone()
         client_id = comissao['client_id'] if comissao else None
 
-        query_update = f'UPDATE comissoes SET client = {placeholder}, type = {placeholder}, price = {placeholder}, deadline = {placeholder}, description = {placeholder} WHERE id = {placeholder}'
-        cursor.execute(query_update, (data['client'], data['type'], data['price'], data['deadline'], data['description'], comissao_id))
+        COMISSAO_UPDATE.execute(conn, cursor, (data['client'], data['type'], data['price'], deadline, data['description'], comissao_id))
+        commission_sync.touch(conn, cursor, comissao_id)
+        revenue_rollup.refresh(conn, cursor, comissao_id)
         add_event_to_log(conn, comissao_id, "Artista", "Editou os detalhes gerais do pedido.")
+        add_notification(f"Os dados da comissão #{comissao_id} foram atualizados.", conn=conn)
+        if client_id:
+            add_notification(f"Os detalhes do seu pedido #{comissao_id} foram atualizados pelo artista.", commission_id=comissao_id, user_id=client_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': comissao_id})
-        add_notification(f"Os dados da comissão #{comissao_id} foram atualizados.")
-        if client_id:
-            add_notification(f"Os detalhes do seu pedido #{comissao_id} foram atualizados pelo artista.", commission_id=comissao_id, user_id=client_id)
+        emit_commission_updated(comissao_id)
         
         return jsonify({'success': True, 'message': 'Comissão atualizada com sucesso'})
     except Exception as e:
@@ -184,26 +293,19 @@ def admin_add_comment(comissao_id):
     data = request.get_json()
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        cursor.execute(f'SELECT comments, client_id FROM comissoes WHERE id = {placeholder}', (comissao_id,))
-        order = cursor.fetchone()
+        order = COMISSAO_CLIENT_ID.execute(conn, cursor, (comissao_id,)).fetchone()
         client_id = order['client_id'] if order else None
         
-        comments = json.loads(order['comments']) if order and order['comments'] else []
-        new_comment = {"author": "Artista", "is_artist": True, "date": datetime.now().isoformat(), "text": data.get('text')}
-        comments.append(new_comment)
-        
-        cursor.execute(f'UPDATE comissoes SET comments = {placeholder} WHERE id = {placeholder}', (json.dumps(comments), comissao_id))
+        new_comment = commission_store.add_comment(conn, cursor, comissao_id, "Artista", True, data.get('text'))
         add_event_to_log(conn, comissao_id, "Artista", "Adicionou um novo comentário.")
+        add_notification(f"Você respondeu ao pedido #{comissao_id}", comissao_id, conn=conn)
+        if client_id:
+            add_notification(f"O artista enviou uma nova mensagem no pedido #{comissao_id}.", commission_id=comissao_id, user_id=client_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': comissao_id})
-        add_notification(f"Você respondeu ao pedido #{comissao_id}", comissao_id)
-        if client_id:
-            add_notification(f"O artista enviou uma nova mensagem no pedido #{comissao_id}.", commission_id=comissao_id, user_id=client_id)
+        emit_commission_updated(comissao_id)
             
         return jsonify({'success': True, 'comment': new_comment})
     except Exception as e:
@@ -219,31 +321,29 @@ def add_preview(comissao_id):
     data = request.get_json()
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        query_select = f'SELECT preview, phases, current_phase_index, client_id FROM comissoes WHERE id = {placeholder}'
-        cursor.execute(query_select, (comissao_id,))
-        order = cursor.fetchone()
-        client_id = order['client_id'] if order else None
-        
-        previews = json.loads(order['preview']) if order['preview'] else []
-        new_preview = {"version": f"{len(previews) + 1}.0", "date": datetime.now().isoformat(), "url": data.get('url'), "comment": data.get('comment', '')}
-        previews.append(new_preview)
+        order = COMISSAO_PHASE_SELECT.execute(conn, cursor, (comissao_id,)).fetchone()
+        if not order:
+            return jsonify({'success': False, 'message': 'Comissão não encontrada.'}), 404
+        if order['status'] in ('completed', 'cancelled'):
+            return jsonify({'success': False, 'message': 'Não é possível enviar prévias para uma comissão concluída ou cancelada.'}), 400
+        client_id = order['client_id']
         
-        query_update = f'UPDATE comissoes SET preview = {placeholder}, current_preview = {placeholder}, status = {placeholder} WHERE id = {placeholder}'
-        cursor.execute(query_update, (json.dumps(previews), len(previews) - 1, 'waiting_approval', comissao_id))
+        new_preview, preview_index = commission_store.add_preview(conn, cursor, comissao_id, data.get('url'), data.get('comment', ''))
+        COMISSAO_PREVIEW_UPDATE.execute(conn, cursor, (preview_index, 'waiting_approval', comissao_id))
+        commission_sync.touch(conn, cursor, comissao_id)
+        revenue_rollup.refresh(conn, cursor, comissao_id)
         
         phases = json.loads(order['phases'])
         current_phase_name = phases[order['current_phase_index']]['name']
         add_event_to_log(conn, comissao_id, "Artista", f"Enviou uma prévia para a fase '{current_phase_name}'.")
+        add_notification(f"Nova pré-visualização adicionada ao pedido #{comissao_id}", comissao_id, conn=conn)
+        if client_id:
+            add_notification(f"Uma nova pré-visualização foi enviada para o seu pedido #{comissao_id}.", commission_id=comissao_id, user_id=client_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': comissao_id})
-        add_notification(f"Nova pré-visualização adicionada ao pedido #{comissao_id}", comissao_id)
-        if client_id:
-            add_notification(f"Uma nova pré-visualização foi enviada para o seu pedido #{comissao_id}.", commission_id=comissao_id, user_id=client_id)
+        emit_commission_updated(comissao_id)
         
         return jsonify({'success': True, 'preview': new_preview})
     except Exception as e:
@@ -258,24 +358,22 @@ def add_preview(comissao_id):
 def admin_confirm_payment(comissao_id):
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        cursor.execute(f'SELECT client_id FROM comissoes WHERE id = {placeholder}', (comissao_id,))
-        comissao = cursor.fetchone()
+        comissao = COMISSAO_CLIENT_ID.execute(conn, cursor, (comissao_id,)).fetchone()
         client_id = comissao['client_id'] if comissao else None
 
-        query_update = f"UPDATE comissoes SET payment_status = 'paid', status = 'in_progress' WHERE id = {placeholder}"
-        cursor.execute(query_update, (comissao_id,))
+        COMISSAO_CONFIRM_PAYMENT.execute(conn, cursor, (comissao_id,))
+        commission_sync.touch(conn, cursor, comissao_id)
+        revenue_rollup.refresh(conn, cursor, comissao_id)
         add_event_to_log(conn, comissao_id, "Artista", "Pagamento confirmado.")
         add_event_to_log(conn, comissao_id, "Sistema", "Status do pedido alterado para 'Em Progresso'.")
+        add_notification(f"O pagamento do pedido #{comissao_id} foi confirmado! O trabalho foi iniciado.", comissao_id, conn=conn)
+        if client_id:
+            add_notification(f"O pagamento do seu pedido #{comissao_id} foi confirmado!", commission_id=comissao_id, user_id=client_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': comissao_id})
-        add_notification(f"O pagamento do pedido #{comissao_id} foi confirmado! O trabalho foi iniciado.", comissao_id)
-        if client_id:
-            add_notification(f"O pagamento do seu pedido #{comissao_id} foi confirmado!", commission_id=comissao_id, user_id=client_id)
+        emit_commission_updated(comissao_id)
         
         return jsonify({'success': True, 'message': 'Pagamento confirmado com sucesso.'})
     except Exception as e:
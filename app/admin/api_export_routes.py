@@ -0,0 +1,31 @@
+# Arquivo: app/admin/api_export_routes.py
+
+from datetime import datetime
+from flask import Response, request, jsonify, stream_with_context
+from app.utils import get_db_connection, admin_required
+from app.exports import prepare_export, stream_export, InvalidExport, FORMATS
+from .routes import admin_bp
+
+@admin_bp.route('/api/export/<string:dataset>', methods=['GET'])
+@admin_required
+def export_dataset(dataset):
+    """
+    Exporta comissoes, transacoes, eventos ou mensagens em ?format=csv|ndjson
+    (padrão csv), com os filtros de app/exports.py. A resposta é gerada aos
+    poucos, lote a lote, enquanto as linhas são lidas do banco.
+    """
+    fmt = request.args.get('format', 'csv')
+    try:
+        columns, sql, params = prepare_export(dataset, fmt, request.args)
+    except InvalidExport as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    # stream_with_context mantém a requisição (e a conexão dela) viva até o fim do gerador.
+    conn = get_db_connection()
+    response = Response(stream_with_context(stream_export(conn, fmt, columns, sql, params)), mimetype=FORMATS[fmt])
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Sem buffer no proxy (nginx): o cliente recebe cada lote assim que é gerado.
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -3,19 +3,25 @@
 import os
 from flask import jsonify, request, session
 from app.utils import get_db_connection, admin_required
+from app.versioned_cache import bump_version
+from app.page_cache import PUBLIC_CONTENT_VERSION_KEY
+from app.gallery_store import gallery_page, InvalidCursor
 from .routes import admin_bp
 
 @admin_bp.route('/api/gallery', methods=['GET'])
 @admin_required
 def get_gallery():
+    """Mesma paginação por cursor de /api/gallery (a página do admin usa o endpoint público)."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    # Query explícita para garantir que pegamos as colunas novas
-    cursor.execute('SELECT id, title, description, image_url, created_at, lineart_artist_id, color_artist_id, is_nsfw FROM gallery ORDER BY created_at DESC')
-    arts = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify([dict(row) for row in arts])
+    try:
+        page = gallery_page(conn, cursor, after=request.args.get('cursor'), limit=request.args.get('limit', type=int))
+        return jsonify(page)
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Cursor inválido.'}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
 @admin_bp.route('/api/gallery', methods=['POST'])
 @admin_required
@@ -46,6 +52,7 @@ def add_to_gallery():
             color_artist_id, 
             data.get('is_nsfw', False)
         ))
+        bump_version(conn, cursor, PUBLIC_CONTENT_VERSION_KEY)
         conn.commit()
     except Exception as e:
         conn.rollback()
@@ -67,6 +74,7 @@ def delete_from_gallery(art_id):
     try:
         query = f'DELETE FROM gallery WHERE id = {placeholder}'
         cursor.execute(query, (art_id,))
+        bump_version(conn, cursor, PUBLIC_CONTENT_VERSION_KEY)
         conn.commit()
     except Exception as e:
         conn.rollback()
@@ -2,7 +2,7 @@
 
 import os
 from flask import jsonify, request
-from app import socketio
+from app.realtime import emit_to_admins
 from app.utils import get_db_connection, admin_required
 from .routes import admin_bp
 
@@ -55,7 +55,7 @@ def delete_contact_message(message_id):
         query = f'DELETE FROM contact_messages WHERE id = {placeholder}'
         cursor.execute(query, (message_id,))
         conn.commit()
-        socketio.emit('message_deleted', {'message_id': message_id})
+        emit_to_admins('message_deleted', {'message_id': message_id})
         return jsonify({'success': True})
     except Exception as e:
         conn.rollback()
@@ -3,6 +3,8 @@
 import json
 from flask import request, jsonify, session
 from app.utils import get_db_connection, admin_required
+from app.versioned_cache import bump_version
+from app.site_context import PUBLIC_PLUGIN_DATA_VERSION_KEY, public_plugin_data_cache
 from .routes import admin_bp
 
 # Endpoint para SALVAR/ATUALIZAR dados de um plugin
@@ -40,7 +42,12 @@ def set_plugin_data():
             """
         
         cursor.execute(query, (plugin_id, user_id, key, db_value))
+        # Chaves 'public_*' aparecem no site público (public_plugin_data dos templates).
+        if key.startswith('public_'):
+            bump_version(conn, cursor, PUBLIC_PLUGIN_DATA_VERSION_KEY)
         conn.commit()
+        if key.startswith('public_'):
+            public_plugin_data_cache.invalidate()
         return jsonify({'success': True, 'message': 'Dados salvos com sucesso.'})
 
     except Exception as e:
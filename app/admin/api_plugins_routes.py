@@ -6,6 +6,8 @@ import json
 import os
 from flask import request, jsonify
 from app.utils import get_db_connection, admin_required
+from app.versioned_cache import bump_version
+from app.site_context import PLUGINS_VERSION_KEY, active_plugins_cache
 from .routes import admin_bp
 
 def parse_plugin_code(code):
@@ -87,7 +89,9 @@ def toggle_plugin_status(plugin_id):
         # Usamos CASE para compatibilidade entre PostgreSQL (boolean) e SQLite (integer)
         query = f'UPDATE plugins SET is_active = CASE WHEN is_active = 1 THEN 0 ELSE 1 END WHERE id = {placeholder}'
         cursor.execute(query, (plugin_id,))
+        bump_version(conn, cursor, PLUGINS_VERSION_KEY)
         conn.commit()
+        active_plugins_cache.invalidate()
     except Exception as e:
         conn.rollback()
         return jsonify({'success': False, 'message': f'Erro ao alterar status: {e}'}), 500
@@ -107,7 +111,9 @@ def delete_plugin(plugin_id):
     try:
         query = f'DELETE FROM plugins WHERE id = {placeholder}'
         cursor.execute(query, (plugin_id,))
+        bump_version(conn, cursor, PLUGINS_VERSION_KEY)
         conn.commit()
+        active_plugins_cache.invalidate()
     except Exception as e:
         conn.rollback()
         return jsonify({'success': False, 'message': f'Erro ao excluir: {e}'}), 500
@@ -4,6 +4,8 @@ import json
 import os
 from flask import request, jsonify, session
 from app.utils import get_db_connection, admin_required
+from app.versioned_cache import bump_version
+from app.page_cache import PUBLIC_CONTENT_VERSION_KEY
 from .routes import admin_bp
 
 @admin_bp.route('/api/profile', methods=['GET', 'POST'])
@@ -38,6 +40,7 @@ def manage_artist_profile():
             
             query = f"UPDATE users SET {set_clauses} WHERE id = {placeholder}"
             cursor.execute(query, tuple(values))
+            bump_version(conn, cursor, PUBLIC_CONTENT_VERSION_KEY)
             conn.commit()
             
             if 'username' in profile_data:
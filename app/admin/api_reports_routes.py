@@ -1,61 +1,88 @@
 # Arquivo: app/admin/api_reports_routes.py
 
 import os
-from flask import request, jsonify
+from flask import request, jsonify, session, url_for
 from datetime import datetime
-from collections import defaultdict
 from app.utils import get_db_connection, admin_required
+from app import revenue_rollup, commission_reports, agenda
+from app.result_cache import cached_result, COMMISSIONS_TAG
 from .routes import admin_bp
 
 @admin_bp.route('/api/agenda/comissoes', methods=['GET'])
 @admin_required
+@cached_result(COMMISSIONS_TAG)
 def get_agenda_comissoes():
+    """Comissões em aberto por prazo; ?from=&to= (AAAA-MM-DD) limitam ao intervalo visível."""
     conn = get_db_connection()
-    # --- INÍCIO DA CORREÇÃO ---
     cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, client, type, deadline, status FROM comissoes WHERE status NOT IN ('completed', 'cancelled') ORDER BY deadline ASC"
-    )
-    comissoes_db = cursor.fetchall()
-    cursor.close()
-    # --- FIM DA CORREÇÃO ---
-    conn.close()
-    return jsonify([dict(row) for row in comissoes_db])
+    try:
+        return jsonify(agenda.open_commissions(conn, cursor, request.args.get('from'), request.args.get('to')))
+    except agenda.InvalidRange as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+def _feed_url(token):
+    return url_for('public.agenda_feed', token=token, _external=True) if token else None
+
+@admin_bp.route('/api/agenda/feed', methods=['GET', 'POST', 'DELETE'])
+@admin_required
+def manage_agenda_feed():
+    """
+    Endereço .ics do artista logado para assinar em aplicativos de calendário.
+    GET devolve o atual, POST gera um novo (o anterior para de funcionar), DELETE desativa.
+    """
+    user_id = session.get('user_id')
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if request.method == 'GET':
+            return jsonify({'success': True, 'url': _feed_url(agenda.feed_token(conn, cursor, user_id))})
+        if request.method == 'POST':
+            token = agenda.rotate_feed_token(conn, cursor, user_id)
+            conn.commit()
+            return jsonify({'success': True, 'message': 'Novo endereço do calendário gerado.', 'url': _feed_url(token)})
+        agenda.revoke_feed_token(conn, cursor, user_id)
+        conn.commit()
+        return jsonify({'success': True, 'message': 'Feed do calendário desativado.', 'url': None})
+    except Exception as e:
+        conn.rollback()
+        print(f"Erro ao atualizar o feed do calendário: {e}")
+        return jsonify({'success': False, 'message': 'Erro no servidor.'}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+def _periodo_financeiro():
+    hoje = datetime.now()
+    return request.args.get('inicio', f'{hoje.year}-01-01'), request.args.get('fim', hoje.strftime('%Y-%m-%d'))
 
 @admin_bp.route('/api/financeiro/dados', methods=['GET'])
 @admin_required
+@cached_result(COMMISSIONS_TAG, key=_periodo_financeiro)
 def get_dados_financeiros():
-    hoje = datetime.now()
-    inicio_req = request.args.get('inicio', f'{hoje.year}-01-01')
-    fim_req = request.args.get('fim', hoje.strftime('%Y-%m-%d'))
+    """KPIs e gráfico do período a partir do agregado mensal; só a primeira página de transações."""
+    inicio_req, fim_req = _periodo_financeiro()
     
     conn = get_db_connection()
-    # --- INÍCIO DA CORREÇÃO ---
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
-    
-    query = f"SELECT price, date FROM comissoes WHERE status = 'completed' AND date BETWEEN {placeholder} AND {placeholder}"
-    cursor.execute(query, (inicio_req, fim_req))
-    comissoes_concluidas = cursor.fetchall()
-    cursor.close()
-    # --- FIM DA CORREÇÃO ---
-    conn.close()
+    try:
+        receita_mensal = revenue_rollup.monthly_revenue(conn, cursor, inicio_req, fim_req)
+        transacoes = revenue_rollup.transactions_page(conn, cursor, inicio_req, fim_req)
+    except revenue_rollup.InvalidPeriod as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
-    total_receita = sum(c['price'] for c in comissoes_concluidas)
-    total_comissoes = len(comissoes_concluidas)
+    total_receita = round(sum(receita for receita, _ in receita_mensal.values()), 2)
+    total_comissoes = sum(quantidade for _, quantidade in receita_mensal.values())
     ticket_medio = total_receita / total_comissoes if total_comissoes > 0 else 0
-
-    transacoes = [{'date': c['date'], 'price': c['price']} for c in comissoes_concluidas]
-    
-    receita_mensal = defaultdict(float)
-    for c in comissoes_concluidas:
-        mes_ano = datetime.strptime(c['date'], '%Y-%m-%d').strftime('%Y-%m')
-        receita_mensal[mes_ano] += c['price']
     
     sorted_meses = sorted(receita_mensal.keys())
     grafico_labels = [datetime.strptime(ma, '%Y-%m').strftime('%b/%y') for ma in sorted_meses]
-    grafico_data_values = [receita_mensal[ma] for ma in sorted_meses]
+    grafico_data_values = [round(receita_mensal[ma][0], 2) for ma in sorted_meses]
 
     return jsonify({
         'kpis': {
@@ -63,67 +90,49 @@ def get_dados_financeiros():
             'total_comissoes': total_comissoes,
             'ticket_medio': ticket_medio
         },
-        'transacoes': transacoes,
+        'transacoes': transacoes['items'],
+        'transacoes_has_more': transacoes['has_more'],
+        'transacoes_next_cursor': transacoes['next_cursor'],
         'grafico_data': {
             'labels': grafico_labels,
             'data': grafico_data_values
         }
     })
 
-
-@admin_bp.route('/api/relatorios/dados', methods=['GET'])
+@admin_bp.route('/api/financeiro/transacoes', methods=['GET'])
 @admin_required
-def get_relatorios_dados():
-    year = request.args.get('ano', str(datetime.now().year))
+def get_transacoes_financeiras():
+    """Transações (comissões concluídas) do período, paginadas por cursor (?cursor=, ?limit=)."""
+    inicio_req, fim_req = _periodo_financeiro()
     conn = get_db_connection()
-    # --- INÍCIO DA CORREÇÃO ---
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
-    
-    # Em PostgreSQL, o operador LIKE precisa de um placeholder
-    like_pattern = f'{year}%'
-    query = f"SELECT price, client, type, date FROM comissoes WHERE status = 'completed' AND date LIKE {placeholder}"
-    cursor.execute(query, (like_pattern,))
-    comissoes_ano = cursor.fetchall()
-    cursor.close()
-    # --- FIM DA CORREÇÃO ---
-    conn.close()
+    try:
+        page = revenue_rollup.transactions_page(
+            conn, cursor, inicio_req, fim_req, after=request.args.get('cursor'), limit=request.args.get('limit', type=int)
+        )
+        return jsonify(page)
+    except revenue_rollup.InvalidPeriod as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
-    receita_anual = sum(c['price'] for c in comissoes_ano)
-    total_comissoes = len(comissoes_ano)
-    clientes_ativos = len(set(c['client'] for c in comissoes_ano))
-    ticket_medio = receita_anual / total_comissoes if total_comissoes > 0 else 0
 
-    kpis = {
-        'receita_anual': receita_anual,
-        'total_comissoes': total_comissoes,
-        'clientes_ativos': clientes_ativos,
-        'ticket_medio': ticket_medio
-    }
-
-    top_clientes_data = defaultdict(float)
-    for c in comissoes_ano:
-        top_clientes_data[c['client']] += c['price']
-    
-    sorted_clientes = sorted(top_clientes_data.items(), key=lambda item: item[1], reverse=True)
-    top_clientes = [{'client': client, 'total': total} for client, total in sorted_clientes[:5]]
-
-    receita_por_tipo = defaultdict(float)
-    for c in comissoes_ano:
-        receita_por_tipo[c['type']] += c['price']
-
-    comissoes_por_mes = {month: 0 for month in range(1, 13)}
-    for c in comissoes_ano:
-        mes = datetime.strptime(c['date'], '%Y-%m-%d').month
-        comissoes_por_mes[mes] += 1
-    
-    meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-    volume_mensal_grafico = {meses_nomes[mes-1]: count for mes, count in comissoes_por_mes.items()}
+def _ano_relatorio():
+    return request.args.get('ano', str(datetime.now().year))
 
-    return jsonify({
-        'kpis': kpis,
-        'top_clientes': top_clientes,
-        'receita_por_tipo': dict(receita_por_tipo),
-        'comissoes_por_mes': volume_mensal_grafico
-    })
\ No newline at end of file
+@admin_bp.route('/api/relatorios/dados', methods=['GET'])
+@admin_required
+@cached_result(COMMISSIONS_TAG, key=_ano_relatorio)
+def get_relatorios_dados():
+    """Relatório anual agregado no banco (ver commission_reports)."""
+    year = _ano_relatorio()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        return jsonify(commission_reports.yearly_report(conn, cursor, year))
+    except commission_reports.InvalidYear as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
\ No newline at end of file
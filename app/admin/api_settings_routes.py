@@ -1,60 +1,47 @@
 # Arquivo: app/admin/api_settings_routes.py
 
-import json
 import os
 from flask import request, jsonify, session
 from app.utils import get_db_connection, admin_required
+from app.queries import Query
+from app import settings_cache
 from .routes import admin_bp
 
+# "UPSERT" (update or insert) com a sintaxe de cada banco
+SETTING_UPSERT = Query({
+    'postgres': 'INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value',
+    'sqlite': 'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)'
+}, name='setting_upsert', prepare=True)
+
 @admin_bp.route('/api/settings', methods=['GET', 'POST'])
 @admin_required
 def manage_settings():
     conn = get_db_connection()
     # --- INÍCIO DA CORREÇÃO ---
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
 
     try:
         if request.method == 'POST':
             data = request.get_json()
             
+            # Compara com o que está no banco (não com o cache) e grava só o que mudou.
+            current = {row['key']: row['value'] for row in settings_cache.SETTINGS_ALL.execute(conn, cursor).fetchall()}
+            changed = []
             for key, value in data.items():
-                db_value = json.dumps(value) if isinstance(value, (list, dict)) else str(value)
-                
-                if is_postgres:
-                    # Sintaxe para "UPSERT" (update or insert) em PostgreSQL
-                    query = f'INSERT INTO settings (key, value) VALUES ({placeholder}, {placeholder}) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value'
-                else:
-                    # Sintaxe para "UPSERT" em SQLite
-                    query = f'INSERT OR REPLACE INTO settings (key, value) VALUES ({placeholder}, {placeholder})'
-                
-                cursor.execute(query, (key, db_value))
+                db_value = settings_cache.encode_setting(value)
+                if current.get(key) != db_value:
+                    changed.append((key, db_value))
             
-            conn.commit()
-            return jsonify({'success': True, 'message': 'Configurações salvas.'})
+            if changed:
+                SETTING_UPSERT.executemany(conn, cursor, changed)
+                settings_cache.bump_version(conn, cursor, settings_cache.SETTINGS_VERSION_KEY)
+                conn.commit()
+                settings_cache.invalidate()
+            return jsonify({'success': True, 'message': 'Configurações salvas.', 'changed': [key for key, _ in changed]})
         
         # Método GET
         else:
-            cursor.execute('SELECT key, value FROM settings')
-            settings_db = cursor.fetchall()
-            settings = {row['key']: row['value'] for row in settings_db}
-            
-            json_keys_from_settings = [
-                'social_links', 'commission_types', 'commission_extras', 
-                'default_phases', 'support_contacts'
-            ]
-
-            for key in json_keys_from_settings:
-                if key in settings and settings[key]:
-                    try:
-                        settings[key] = json.loads(settings[key])
-                    except (json.JSONDecodeError, TypeError):
-                        settings[key] = []
-                else:
-                    settings[key] = []
-                    
-            return jsonify(settings)
+            return jsonify(dict(settings_cache.get_settings(conn)))
             
     except Exception as e:
         conn.rollback()
@@ -0,0 +1,25 @@
+# Arquivo: app/admin/api_system_routes.py
+
+from flask import jsonify
+from app.utils import admin_required, get_db_pool_stats
+from app.page_cache import page_cache_stats
+from app.result_cache import result_cache_stats
+from .routes import admin_bp
+
+@admin_bp.route('/api/system/db_pool', methods=['GET'])
+@admin_required
+def get_db_pool_status():
+    """Estatísticas do pool de conexões do processo que atendeu a requisição."""
+    return jsonify(get_db_pool_stats())
+
+@admin_bp.route('/api/system/page_cache', methods=['GET'])
+@admin_required
+def get_page_cache_status():
+    """Acertos/erros do cache de páginas públicas neste processo."""
+    return jsonify(page_cache_stats())
+
+@admin_bp.route('/api/system/result_cache', methods=['GET'])
+@admin_required
+def get_result_cache_status():
+    """Acertos/erros do cache de resultados dos relatórios neste processo."""
+    return jsonify(result_cache_stats())
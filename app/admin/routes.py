@@ -26,4 +26,7 @@ from . import api_profile_routes
 
 # --- INÍCIO DA ADIÇÃO ---
 from . import api_plugin_data_routes
-# --- FIM DA ADIÇÃO ---
\ No newline at end of file
+# --- FIM DA ADIÇÃO ---
+from . import api_system_routes
+from . import api_activity_routes
+from . import api_export_routes
\ No newline at end of file
@@ -0,0 +1,141 @@
+# Arquivo: app/agenda.py
+
+import secrets
+from datetime import datetime, timedelta, timezone
+from .queries import Query
+from .exports import iter_batches
+from .utils import translate_status
+
+# Agenda de prazos: comissões em aberto (nem concluídas nem canceladas) por
+# intervalo de prazo, e o feed .ics por artista. O feed é acessado sem login
+# por aplicativos de calendário, com um token aleatório por artista guardado
+# em calendar_feeds; gerar um novo token invalida o endereço anterior.
+#
+# As consultas repetem a condição do índice parcial idx_comissoes_open_deadline
+# (migração 19), que só contém as comissões em aberto, ordenadas por prazo.
+
+OPEN_CONDITION = "status NOT IN ('completed', 'cancelled')"
+AGENDA_COLUMNS = ['id', 'client', 'type', 'deadline', 'status']
+
+FEED_TOKEN_SELECT = Query('SELECT token FROM calendar_feeds WHERE user_id = ?', name='calendar_feed_token', prepare=True)
+FEED_OWNER_SELECT = Query(
+    'SELECT u.id, u.username FROM calendar_feeds f JOIN users u ON u.id = f.user_id WHERE f.token = ?',
+    name='calendar_feed_owner', prepare=True
+)
+FEED_TOKEN_UPSERT = Query(
+    'INSERT INTO calendar_feeds (user_id, token) VALUES (?, ?) '
+    'ON CONFLICT (user_id) DO UPDATE SET token = excluded.token, created_at = CURRENT_TIMESTAMP'
+)
+FEED_TOKEN_DELETE = Query('DELETE FROM calendar_feeds WHERE user_id = ?')
+
+FEED_SQL = (
+    f"SELECT {', '.join('c.' + column for column in AGENDA_COLUMNS)} FROM comissoes c "
+    "JOIN commission_artists ca ON ca.commission_id = c.id "
+    f"WHERE ca.artist_id = ? AND c.{OPEN_CONDITION} AND c.deadline IS NOT NULL "
+    "ORDER BY c.deadline, c.id"
+)
+
+
+class InvalidRange(ValueError):
+    """Datas 'from'/'to' da agenda inválidas."""
+
+
+def _parse_day(name, value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise InvalidRange(f"Data inválida em '{name}' (use AAAA-MM-DD).")
+
+
+def open_commissions(conn, cursor, start=None, end=None):
+    """
+    Comissões em aberto ordenadas por prazo. Com 'start'/'end' (AAAA-MM-DD,
+    inclusive) só as com prazo no intervalo; sem eles, todas (inclusive sem prazo).
+    """
+    clauses, params = [OPEN_CONDITION], []
+    if start:
+        clauses.append('deadline >= ?')
+        params.append(_parse_day('from', start))
+    if end:
+        clauses.append('deadline <= ?')
+        params.append(_parse_day('to', end))
+    sql = f"SELECT {', '.join(AGENDA_COLUMNS)} FROM comissoes WHERE {' AND '.join(clauses)} ORDER BY deadline, id"
+    return [dict(row) for row in Query(sql).execute(conn, cursor, params).fetchall()]
+
+
+# --- Feed .ics ---
+def feed_token(conn, cursor, user_id):
+    row = FEED_TOKEN_SELECT.execute(conn, cursor, (user_id,)).fetchone()
+    return row['token'] if row else None
+
+
+def rotate_feed_token(conn, cursor, user_id):
+    """Gera (ou troca) o token do feed do artista; o endereço antigo deixa de funcionar."""
+    token = secrets.token_urlsafe(32)
+    FEED_TOKEN_UPSERT.execute(conn, cursor, (user_id, token))
+    return token
+
+
+def revoke_feed_token(conn, cursor, user_id):
+    FEED_TOKEN_DELETE.execute(conn, cursor, (user_id,))
+
+
+def feed_owner(conn, cursor, token):
+    """(id, nome) do artista dono do token, ou None."""
+    row = FEED_OWNER_SELECT.execute(conn, cursor, (token,)).fetchone()
+    return (row['id'], row['username']) if row else None
+
+
+def _ics_text(value):
+    """Escapa um texto para uma propriedade do iCalendar (RFC 5545, 3.3.11)."""
+    return (str(value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _ics_line(line):
+    """Quebra a linha em pedaços de até 75 bytes (continuação começa com espaço)."""
+    raw = line.encode('utf-8')
+    if len(raw) <= 75:
+        return line + '\r\n'
+    parts, current, size = [], '', 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > (75 if not parts else 74):
+            parts.append(current)
+            current, size = '', 0
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _ics_event(row, host, stamp):
+    commission_id, client, commission_type, deadline, status = row
+    day = datetime.strptime(str(deadline)[:10], '%Y-%m-%d')
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{commission_id}@{host}',
+        f'DTSTAMP:{stamp}',
+        f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}",
+        'SUMMARY:' + _ics_text(f"Prazo #{commission_id} - {client or ''} ({commission_type or ''})"),
+        'DESCRIPTION:' + _ics_text('Status: ' + translate_status(status or '')),
+        'END:VEVENT',
+    ]
+    return ''.join(_ics_line(line) for line in lines)
+
+
+def stream_feed(conn, artist_id, artist_name, host):
+    """Gerador do calendário .ics com os prazos em aberto do artista, um pedaço por lote."""
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield ''.join(_ics_line(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{host}//Agenda de prazos//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:' + _ics_text(f'Prazos - {artist_name}'),
+    ])
+    for batch in iter_batches(conn, AGENDA_COLUMNS, FEED_SQL, (artist_id,)):
+        yield ''.join(_ics_event(row, host, stamp) for row in batch)
+    yield _ics_line('END:VCALENDAR')
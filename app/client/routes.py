@@ -2,15 +2,51 @@
 
 import sqlite3
 import json
-import time
 import os
 from datetime import datetime
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
-from app import socketio
-from app.utils import get_db_connection, add_event_to_log, login_required, add_notification
+from app.realtime import emit_commission_updated, emit_commission_created, emit_unread_count
+from app.utils import get_db_connection, add_event_to_log, login_required, add_notification, parse_date_field
+from app.queries import Query
+from app.settings_cache import get_settings, get_raw_settings
+from app.commission_ids import new_commission_id
+from app import commission_store, commission_sync, notification_counters, notification_history, revenue_rollup
 
 client_bp = Blueprint('client', __name__, template_folder='../../templates')
 
+# 'comments', 'preview' e 'event_log' vêm das tabelas filhas (commission_store), não do JSON da linha.
+ORDER_JSON_FIELDS = ['reference_files', 'phases', 'assigned_artist_ids']
+MAIN_ARTIST_SOCIALS = Query('SELECT social_links FROM users WHERE is_admin = TRUE ORDER BY id ASC LIMIT 1')
+MAIN_ARTIST_ADDITIONAL_CONTACTS = Query(
+    "SELECT value FROM plugin_data WHERE user_id = (SELECT id FROM users WHERE is_admin = TRUE ORDER BY id ASC LIMIT 1) AND key = 'public_additional_contacts'"
+)
+ORDERS_BY_CLIENT = Query('SELECT * FROM comissoes WHERE client_id = ? ORDER BY date DESC', name='orders_by_client', prepare=True)
+ORDER_STATUS_BY_ID_AND_CLIENT = Query('SELECT status FROM comissoes WHERE id = ? AND client_id = ?')
+ORDER_OWNED_BY_CLIENT = Query('SELECT id FROM comissoes WHERE id = ? AND client_id = ?', name='order_owned_by_client', prepare=True)
+ORDER_PHASES_BY_ID_AND_CLIENT = Query(
+    'SELECT phases, current_phase_index, revisions_used FROM comissoes WHERE id = ? AND client_id = ?',
+    name='order_phases_by_id_and_client', prepare=True
+)
+ORDER_INSERT = Query("""
+    INSERT INTO comissoes (id, client, type, date, deadline, price, 
+    status, description, preview, comments, 
+    client_id, phases, current_phase_index, revisions_used, event_log, payment_status, assigned_artist_ids) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+""")
+ORDER_REVISION_UPDATE = Query('UPDATE comissoes SET status = ?, revisions_used = ? WHERE id = ?')
+ORDER_COMPLETE_PHASES = Query('UPDATE comissoes SET status = ?, current_phase_index = ? WHERE id = ?')
+ORDER_ADVANCE_PHASE = Query('UPDATE comissoes SET status = ?, current_phase_index = ?, revisions_used = 0 WHERE id = ?')
+ORDER_AWAITING_CONFIRMATION = Query("UPDATE comissoes SET payment_status = 'awaiting_confirmation' WHERE id = ?")
+ORDER_CANCEL = Query("UPDATE comissoes SET status = 'cancelled' WHERE id = ?")
+NOTIFICATIONS_MARK_READ = Query('UPDATE notifications SET is_read = 1 WHERE is_read = 0 AND user_id = ?')
+# Um GROUP BY só, coberto pelo índice (user_id, is_read, related_commission_id).
+UNREAD_BY_COMMISSION = Query(
+    'SELECT related_commission_id, COUNT(*) AS unread FROM notifications '
+    'WHERE user_id = ? AND is_read = 0 AND related_commission_id IS NOT NULL GROUP BY related_commission_id',
+    name='unread_by_commission', prepare=True
+)
+MAX_MARK_READ_COMMISSIONS = 500
+
 # --- Funções Auxiliares (Novas) ---
 def get_artist_names_by_ids(conn, artist_ids):
     if not artist_ids:
@@ -60,15 +96,7 @@ def ajuda_suporte():
     faqs_db = cursor.fetchall()
     faqs = [dict(row) for row in faqs_db]
     
-    cursor.execute("SELECT value FROM settings WHERE key = 'support_contacts'")
-    contacts_setting = cursor.fetchone()
-    support_contacts = []
-    
-    if contacts_setting and contacts_setting['value']:
-        try:
-            support_contacts = json.loads(contacts_setting['value'])
-        except json.JSONDecodeError:
-            support_contacts = []
+    support_contacts = get_settings(conn)['support_contacts']
 
     cursor.close()
     conn.close()
@@ -155,37 +183,25 @@ def get_artist_services(artist_id):
 def client_get_pricing():
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    keys_to_fetch = [
-        'commission_types', 'commission_extras', 'refund_policy', 'default_phases', 
-        'revision_alert_text', 'pix_key', 'paypal_email', 'payment_currency_code', 
-        'paypal_hosted_button_id', 'support_contacts', 'social_links', 'site_mode'
-    ]
-    placeholders = ','.join([placeholder] * len(keys_to_fetch))
-    query = f'SELECT key, value FROM settings WHERE key IN ({placeholders})'
-    cursor.execute(query, tuple(keys_to_fetch))
-    settings_db = cursor.fetchall()
-    settings = {row['key']: row['value'] for row in settings_db}
+    settings = get_settings(conn)
+    raw_settings = get_raw_settings(conn)
 
     final_social_links = []
     site_mode = settings.get('site_mode', 'individual')
     
     if site_mode == 'individual':
-        cursor.execute('SELECT social_links FROM users WHERE is_admin = TRUE ORDER BY id ASC LIMIT 1')
-        main_artist = cursor.fetchone()
-        links_json_str = main_artist['social_links'] if main_artist and main_artist['social_links'] else settings.get('social_links', '[]')
+        main_artist = MAIN_ARTIST_SOCIALS.execute(conn, cursor).fetchone()
+        links_json_str = main_artist['social_links'] if main_artist and main_artist['social_links'] else raw_settings.get('social_links', '[]')
     else:
-        links_json_str = settings.get('social_links', '[]')
+        links_json_str = raw_settings.get('social_links', '[]')
 
     try:
         final_social_links = json.loads(links_json_str) if links_json_str else []
     except (json.JSONDecodeError, TypeError):
         final_social_links = []
         
-    cursor.execute(f"SELECT value FROM plugin_data WHERE user_id = (SELECT id FROM users WHERE is_admin = TRUE ORDER BY id ASC LIMIT 1) AND key = 'public_additional_contacts'")
-    plugin_data_row = cursor.fetchone()
+    plugin_data_row = MAIN_ARTIST_ADDITIONAL_CONTACTS.execute(conn, cursor).fetchone()
     if plugin_data_row and plugin_data_row['value']:
         try:
             additional_contacts = json.loads(plugin_data_row['value'])
@@ -195,15 +211,15 @@ def client_get_pricing():
             pass
 
     response_data = {
-        'commission_types': json.loads(settings.get('commission_types', '[]')),
-        'commission_extras': json.loads(settings.get('commission_extras', '[]')),
+        'commission_types': settings['commission_types'],
+        'commission_extras': settings['commission_extras'],
         'refund_policy': settings.get('refund_policy', 'Política de reembolso não definida.'),
         'revision_alert_text': settings.get('revision_alert_text', 'Você possui <strong>{revisions_left} de {revisions_limit}</strong> restantes para esta fase.'),
         'pix_key': settings.get('pix_key'),
         'paypal_email': settings.get('paypal_email'),
         'payment_currency_code': settings.get('payment_currency_code'),
         'paypal_hosted_button_id': settings.get('paypal_hosted_button_id'),
-        'support_contacts': json.loads(settings.get('support_contacts', '[]')),
+        'support_contacts': settings['support_contacts'],
         'social_links': final_social_links
     }
     
@@ -219,22 +235,58 @@ def client_get_orders():
     user_id = session.get('user_id')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query = f'SELECT * FROM comissoes WHERE client_id = {placeholder} ORDER BY date DESC'
-    cursor.execute(query, (user_id,))
-    orders_db = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    orders_db = ORDERS_BY_CLIENT.execute(conn, cursor, (user_id,)).fetchall()
     
     orders_list = [dict(row) for row in orders_db]
     for order in orders_list:
-        for key in ['comments', 'reference_files', 'preview', 'phases', 'event_log', 'assigned_artist_ids']:
+        for key in ORDER_JSON_FIELDS:
             order[key] = json.loads(order[key]) if (order[key] and order[key] != '[]') else []
+    commission_store.attach_threads(conn, cursor, orders_list)
+    cursor.close()
+    conn.close()
     return jsonify(orders_list)
 
 
+def _client_thread_page(order_id, list_page):
+    user_id = session.get('user_id')
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if not ORDER_OWNED_BY_CLIENT.execute(conn, cursor, (order_id, user_id)).fetchone():
+            return jsonify({'success': False, 'message': 'Pedido não encontrado.'}), 404
+        page = list_page(
+            conn, cursor, order_id,
+            before=request.args.get('before', type=int), after=request.args.get('after', type=int),
+            limit=request.args.get('limit', type=int)
+        )
+        return jsonify(page)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@client_bp.route('/api/client/orders/<string:order_id>/comments', methods=['GET'])
+@login_required
+def client_get_comments(order_id):
+    """Comentários do pedido paginados por id (?before=, ?after=, ?limit=)."""
+    return _client_thread_page(order_id, commission_store.list_comments)
+
+
+@client_bp.route('/api/client/orders/<string:order_id>/events', methods=['GET'])
+@login_required
+def client_get_events(order_id):
+    """Linha do tempo do pedido paginada por id (?before=, ?after=, ?limit=)."""
+    return _client_thread_page(order_id, commission_store.list_events)
+
+
+@client_bp.route('/api/client/orders/<string:order_id>/previews', methods=['GET'])
+@login_required
+def client_get_previews(order_id):
+    """Prévias do pedido paginadas por id (?before=, ?after=, ?limit=)."""
+    return _client_thread_page(order_id, commission_store.list_previews)
+
+
 @client_bp.route('/api/client/commissions', methods=['POST'])
 @login_required
 def client_create_commission():
@@ -244,42 +296,35 @@ def client_create_commission():
     
     if not all(k in data for k in ['title', 'type', 'description', 'price', 'assigned_artist_ids']):
         return jsonify({'success': False, 'message': 'Dados incompletos. A seleção do artista é obrigatória.'}), 400
+    try:
+        deadline = parse_date_field(data.get('deadline'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Prazo inválido (use AAAA-MM-DD).'}), 400
     
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
 
     try:
-        cursor.execute("SELECT value FROM settings WHERE key = 'commission_types'")
-        settings_db = cursor.fetchone()
-        all_types = json.loads(settings_db['value']) if settings_db else []
+        settings = get_settings(conn)
+        all_types = settings['commission_types']
         selected_type_config = next((t for t in all_types if t['name'] == data.get('type')), None)
         commission_phases = selected_type_config.get('phases', []) if selected_type_config else []
         
         if not commission_phases:
-            cursor.execute("SELECT value FROM settings WHERE key = 'default_phases'")
-            default_phases_str = cursor.fetchone()
-            commission_phases = json.loads(default_phases_str['value']) if default_phases_str else []
+            commission_phases = settings['default_phases']
             
-        new_id = f"ART-{int(time.time())}"
+        new_id = new_commission_id()
         today = datetime.now().strftime('%Y-%m-%d')
-        initial_event = [{"timestamp": datetime.now().isoformat(), "actor": "Cliente", "message": "Pedido criado. Aguardando pagamento."}]
-        
-        query_insert = f"""
-            INSERT INTO comissoes (id, client, type, date, deadline, price, 
-            status, description, preview, comments, 
-            client_id, phases, current_phase_index, revisions_used, event_log, payment_status, assigned_artist_ids) 
-            VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder})
-        """
-        cursor.execute(query_insert, (new_id, username, data.get('type'), today, data.get('deadline'), data.get('price'), 'pending_payment', data.get('description'), '[]', '[]', user_id, json.dumps(commission_phases), 0, 0, json.dumps(initial_event), 'unpaid', json.dumps(data.get('assigned_artist_ids'))))
-        conn.commit()
-
+        ORDER_INSERT.execute(conn, cursor, (new_id, username, data.get('type'), today, deadline, data.get('price'), 'pending_payment', data.get('description'), '[]', '[]', user_id, json.dumps(commission_phases), 0, 0, '[]', 'unpaid', json.dumps(data.get('assigned_artist_ids'))))
+        commission_sync.touch(conn, cursor, new_id)
+        commission_store.assign_artists(conn, cursor, new_id, data.get('assigned_artist_ids'))
+        add_event_to_log(conn, new_id, "Cliente", "Pedido criado. Aguardando pagamento.")
         artist_names = get_artist_names_by_ids(conn, data.get('assigned_artist_ids'))
         notification_message = f"Novo pedido #{new_id} de {username} para {artist_names} aguardando pagamento."
-        add_notification(notification_message, new_id)
-        
-        socketio.emit('commission_updated', {'commission_id': new_id, 'message_for_admin': notification_message})
+        add_notification(notification_message, new_id, conn=conn)
+        conn.commit()
+
+        emit_commission_created(new_id, client_id=user_id, message_for_admin=notification_message)
         
         return jsonify({'success': True, 'message': 'Pedido enviado com sucesso!', 'id': new_id})
     except Exception as e:
@@ -297,32 +342,23 @@ def client_add_comment(order_id):
     username = session.get('username')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query_select = f'SELECT * FROM comissoes WHERE id = {placeholder} AND client_id = {placeholder}'
-    cursor.execute(query_select, (order_id, user_id))
-    order = cursor.fetchone()
+    order = ORDER_OWNED_BY_CLIENT.execute(conn, cursor, (order_id, user_id)).fetchone()
 
     if not order:
         cursor.close()
         conn.close()
         return jsonify({'success': False, 'message': 'Pedido não encontrado.'}), 404
     
-    comments = json.loads(order['comments']) if order['comments'] else []
-    new_comment = {"author": username, "is_artist": False, "date": datetime.now().isoformat(), "text": data.get('text')}
-    comments.append(new_comment)
-    
-    query_update = f'UPDATE comissoes SET comments = {placeholder} WHERE id = {placeholder}'
-    cursor.execute(query_update, (json.dumps(comments), order_id))
+    new_comment = commission_store.add_comment(conn, cursor, order_id, username, False, data.get('text'))
     add_event_to_log(conn, order_id, "Cliente", "Adicionou um novo comentário.")
+    add_notification(f"Novo comentário de {username} no pedido #{order_id}", order_id, conn=conn)
     conn.commit()
     
-    socketio.emit('commission_updated', {'commission_id': order_id, 'message_for_admin': f"Novo comentário de {username} no pedido #{order_id}."})
+    emit_commission_updated(order_id, message_for_admin=f"Novo comentário de {username} no pedido #{order_id}.")
     
     cursor.close()
     conn.close()
-    add_notification(f"Novo comentário de {username} no pedido #{order_id}", order_id)
     return jsonify({'success': True, 'comment': new_comment})
 
 
@@ -338,12 +374,8 @@ def request_revision(order_id):
     username = session.get('username')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query_select = f'SELECT * FROM comissoes WHERE id = {placeholder} AND client_id = {placeholder}'
-    cursor.execute(query_select, (order_id, user_id))
-    order = cursor.fetchone()
+    order = ORDER_PHASES_BY_ID_AND_CLIENT.execute(conn, cursor, (order_id, user_id)).fetchone()
     
     if not order:
         cursor.close()
@@ -360,23 +392,20 @@ def request_revision(order_id):
         return jsonify({'success': False, 'message': 'Limite de revisões para esta fase atingido.'}), 403
         
     revisions_used += 1
-    comments = json.loads(order['comments']) if order['comments'] else []
-    revision_comment = {
-        "author": username, "is_artist": False, "date": datetime.now().isoformat(),
-        "text": comment_text, "is_revision_request": True, "phase_name": current_phase['name']
-    }
-    comments.append(revision_comment)
-    
-    query_update = f'UPDATE comissoes SET status = {placeholder}, revisions_used = {placeholder}, comments = {placeholder} WHERE id = {placeholder}'
-    cursor.execute(query_update, ('revisions', revisions_used, json.dumps(comments), order_id))
+    ORDER_REVISION_UPDATE.execute(conn, cursor, ('revisions', revisions_used, order_id))
+    commission_sync.touch(conn, cursor, order_id)
+    revision_comment = commission_store.add_comment(
+        conn, cursor, order_id, username, False, comment_text,
+        is_revision_request=True, phase_name=current_phase['name']
+    )
     add_event_to_log(conn, order_id, "Cliente", f"Solicitou uma revisão para a fase '{current_phase['name']}'.")
+    add_notification(f"Cliente solicitou revisão para a fase '{current_phase['name']}' do pedido #{order_id}", order_id, conn=conn)
     conn.commit()
     
-    socketio.emit('commission_updated', {'commission_id': order_id, 'message_for_admin': f"{username} pediu revisão para a fase '{current_phase['name']}' do pedido #{order_id}."})
+    emit_commission_updated(order_id, message_for_admin=f"{username} pediu revisão para a fase '{current_phase['name']}' do pedido #{order_id}.")
     
     cursor.close()
     conn.close()
-    add_notification(f"Cliente solicitou revisão para a fase '{current_phase['name']}' do pedido #{order_id}", order_id)
     return jsonify({'success': True, 'message': 'Pedido de revisão enviado.', 'comment': revision_comment})
 
 
@@ -387,12 +416,8 @@ def approve_phase(order_id):
     username = session.get('username')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query_select = f'SELECT * FROM comissoes WHERE id = {placeholder} AND client_id = {placeholder}'
-    cursor.execute(query_select, (order_id, user_id))
-    order = cursor.fetchone()
+    order = ORDER_PHASES_BY_ID_AND_CLIENT.execute(conn, cursor, (order_id, user_id)).fetchone()
 
     if not order:
         cursor.close()
@@ -413,13 +438,14 @@ def approve_phase(order_id):
     add_event_to_log(conn, order_id, "Cliente", f"Aprovou a fase '{current_phase_name}'.")
     
     if next_phase_index >= len(phases):
-        query_update = f'UPDATE comissoes SET status = {placeholder}, current_phase_index = {placeholder} WHERE id = {placeholder}'
-        cursor.execute(query_update, ('completed', next_phase_index, order_id))
+        ORDER_COMPLETE_PHASES.execute(conn, cursor, ('completed', next_phase_index, order_id))
+        commission_sync.touch(conn, cursor, order_id)
+        revenue_rollup.refresh(conn, cursor, order_id)
         add_event_to_log(conn, order_id, "Sistema", "Todas as fases foram aprovadas. Pedido finalizado.")
     else:
         next_phase_name = phases[next_phase_index]['name']
-        query_update = f'UPDATE comissoes SET status = {placeholder}, current_phase_index = {placeholder}, revisions_used = 0 WHERE id = {placeholder}'
-        cursor.execute(query_update, ('in_progress', next_phase_index, order_id))
+        ORDER_ADVANCE_PHASE.execute(conn, cursor, ('in_progress', next_phase_index, order_id))
+        commission_sync.touch(conn, cursor, order_id)
         add_event_to_log(conn, order_id, "Sistema", f"Projeto avançou para a fase '{next_phase_name}'.")
     
     conn.commit()
@@ -437,28 +463,23 @@ def client_confirm_payment(order_id):
     username = session.get('username')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
 
-    query_select = f'SELECT * FROM comissoes WHERE id = {placeholder} AND client_id = {placeholder}'
-    cursor.execute(query_select, (order_id, user_id))
-    if not cursor.fetchone():
+    if not ORDER_OWNED_BY_CLIENT.execute(conn, cursor, (order_id, user_id)).fetchone():
         cursor.close()
         conn.close()
         return jsonify({'success': False, 'message': 'Pedido não encontrado.'}), 404
 
-    query_update = f"UPDATE comissoes SET payment_status = 'awaiting_confirmation' WHERE id = {placeholder}"
-    cursor.execute(query_update, (order_id,))
+    ORDER_AWAITING_CONFIRMATION.execute(conn, cursor, (order_id,))
+    commission_sync.touch(conn, cursor, order_id)
     add_event_to_log(conn, order_id, "Cliente", "Confirmou que efetuou o pagamento.")
+    add_notification(f"O cliente {username} confirmou o pagamento para o pedido #{order_id}. Por favor, verifique.", order_id, conn=conn)
     conn.commit()
     
-    socketio.emit('commission_updated', {'commission_id': order_id, 'message_for_admin': f"{username} confirmou o pagamento do pedido #{order_id}. Por favor, verifique."})
+    emit_commission_updated(order_id, message_for_admin=f"{username} confirmou o pagamento do pedido #{order_id}. Por favor, verifique.")
     
     cursor.close()
     conn.close()
     
-    add_notification(f"O cliente {username} confirmou o pagamento para o pedido #{order_id}. Por favor, verifique.", order_id)
-    
     return jsonify({'success': True, 'message': 'Confirmação de pagamento enviada ao artista.'})
 
 
@@ -469,13 +490,9 @@ def cancel_order(order_id):
     username = session.get('username')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
     try:
-        query_select = f'SELECT status FROM comissoes WHERE id = {placeholder} AND client_id = {placeholder}'
-        cursor.execute(query_select, (order_id, user_id))
-        order = cursor.fetchone()
+        order = ORDER_STATUS_BY_ID_AND_CLIENT.execute(conn, cursor, (order_id, user_id)).fetchone()
         
         if not order:
             return jsonify({'success': False, 'message': 'Pedido não encontrado ou acesso negado.'}), 404
@@ -483,13 +500,13 @@ def cancel_order(order_id):
         if order['status'] in ['completed', 'cancelled']:
             return jsonify({'success': False, 'message': f'Este pedido já está com o status "{order["status"]}" e não pode ser cancelado.'}), 400
 
-        query_update = f"UPDATE comissoes SET status = 'cancelled' WHERE id = {placeholder}"
-        cursor.execute(query_update, (order_id,))
+        ORDER_CANCEL.execute(conn, cursor, (order_id,))
+        commission_sync.touch(conn, cursor, order_id)
         add_event_to_log(conn, order_id, "Cliente", "Pedido cancelado pelo cliente.")
+        add_notification(f"O cliente {username} cancelou o pedido #{order_id}.", order_id, conn=conn)
         conn.commit()
         
-        socketio.emit('commission_updated', {'commission_id': order_id, 'message_for_admin': f"O cliente {username} cancelou o pedido #{order_id}."})
-        add_notification(f"O cliente {username} cancelou o pedido #{order_id}.", order_id)
+        emit_commission_updated(order_id, message_for_admin=f"O cliente {username} cancelou o pedido #{order_id}.")
     
         return jsonify({'success': True, 'message': 'Pedido cancelado com sucesso.'})
 
@@ -509,12 +526,8 @@ def get_client_unread_count():
     user_id = session.get('user_id')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query = f'SELECT COUNT(id) as count FROM notifications WHERE is_read = 0 AND user_id = {placeholder}'
-    cursor.execute(query, (user_id,))
-    count = cursor.fetchone()['count']
+    count = notification_counters.unread_count(conn, cursor, user_id)
     
     cursor.close()
     conn.close()
@@ -523,19 +536,18 @@ def get_client_unread_count():
 @client_bp.route('/api/client/notifications', methods=['GET'])
 @login_required
 def get_client_all_notifications():
+    """Notificações do cliente, mais recentes primeiro (?before=<id>, ?limit=)."""
     user_id = session.get('user_id')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query = f'SELECT * FROM notifications WHERE user_id = {placeholder} ORDER BY timestamp DESC LIMIT 20'
-    cursor.execute(query, (user_id,))
-    notifications = cursor.fetchall()
+    page = notification_history.notifications_page(
+        conn, cursor, user_id, before=request.args.get('before', type=int), limit=request.args.get('limit', type=int)
+    )
     
     cursor.close()
     conn.close()
-    return jsonify([dict(row) for row in notifications])
+    return jsonify(page)
 
 @client_bp.route('/api/client/notifications/mark_read', methods=['POST'])
 @login_required
@@ -543,39 +555,76 @@ def mark_client_notifications_as_read():
     user_id = session.get('user_id')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
     
-    query = f'UPDATE notifications SET is_read = 1 WHERE is_read = 0 AND user_id = {placeholder}'
-    cursor.execute(query, (user_id,))
+    marked = NOTIFICATIONS_MARK_READ.execute(conn, cursor, (user_id,)).rowcount
+    notification_counters.decrement(conn, cursor, user_id, marked)
     conn.commit()
+    count = notification_counters.unread_count(conn, cursor, user_id)
     
     cursor.close()
     conn.close()
-    return jsonify({'success': True})
+    emit_unread_count(user_id)
+    return jsonify({'success': True, 'unread_count': count})
 
-@client_bp.route('/api/client/notifications/mark_read/commission/<string:commission_id>', methods=['POST'])
+@client_bp.route('/api/client/notifications/unread_by_commission', methods=['GET'])
 @login_required
-def mark_commission_notifications_as_read(commission_id):
+def get_client_unread_by_commission():
+    """Notificações não lidas por comissão: {commission_id: quantidade}."""
     user_id = session.get('user_id')
     conn = get_db_connection()
     cursor = conn.cursor()
-    is_postgres = hasattr(conn, 'cursor_factory')
-    placeholder = '%s' if is_postgres else '?'
+    
+    rows = UNREAD_BY_COMMISSION.execute(conn, cursor, (user_id,)).fetchall()
+    
+    cursor.close()
+    conn.close()
+    return jsonify({row['related_commission_id']: row['unread'] for row in rows})
+
+def _mark_commissions_read(user_id, commission_ids):
+    """Marca como lidas, num UPDATE só, as notificações do usuário ligadas às comissões."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
     try:
-        query = f'UPDATE notifications SET is_read = 1 WHERE user_id = {placeholder} AND related_commission_id = {placeholder} AND is_read = 0'
-        cursor.execute(query, (user_id, commission_id))
+        placeholders = ', '.join(['?'] * len(commission_ids))
+        marked = Query(
+            f'UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0 AND related_commission_id IN ({placeholders})'
+        ).execute(conn, cursor, (user_id, *commission_ids)).rowcount
+        notification_counters.decrement(conn, cursor, user_id, marked)
         conn.commit()
+        count = notification_counters.unread_count(conn, cursor, user_id)
         
-        return jsonify({'success': True, 'message': 'Notificações da comissão marcadas como lidas.'})
+        if marked:
+            emit_unread_count(user_id)
+        return jsonify({'success': True, 'message': 'Notificações da comissão marcadas como lidas.', 'marked': marked, 'unread_count': count})
     except Exception as e:
+        conn.rollback()
         print(f"Erro de banco de dados ao marcar nots da comissão como lidas: {e}")
         return jsonify({'success': False, 'message': 'Erro no servidor.'}), 500
     finally:
         cursor.close()
         conn.close()
 
+@client_bp.route('/api/client/notifications/mark_read/commission/<string:commission_id>', methods=['POST'])
+@login_required
+def mark_commission_notifications_as_read(commission_id):
+    return _mark_commissions_read(session.get('user_id'), [commission_id])
+
+@client_bp.route('/api/client/notifications/mark_read/commissions', methods=['POST'])
+@login_required
+def mark_commissions_notifications_as_read():
+    """Marca como lidas as notificações de várias comissões: {"commission_ids": [...]}."""
+    data = request.get_json(silent=True) or {}
+    commission_ids = data.get('commission_ids')
+    if not isinstance(commission_ids, list) or not all(isinstance(cid, str) for cid in commission_ids):
+        return jsonify({'success': False, 'message': "Envie 'commission_ids' como uma lista de ids."}), 400
+    commission_ids = list(dict.fromkeys(commission_ids))
+    if not commission_ids:
+        return jsonify({'success': True, 'marked': 0})
+    if len(commission_ids) > MAX_MARK_READ_COMMISSIONS:
+        return jsonify({'success': False, 'message': f'No máximo {MAX_MARK_READ_COMMISSIONS} comissões por chamada.'}), 400
+    return _mark_commissions_read(session.get('user_id'), commission_ids)
+
 from . import api_account_routes
 
 # --- INÍCIO DA MODIFICAÇÃO: Nova rota para buscar configurações do artista ---
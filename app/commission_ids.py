@@ -0,0 +1,62 @@
+# Arquivo: app/commission_ids.py
+
+import secrets
+import threading
+import time
+
+# Geração dos ids das comissões, sem ida ao banco:
+#
+#   ART-<milissegundos desde 1970, 13 dígitos>-<sequência, 2><aleatório, 6>
+#   ex.: ART-1760000000123-00K7Q2M9
+#
+# - Ordenável: a ordem de texto segue a ordem de criação. Os ids antigos
+#   (ART-<segundos>) continuam válidos e ordenam junto, porque os 10
+#   primeiros dígitos são os mesmos segundos.
+# - Sem colisão dentro do processo: no mesmo milissegundo a sequência
+#   incrementa (até 1024; depois espera o próximo milissegundo). Se o relógio
+#   voltar, continuamos do último milissegundo usado.
+# - Sem colisão entre workers/servidores: 30 bits aleatórios por id. Um
+#   choque exigiria o mesmo milissegundo, a mesma sequência e o mesmo sorteio.
+#
+# Os caracteres são do base32 de Crockford (sem I, L, O, U), fáceis de ditar.
+
+PREFIX = 'ART-'
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+SEQUENCE_CHARS = 2
+RANDOM_CHARS = 6
+MAX_SEQUENCE = len(ALPHABET) ** SEQUENCE_CHARS
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def _base32(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def _next_tick():
+    """(milissegundo, sequência) estritamente crescentes neste processo."""
+    global _last_ms, _sequence
+    while True:
+        with _lock:
+            now_ms = max(int(time.time() * 1000), _last_ms)
+            if now_ms != _last_ms:
+                _last_ms, _sequence = now_ms, 0
+                return now_ms, 0
+            if _sequence + 1 < MAX_SEQUENCE:
+                _sequence += 1
+                return now_ms, _sequence
+        # Sequência esgotada neste milissegundo: espera o próximo.
+        time.sleep(0.001)
+
+
+def new_commission_id():
+    """Novo id de comissão, único e ordenável por criação (ver o topo do módulo)."""
+    now_ms, sequence = _next_tick()
+    suffix = _base32(sequence, SEQUENCE_CHARS) + _base32(secrets.randbits(5 * RANDOM_CHARS), RANDOM_CHARS)
+    return f"{PREFIX}{now_ms:013d}-{suffix}"
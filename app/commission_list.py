@@ -0,0 +1,237 @@
+# Arquivo: app/commission_list.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from .queries import Query
+
+# Listagem de comissões do painel: filtros, ordenação e paginação por cursor
+# (keyset) feitos no banco, devolvendo só as colunas pedidas em 'fields'.
+# As listas usam as colunas de resumo; o detalhe completo (JSON, comentários,
+# prévias, histórico) fica no endpoint de uma comissão só.
+
+DEFAULT_LIST_PAGE_SIZE = 50
+MAX_LIST_PAGE_SIZE = 500
+
+SUMMARY_FIELDS = ('id', 'client', 'client_id', 'type', 'date', 'deadline', 'price', 'status', 'payment_status')
+# Colunas que podem ser pedidas em 'fields'. comments/preview/event_log ficam
+# de fora: a fonte da verdade são as tabelas filhas (commission_store).
+LIST_FIELDS = SUMMARY_FIELDS + (
+    'description', 'reference_files', 'phases', 'current_phase_index', 'current_preview',
+    'revisions_used', 'payment_method', 'assigned_artist_ids'
+)
+JSON_LIST_FIELDS = ('reference_files', 'phases', 'assigned_artist_ids')
+
+# Ordenações aceitas em 'sort' (prefixo '-' = decrescente). NULL vira
+# '0001-01-01' / 0 para que o cursor (valor, id) funcione com comparação de
+# tuplas; as expressões são as mesmas dos índices da migração 18.
+SORT_EXPRESSIONS = {
+    'date': "COALESCE(date, '0001-01-01')",
+    'deadline': "COALESCE(deadline, '0001-01-01')",
+    'price': 'COALESCE(price, 0)',
+    'id': 'id',
+}
+DEFAULT_SORT = '-date'
+
+DATE_FILTERS = {
+    'date_from': ('date', '>='),
+    'date_to': ('date', '<='),
+    'deadline_from': ('deadline', '>='),
+    'deadline_to': ('deadline', '<='),
+}
+
+COMISSOES_SUMMARY = Query(
+    'SELECT status, COUNT(*) AS total, '
+    "SUM(CASE WHEN date >= ? AND date < ? THEN COALESCE(price, 0) ELSE 0 END) AS month_revenue "
+    'FROM comissoes GROUP BY status',
+    name='comissoes_summary', prepare=True
+)
+
+
+class InvalidListQuery(ValueError):
+    """Parâmetro de filtro, ordenação, campos ou cursor inválido."""
+
+
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def parse_fields(value):
+    if not value or value == 'summary':
+        return list(SUMMARY_FIELDS)
+    if value == 'all':
+        return list(LIST_FIELDS)
+    fields = _split(value)
+    unknown = [f for f in fields if f not in LIST_FIELDS]
+    if unknown:
+        raise InvalidListQuery(f"Campos desconhecidos: {', '.join(unknown)}")
+    return fields if 'id' in fields else ['id'] + fields
+
+
+def _parse_sort(value):
+    value = value or DEFAULT_SORT
+    descending = value.startswith('-')
+    key = value.lstrip('-')
+    if key not in SORT_EXPRESSIONS:
+        raise InvalidListQuery(f"Ordenação inválida: {value}")
+    return key, descending
+
+
+def _parse_date(name, value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise InvalidListQuery(f"Data inválida em '{name}' (use AAAA-MM-DD).")
+
+
+def encode_cursor(sort, value, commission_id):
+    raw = json.dumps([sort, value, commission_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor_sort, value, commission_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidListQuery('Cursor inválido.')
+    # O cursor só vale para a mesma ordenação em que foi gerado.
+    if cursor_sort != sort:
+        raise InvalidListQuery('Cursor inválido para esta ordenação.')
+    # Os valores vão direto para a comparação com a expressão de ordenação:
+    # o tipo tem que ser o da coluna (data AAAA-MM-DD, número, id em texto).
+    if not isinstance(commission_id, str) or not _valid_sort_value(sort, value):
+        raise InvalidListQuery('Cursor inválido.')
+    return value, commission_id
+
+
+def _valid_sort_value(sort, value):
+    if sort in ('date', 'deadline'):
+        if not isinstance(value, str):
+            return False
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            return False
+        return True
+    if sort == 'price':
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+
+def decode_row(row, fields):
+    commission = {field: row[field] for field in fields}
+    for key in JSON_LIST_FIELDS:
+        if key in commission:
+            try:
+                commission[key] = json.loads(commission[key]) if commission[key] else []
+            except (json.JSONDecodeError, TypeError):
+                commission[key] = []
+    return commission
+
+
+def build_filters(args):
+    """Monta (cláusulas WHERE, parâmetros) a partir dos parâmetros da URL."""
+    clauses, params = [], []
+
+    statuses = _split(args.get('status'))
+    if statuses:
+        clauses.append(f"status IN ({', '.join(['?'] * len(statuses))})")
+        params.extend(statuses)
+
+    payment_statuses = _split(args.get('payment_status'))
+    if payment_statuses:
+        clauses.append(f"payment_status IN ({', '.join(['?'] * len(payment_statuses))})")
+        params.extend(payment_statuses)
+
+    artist_id = args.get('artist_id')
+    if artist_id:
+        if not str(artist_id).isdigit():
+            raise InvalidListQuery("'artist_id' deve ser numérico.")
+        clauses.append('id IN (SELECT commission_id FROM commission_artists WHERE artist_id = ?)')
+        params.append(int(artist_id))
+
+    client_id = args.get('client_id')
+    if client_id:
+        if not str(client_id).isdigit():
+            raise InvalidListQuery("'client_id' deve ser numérico.")
+        clauses.append('client_id = ?')
+        params.append(int(client_id))
+
+    client = (args.get('client') or '').strip()
+    if client:
+        clauses.append('LOWER(client) LIKE ?')
+        params.append(f'%{client.lower()}%')
+
+    search = (args.get('q') or '').strip()
+    if search:
+        term = f'%{search.lower()}%'
+        clauses.append('(LOWER(id) LIKE ? OR LOWER(client) LIKE ? OR LOWER(type) LIKE ?)')
+        params.extend([term, term, term])
+
+    for name, (column, operator) in DATE_FILTERS.items():
+        if args.get(name):
+            clauses.append(f'{column} {operator} ?')
+            params.append(_parse_date(name, args.get(name)))
+
+    return clauses, params
+
+
+def list_commissions(conn, cursor, args):
+    """
+    Uma página da listagem: {'items', 'has_more', 'next_cursor'}.
+    'args' são os parâmetros da requisição (status, payment_status,
+    artist_id, client_id, client, q, date_from/date_to, deadline_from/
+    deadline_to, sort, fields, cursor, limit).
+    """
+    fields = parse_fields(args.get('fields'))
+    sort, descending = _parse_sort(args.get('sort'))
+    try:
+        limit = int(args.get('limit') or DEFAULT_LIST_PAGE_SIZE)
+    except ValueError:
+        raise InvalidListQuery("'limit' deve ser numérico.")
+    limit = max(1, min(limit, MAX_LIST_PAGE_SIZE))
+
+    clauses, params = build_filters(args)
+    sort_expression = SORT_EXPRESSIONS[sort]
+    direction = 'DESC' if descending else 'ASC'
+
+    token = args.get('cursor')
+    if token:
+        value, last_id = decode_cursor(token, sort)
+        if sort == 'id':
+            clauses.append(f"id {'<' if descending else '>'} ?")
+            params.append(last_id)
+        else:
+            # A primeira condição é redundante, mas deixa o banco buscar direto
+            # no índice (o SQLite não usa a comparação de tuplas em expressões).
+            operator = '<' if descending else '>'
+            clauses.append(f"{sort_expression} {operator}= ? AND ({sort_expression}, id) {operator} (?, ?)")
+            params.extend([value, value, last_id])
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    order = f'ORDER BY id {direction}' if sort == 'id' else f'ORDER BY {sort_expression} {direction}, id {direction}'
+    sql = f"SELECT {', '.join(fields)}, {sort_expression} AS sort_value FROM comissoes {where} {order} LIMIT ?"
+    rows = Query(sql).execute(conn, cursor, tuple(params) + (limit + 1,)).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [decode_row(row, fields) for row in rows]
+    next_cursor = encode_cursor(sort, rows[-1]['sort_value'], rows[-1]['id']) if has_more and rows else None
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
+
+
+def commissions_summary(conn, cursor, today=None):
+    """Contagens por status e receita do mês corrente (concluídas), para os cards do dashboard."""
+    today = today or datetime.now()
+    month_start = today.strftime('%Y-%m-01')
+    next_month = datetime(today.year + (today.month == 12), today.month % 12 + 1, 1).strftime('%Y-%m-%d')
+
+    by_status, total, monthly_revenue = {}, 0, 0.0
+    for row in COMISSOES_SUMMARY.execute(conn, cursor, (month_start, next_month)).fetchall():
+        by_status[row['status']] = row['total']
+        total += row['total']
+        if row['status'] == 'completed':
+            monthly_revenue = float(row['month_revenue'] or 0)
+    return {'total': total, 'by_status': by_status, 'monthly_revenue': monthly_revenue}
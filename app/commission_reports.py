@@ -0,0 +1,73 @@
+# Arquivo: app/commission_reports.py
+
+from .queries import Query, POSTGRES, SQLITE
+
+# Relatório anual (página de relatórios): tudo é agregado no banco com
+# GROUP BY sobre as comissões concluídas do ano, então o Python só recebe
+# uma linha por grupo (mês/tipo, cliente) em vez de uma por comissão.
+# O filtro do ano usa a mesma expressão do índice idx_comissoes_status_date
+# (migração 18), com um intervalo de datas em vez de "date LIKE '2025%'".
+
+TOP_CLIENTS_LIMIT = 5
+MONTH_NAMES = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+YEAR_FILTER = "status = 'completed' AND COALESCE(date, '0001-01-01') BETWEEN ? AND ?"
+
+BY_MONTH_AND_TYPE = Query({
+    POSTGRES: 'SELECT CAST(EXTRACT(MONTH FROM date) AS INTEGER) AS month, type, '
+              'SUM(COALESCE(price, 0)) AS revenue, COUNT(*) AS commissions '
+              f'FROM comissoes WHERE {YEAR_FILTER} GROUP BY 1, type',
+    SQLITE: 'SELECT CAST(SUBSTR(date, 6, 2) AS INTEGER) AS month, type, '
+            'SUM(COALESCE(price, 0)) AS revenue, COUNT(*) AS commissions '
+            f'FROM comissoes WHERE {YEAR_FILTER} GROUP BY 1, type',
+}, name='report_by_month_type', prepare=True)
+ACTIVE_CLIENTS = Query(
+    f'SELECT COUNT(DISTINCT client) AS total FROM comissoes WHERE {YEAR_FILTER}',
+    name='report_active_clients', prepare=True
+)
+TOP_CLIENTS = Query(
+    f'SELECT client, SUM(COALESCE(price, 0)) AS total FROM comissoes WHERE {YEAR_FILTER} '
+    'GROUP BY client ORDER BY total DESC, client LIMIT ?',
+    name='report_top_clients', prepare=True
+)
+
+
+class InvalidYear(ValueError):
+    """Ano do relatório inválido."""
+
+
+def yearly_report(conn, cursor, year):
+    """KPIs, top clientes, receita por tipo e volume por mês das comissões concluídas no ano."""
+    year = str(year).strip()
+    if not (year.isdigit() and len(year) == 4):
+        raise InvalidYear("Ano inválido (use AAAA).")
+    period = (f'{year}-01-01', f'{year}-12-31')
+
+    receita_anual, total_comissoes = 0.0, 0
+    receita_por_tipo = {}
+    comissoes_por_mes = {month: 0 for month in range(1, 13)}
+    for row in BY_MONTH_AND_TYPE.execute(conn, cursor, period).fetchall():
+        revenue, count = float(row['revenue'] or 0), int(row['commissions'] or 0)
+        receita_anual += revenue
+        total_comissoes += count
+        receita_por_tipo[row['type']] = receita_por_tipo.get(row['type'], 0.0) + revenue
+        if row['month'] in comissoes_por_mes:
+            comissoes_por_mes[row['month']] += count
+
+    clientes_ativos = ACTIVE_CLIENTS.execute(conn, cursor, period).fetchone()['total'] or 0
+    top_clientes = [
+        {'client': row['client'], 'total': float(row['total'] or 0)}
+        for row in TOP_CLIENTS.execute(conn, cursor, period + (TOP_CLIENTS_LIMIT,)).fetchall()
+    ]
+
+    return {
+        'kpis': {
+            'receita_anual': receita_anual,
+            'total_comissoes': total_comissoes,
+            'clientes_ativos': clientes_ativos,
+            'ticket_medio': receita_anual / total_comissoes if total_comissoes > 0 else 0
+        },
+        'top_clientes': top_clientes,
+        'receita_por_tipo': receita_por_tipo,
+        'comissoes_por_mes': {MONTH_NAMES[month - 1]: count for month, count in comissoes_por_mes.items()}
+    }
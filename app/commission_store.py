@@ -0,0 +1,279 @@
+# Arquivo: app/commission_store.py
+
+from datetime import datetime
+from .queries import Query, dialect_of, POSTGRES
+
+# Comentários e prévias de cada comissão ficam em tabelas filhas "append-only":
+# cada mensagem é UM insert, em vez de reescrever o blob JSON inteiro da
+# comissão (custo proporcional ao histórico e sujeito a perda de atualização
+# quando duas pessoas escrevem ao mesmo tempo). O histórico de eventos
+# (commission_events) segue a mesma ideia e é gravado em lote no commit.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+COMMENT_COLUMNS = 'id, commission_id, author, is_artist, date, text, is_revision_request, phase_name'
+PREVIEW_COLUMNS = 'id, commission_id, version, date, url, comment'
+EVENT_COLUMNS = 'id, commission_id, timestamp, actor, message'
+
+COMMENT_INSERT_SQL = 'INSERT INTO commission_comments (commission_id, author, is_artist, date, text, is_revision_request, phase_name) VALUES (?, ?, ?, ?, ?, ?, ?)'
+PREVIEW_INSERT_SQL = 'INSERT INTO commission_previews (commission_id, version, date, url, comment) VALUES (?, ?, ?, ?, ?)'
+
+# Inserts em lote (backfill) e inserts que devolvem o id gerado (RETURNING no PostgreSQL)
+COMMENT_INSERT = Query(COMMENT_INSERT_SQL)
+PREVIEW_INSERT = Query(PREVIEW_INSERT_SQL)
+COMMENT_INSERT_RETURNING = Query({'postgres': COMMENT_INSERT_SQL + ' RETURNING id', 'sqlite': COMMENT_INSERT_SQL},
+                                 name='comment_insert', prepare=True)
+PREVIEW_INSERT_RETURNING = Query({'postgres': PREVIEW_INSERT_SQL + ' RETURNING id', 'sqlite': PREVIEW_INSERT_SQL},
+                                 name='preview_insert', prepare=True)
+# Trava a linha da comissão antes de contar as prévias, para dois envios
+# simultâneos não receberem a mesma versão. No SQLite não há FOR UPDATE: a
+# atualização sem efeito abre a transação de escrita (e entra na fila de
+# escrita), então o outro envio só conta depois do commit deste.
+COMMISSION_LOCK = Query({
+    'postgres': 'SELECT id FROM comissoes WHERE id = ? FOR UPDATE',
+    'sqlite': 'UPDATE comissoes SET current_preview = current_preview WHERE id = ?',
+}, name='commission_lock', prepare=True)
+PREVIEW_COUNT = Query('SELECT COUNT(id) AS count FROM commission_previews WHERE commission_id = ?', name='preview_count', prepare=True)
+
+COMMENTS_LATEST = Query(
+    f'SELECT {COMMENT_COLUMNS} FROM commission_comments WHERE commission_id = ? ORDER BY id DESC LIMIT ?',
+    name='comments_latest', prepare=True
+)
+COMMENTS_BEFORE = Query(
+    f'SELECT {COMMENT_COLUMNS} FROM commission_comments WHERE commission_id = ? AND id < ? ORDER BY id DESC LIMIT ?',
+    name='comments_before', prepare=True
+)
+COMMENTS_AFTER = Query(
+    f'SELECT {COMMENT_COLUMNS} FROM commission_comments WHERE commission_id = ? AND id > ? ORDER BY id ASC LIMIT ?',
+    name='comments_after', prepare=True
+)
+PREVIEWS_LATEST = Query(
+    f'SELECT {PREVIEW_COLUMNS} FROM commission_previews WHERE commission_id = ? ORDER BY id DESC LIMIT ?',
+    name='previews_latest', prepare=True
+)
+PREVIEWS_BEFORE = Query(
+    f'SELECT {PREVIEW_COLUMNS} FROM commission_previews WHERE commission_id = ? AND id < ? ORDER BY id DESC LIMIT ?',
+    name='previews_before', prepare=True
+)
+PREVIEWS_AFTER = Query(
+    f'SELECT {PREVIEW_COLUMNS} FROM commission_previews WHERE commission_id = ? AND id > ? ORDER BY id ASC LIMIT ?',
+    name='previews_after', prepare=True
+)
+EVENT_INSERT = Query('INSERT INTO commission_events (commission_id, timestamp, actor, message) VALUES (?, ?, ?, ?)')
+EVENTS_LATEST = Query(
+    f'SELECT {EVENT_COLUMNS} FROM commission_events WHERE commission_id = ? ORDER BY id DESC LIMIT ?',
+    name='events_latest', prepare=True
+)
+EVENTS_BEFORE = Query(
+    f'SELECT {EVENT_COLUMNS} FROM commission_events WHERE commission_id = ? AND id < ? ORDER BY id DESC LIMIT ?',
+    name='events_before', prepare=True
+)
+EVENTS_AFTER = Query(
+    f'SELECT {EVENT_COLUMNS} FROM commission_events WHERE commission_id = ? AND id > ? ORDER BY id ASC LIMIT ?',
+    name='events_after', prepare=True
+)
+# Feed global (todas as comissões), do mais novo para o mais antigo, pela PK.
+ACTIVITY_COLUMNS = 'e.id, e.commission_id, e.timestamp, e.actor, e.message, c.client'
+ACTIVITY_LATEST = Query(
+    f'SELECT {ACTIVITY_COLUMNS} FROM commission_events e LEFT JOIN comissoes c ON c.id = e.commission_id ORDER BY e.id DESC LIMIT ?',
+    name='activity_latest', prepare=True
+)
+ACTIVITY_BEFORE = Query(
+    f'SELECT {ACTIVITY_COLUMNS} FROM commission_events e LEFT JOIN comissoes c ON c.id = e.commission_id WHERE e.id < ? ORDER BY e.id DESC LIMIT ?',
+    name='activity_before', prepare=True
+)
+COMMENTS_DELETE = Query('DELETE FROM commission_comments WHERE commission_id = ?')
+PREVIEWS_DELETE = Query('DELETE FROM commission_previews WHERE commission_id = ?')
+EVENTS_DELETE = Query('DELETE FROM commission_events WHERE commission_id = ?')
+# Artistas de cada comissão (espelho de comissoes.assigned_artist_ids), para filtrar por artista com índice.
+ARTIST_INSERT = Query('INSERT INTO commission_artists (commission_id, artist_id) VALUES (?, ?)')
+ARTISTS_DELETE = Query('DELETE FROM commission_artists WHERE commission_id = ?')
+
+
+def insert_returning_id(conn, cursor, query, params):
+    """Executa um INSERT ... (RETURNING id no PostgreSQL) e devolve o id gerado."""
+    query.execute(conn, cursor, params)
+    if dialect_of(conn) == POSTGRES:
+        return cursor.fetchone()['id']
+    return cursor.lastrowid
+
+
+def comment_to_dict(row):
+    comment = {
+        'id': row['id'], 'author': row['author'], 'is_artist': bool(row['is_artist']),
+        'date': row['date'], 'text': row['text']
+    }
+    if row['is_revision_request']:
+        comment['is_revision_request'] = True
+        comment['phase_name'] = row['phase_name']
+    return comment
+
+
+def preview_to_dict(row):
+    return {'id': row['id'], 'version': row['version'], 'date': row['date'], 'url': row['url'], 'comment': row['comment']}
+
+
+def event_to_dict(row):
+    return {'id': row['id'], 'timestamp': row['timestamp'], 'actor': row['actor'], 'message': row['message']}
+
+
+def append_event(conn, commission_id, actor, message):
+    """
+    Registra um evento no histórico da comissão. Em conexões do pool o INSERT
+    é adiado e gravado junto com os demais eventos da transação no commit.
+    """
+    params = (commission_id, datetime.now().isoformat(), actor, message)
+    if hasattr(conn, 'defer'):
+        conn.defer(EVENT_INSERT, params)
+    else:
+        cursor = conn.cursor()
+        EVENT_INSERT.execute(conn, cursor, params)
+        cursor.close()
+
+
+def add_comment(conn, cursor, commission_id, author, is_artist, text, is_revision_request=False, phase_name=None):
+    """Insere um comentário (uma linha) e o retorna no formato usado pela API."""
+    date = datetime.now().isoformat()
+    comment_id = insert_returning_id(conn, cursor, COMMENT_INSERT_RETURNING, (
+        commission_id, author, 1 if is_artist else 0, date, text, 1 if is_revision_request else 0, phase_name
+    ))
+    comment = {'id': comment_id, 'author': author, 'is_artist': bool(is_artist), 'date': date, 'text': text}
+    if is_revision_request:
+        comment['is_revision_request'] = True
+        comment['phase_name'] = phase_name
+    return comment
+
+
+def add_preview(conn, cursor, commission_id, url, comment=''):
+    """
+    Insere uma nova versão de prévia. Retorna (prévia, índice), onde o índice
+    é a posição da prévia na lista (usado em comissoes.current_preview).
+    A linha da comissão fica travada até o fim da transação.
+    """
+    COMMISSION_LOCK.execute(conn, cursor, (commission_id,))
+    index = PREVIEW_COUNT.execute(conn, cursor, (commission_id,)).fetchone()['count']
+    date = datetime.now().isoformat()
+    version = f"{index + 1}.0"
+    preview_id = insert_returning_id(conn, cursor, PREVIEW_INSERT_RETURNING, (commission_id, version, date, url, comment))
+    preview = {'id': preview_id, 'version': version, 'date': date, 'url': url, 'comment': comment}
+    return preview, index
+
+
+def _page(conn, cursor, queries, to_dict, commission_id, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    latest, before_query, after_query = queries
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    # Busca limit+1 para saber se existe mais uma página sem precisar de COUNT.
+    if after is not None:
+        rows = after_query.execute(conn, cursor, (commission_id, int(after), limit + 1)).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        if before is not None:
+            rows = before_query.execute(conn, cursor, (commission_id, int(before), limit + 1)).fetchall()
+        else:
+            rows = latest.execute(conn, cursor, (commission_id, limit + 1)).fetchall()
+        has_more = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+
+    items = [to_dict(row) for row in rows]
+    if after is not None:
+        next_cursor = {'after': items[-1]['id']} if has_more and items else None
+    else:
+        next_cursor = {'before': items[0]['id']} if has_more and items else None
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
+
+
+def list_comments(conn, cursor, commission_id, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Página de comentários em ordem cronológica, paginada por id (keyset).
+    Sem cursor: as mensagens mais recentes. 'before': as anteriores ao id
+    (rolar o histórico para cima). 'after': as novas desde o id.
+    """
+    return _page(conn, cursor, (COMMENTS_LATEST, COMMENTS_BEFORE, COMMENTS_AFTER), comment_to_dict,
+                 commission_id, before, after, limit)
+
+
+def list_previews(conn, cursor, commission_id, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """Página de prévias em ordem cronológica, com os mesmos cursores de list_comments."""
+    return _page(conn, cursor, (PREVIEWS_LATEST, PREVIEWS_BEFORE, PREVIEWS_AFTER), preview_to_dict,
+                 commission_id, before, after, limit)
+
+
+def list_events(conn, cursor, commission_id, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """Linha do tempo da comissão em ordem cronológica, com os mesmos cursores de list_comments."""
+    return _page(conn, cursor, (EVENTS_LATEST, EVENTS_BEFORE, EVENTS_AFTER), event_to_dict,
+                 commission_id, before, after, limit)
+
+
+def list_activity(conn, cursor, before=None, limit=DEFAULT_PAGE_SIZE):
+    """Feed de atividade de todas as comissões, do mais recente para o mais antigo."""
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    if before is not None:
+        rows = ACTIVITY_BEFORE.execute(conn, cursor, (int(before), limit + 1)).fetchall()
+    else:
+        rows = ACTIVITY_LATEST.execute(conn, cursor, (limit + 1,)).fetchall()
+    has_more = len(rows) > limit
+    items = []
+    for row in rows[:limit]:
+        item = event_to_dict(row)
+        item['commission_id'] = row['commission_id']
+        item['client'] = row['client']
+        items.append(item)
+    next_cursor = {'before': items[-1]['id']} if has_more and items else None
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
+
+
+def attach_threads(conn, cursor, commissions):
+    """
+    Preenche 'comments', 'preview' e 'event_log' de uma lista de comissões
+    (dicts) com três consultas no total, em vez de três por comissão.
+    """
+    if not commissions:
+        return commissions
+    by_id = {}
+    for commission in commissions:
+        commission['comments'] = []
+        commission['preview'] = []
+        commission['event_log'] = []
+        by_id[commission['id']] = commission
+
+    ids = list(by_id.keys())
+    placeholder = '%s' if dialect_of(conn) == POSTGRES else '?'
+    # Lotes para não estourar o limite de parâmetros do SQLite.
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        marks = ','.join([placeholder] * len(chunk))
+        cursor.execute(f'SELECT {COMMENT_COLUMNS} FROM commission_comments WHERE commission_id IN ({marks}) ORDER BY id', tuple(chunk))
+        for row in cursor.fetchall():
+            by_id[row['commission_id']]['comments'].append(comment_to_dict(row))
+        cursor.execute(f'SELECT {PREVIEW_COLUMNS} FROM commission_previews WHERE commission_id IN ({marks}) ORDER BY id', tuple(chunk))
+        for row in cursor.fetchall():
+            by_id[row['commission_id']]['preview'].append(preview_to_dict(row))
+        cursor.execute(f'SELECT {EVENT_COLUMNS} FROM commission_events WHERE commission_id IN ({marks}) ORDER BY id', tuple(chunk))
+        for row in cursor.fetchall():
+            by_id[row['commission_id']]['event_log'].append(event_to_dict(row))
+    return commissions
+
+
+def delete_threads(conn, cursor, commission_id):
+    COMMENTS_DELETE.execute(conn, cursor, (commission_id,))
+    PREVIEWS_DELETE.execute(conn, cursor, (commission_id,))
+    EVENTS_DELETE.execute(conn, cursor, (commission_id,))
+    ARTISTS_DELETE.execute(conn, cursor, (commission_id,))
+
+
+def assign_artists(conn, cursor, commission_id, artist_ids):
+    """Registra os artistas da comissão em commission_artists (ids repetidos ou inválidos são ignorados)."""
+    if not isinstance(artist_ids, (list, tuple)):
+        return
+    rows = []
+    for artist_id in artist_ids:
+        try:
+            artist_id = int(artist_id)
+        except (TypeError, ValueError):
+            continue
+        if (commission_id, artist_id) not in rows:
+            rows.append((commission_id, artist_id))
+    if rows:
+        ARTIST_INSERT.executemany(conn, cursor, rows)
@@ -0,0 +1,85 @@
+# Arquivo: app/commission_sync.py
+
+from .queries import Query
+from .versioned_cache import bump_version, read_version
+from .commission_list import parse_fields, decode_row
+
+# Sincronização incremental das comissões. Cada escrita em uma linha de
+# 'comissoes' grava nela a próxima versão de um contador global (a linha
+# 'commission_rows' de cache_versions); exclusões deixam uma "lápide" em
+# commission_tombstones com a sua própria versão. Assim o painel pede só o
+# que mudou depois do último cursor que viu, em vez da tabela inteira.
+#
+# O UPDATE no contador trava a linha até o commit, então as versões ficam
+# na ordem em que as transações confirmam: nenhum leitor vê a versão N+1
+# antes da N.
+
+ROW_VERSION_KEY = 'commission_rows'
+DEFAULT_CHANGES_LIMIT = 200
+MAX_CHANGES_LIMIT = 1000
+
+SET_ROW_VERSION = Query('UPDATE comissoes SET row_version = ? WHERE id = ?', name='comissao_set_row_version', prepare=True)
+TOMBSTONE_INSERT = Query('INSERT INTO commission_tombstones (row_version, commission_id) VALUES (?, ?)')
+TOMBSTONES_SINCE = Query(
+    'SELECT row_version, commission_id FROM commission_tombstones WHERE row_version > ? ORDER BY row_version LIMIT ?',
+    name='tombstones_since', prepare=True
+)
+IDS_BY_CLIENT = Query('SELECT id FROM comissoes WHERE client_id = ?')
+
+
+def _next_version(conn, cursor):
+    bump_version(conn, cursor, ROW_VERSION_KEY)
+    return read_version(conn, cursor, ROW_VERSION_KEY)
+
+
+def touch(conn, cursor, commission_id):
+    """Marca a comissão como alterada; chame na mesma transação da escrita."""
+    SET_ROW_VERSION.execute(conn, cursor, (_next_version(conn, cursor), commission_id))
+
+
+def touch_client_commissions(conn, cursor, client_id):
+    """Marca todas as comissões do cliente (antes de uma escrita em lote por client_id)."""
+    for row in IDS_BY_CLIENT.execute(conn, cursor, (client_id,)).fetchall():
+        touch(conn, cursor, row['id'])
+
+
+def mark_deleted(conn, cursor, commission_id):
+    """Registra a exclusão da comissão para os clientes que sincronizam por cursor."""
+    TOMBSTONE_INSERT.execute(conn, cursor, (_next_version(conn, cursor), commission_id))
+
+
+def current_cursor(conn, cursor):
+    return read_version(conn, cursor, ROW_VERSION_KEY)
+
+
+def changes_since(conn, cursor, since, limit=DEFAULT_CHANGES_LIMIT, fields=None):
+    """
+    Alterações com versão maior que 'since', em ordem de versão:
+    {'changed': [...], 'deleted': [ids], 'cursor', 'has_more'}.
+    Uma comissão excluída e depois recriada com o mesmo id aparece nas
+    duas listas; vale a ordem das versões (o cliente aplica 'deleted' antes).
+    """
+    limit = max(1, min(int(limit or DEFAULT_CHANGES_LIMIT), MAX_CHANGES_LIMIT))
+    fields = parse_fields(fields)
+    since = int(since)
+
+    rows = Query(
+        f"SELECT {', '.join(fields)}, row_version FROM comissoes WHERE row_version > ? ORDER BY row_version LIMIT ?"
+    ).execute(conn, cursor, (since, limit + 1)).fetchall()
+    tombstones = TOMBSTONES_SINCE.execute(conn, cursor, (since, limit + 1)).fetchall()
+
+    # Junta as duas listas pela versão e corta no limite; o cursor é a
+    # última versão entregue, então a próxima chamada continua dali.
+    merged = sorted([(row['row_version'], 'changed', row) for row in rows] +
+                    [(row['row_version'], 'deleted', row) for row in tombstones], key=lambda item: item[0])
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changed, deleted = [], []
+    for version, kind, row in merged:
+        if kind == 'changed':
+            changed.append(decode_row(row, fields))
+        else:
+            deleted.append(row['commission_id'])
+    next_cursor = merged[-1][0] if merged else since
+    return {'changed': changed, 'deleted': deleted, 'cursor': next_cursor, 'has_more': has_more}
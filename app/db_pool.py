@@ -0,0 +1,359 @@
+# Arquivo: app/db_pool.py
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+import psycopg2
+from psycopg2.extras import DictCursor
+
+# Usamos 'queue' e 'threading' da biblioteca padrão de propósito: com o
+# eventlet.monkey_patch() de run.py/wsgi.py eles viram primitivas "verdes",
+# então um greenlet esperando por uma conexão não bloqueia o processo inteiro.
+# Sem o monkey_patch (scripts, 'flask run') continuam funcionando com threads.
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 30
+
+# Perfil de produção do SQLite (opt-in com SQLITE_PRODUCTION=1). Os valores
+# podem ser ajustados pelas variáveis SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE e
+# SQLITE_BUSY_TIMEOUT (em ms).
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_SQLITE_CACHE_SIZE = -64000  # negativo = KiB, ou seja ~64 MB
+DEFAULT_SQLITE_BUSY_TIMEOUT = 5000
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+# Colunas DATE do PostgreSQL voltam como texto 'AAAA-MM-DD', igual ao que o
+# SQLite guarda: o resto do app (JSON, cursores, comparações) trata datas como
+# strings ISO nos dois bancos.
+DATE_AS_ISO_TEXT = psycopg2.extensions.new_type(psycopg2.extensions.DATE.values, 'DATE_AS_ISO_TEXT', lambda value, cursor: value)
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo limite do pool."""
+
+
+def sqlite_production_enabled():
+    return not os.environ.get('DATABASE_URL') and os.environ.get('SQLITE_PRODUCTION', '0') == '1'
+
+
+def _sqlite_busy_timeout_ms():
+    return int(os.environ.get('SQLITE_BUSY_TIMEOUT', DEFAULT_SQLITE_BUSY_TIMEOUT))
+
+
+def _apply_sqlite_production_pragmas(conn):
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA journal_mode = WAL')
+    cursor.execute('PRAGMA synchronous = NORMAL')
+    cursor.execute(f"PRAGMA mmap_size = {int(os.environ.get('SQLITE_MMAP_SIZE', DEFAULT_SQLITE_MMAP_SIZE))}")
+    cursor.execute(f"PRAGMA cache_size = {int(os.environ.get('SQLITE_CACHE_SIZE', DEFAULT_SQLITE_CACHE_SIZE))}")
+    cursor.execute(f'PRAGMA busy_timeout = {_sqlite_busy_timeout_ms()}')
+    cursor.execute('PRAGMA temp_store = MEMORY')
+    cursor.close()
+
+
+def _connect():
+    """Abre uma conexão "crua" com o banco configurado."""
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url:
+        conn = psycopg2.connect(database_url)
+        conn.cursor_factory = DictCursor
+        psycopg2.extensions.register_type(DATE_AS_ISO_TEXT, conn)
+    else:
+        # check_same_thread=False: o pool garante uso exclusivo da conexão,
+        # mas ela pode ser emprestada por threads diferentes ao longo da vida.
+        conn = sqlite3.connect('database.db', check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if sqlite_production_enabled():
+            _apply_sqlite_production_pragmas(conn)
+    return conn
+
+
+def _is_write(sql):
+    words = sql.split(None, 2)
+    if not words:
+        return False
+    if words[0].upper() == 'BEGIN':
+        # BEGIN IMMEDIATE/EXCLUSIVE já pega o lock de escrita do arquivo.
+        return len(words) > 1 and words[1].upper() in ('IMMEDIATE', 'EXCLUSIVE')
+    return words[0].upper() in WRITE_STATEMENTS
+
+
+class WriterGate:
+    """
+    Fila de escrita única do SQLite: só uma conexão do processo por vez pode
+    ter uma transação de escrita aberta. As outras esperam a vez (em ordem de
+    chegada) em vez de disputar o lock do arquivo e receber "database is locked".
+    Entre processos diferentes quem arbitra é o busy_timeout + WAL.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'writes': 0, 'waits': 0, 'timeouts': 0}
+
+    def acquire(self):
+        if not self._lock.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats['waits'] += 1
+            if not self._lock.acquire(timeout=self.timeout):
+                with self._stats_lock:
+                    self._stats['timeouts'] += 1
+                raise sqlite3.OperationalError('database is locked (fila de escrita esgotou o tempo)')
+        with self._stats_lock:
+            self._stats['writes'] += 1
+
+    def release(self):
+        self._lock.release()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+class _WriterGuardCursor:
+    """Cursor que entra na fila de escrita antes do primeiro comando de escrita."""
+    __slots__ = ('_conn', '_cursor')
+
+    def __init__(self, conn, cursor):
+        self._conn = conn
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        self._conn._before_statement(sql)
+        self._cursor.execute(sql, params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._conn._before_statement(sql)
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _is_broken(raw_conn):
+    if hasattr(raw_conn, 'cursor_factory'):
+        return raw_conn.closed != 0
+    return False
+
+
+class PooledConnection:
+    """
+    Envolve uma conexão emprestada do pool e repassa tudo para ela.
+    'close()' devolve a conexão ao pool em vez de fechá-la; quando a conexão
+    pertence à requisição (flask.g), 'close()' não faz nada e a devolução
+    acontece no teardown do app context.
+
+    'defer(query, params)' acumula inserts "append-only" (ex.: eventos das
+    comissões) que são gravados com um executemany por consulta logo antes
+    do commit; um rollback ou a devolução ao pool descartam o que sobrou.
+    """
+    __slots__ = ('_pool', '_raw', 'info', '_request_scoped', '_released', '_holds_writer', '_pending')
+
+    def __init__(self, pool, raw_conn, info, request_scoped=False):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_raw', raw_conn)
+        object.__setattr__(self, 'info', info)
+        object.__setattr__(self, '_request_scoped', request_scoped)
+        object.__setattr__(self, '_released', False)
+        object.__setattr__(self, '_holds_writer', False)
+        object.__setattr__(self, '_pending', {})
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw, name, value)
+
+    # --- Fila de escrita (só ativa no perfil de produção do SQLite) ---
+    def _before_statement(self, sql):
+        if not self._holds_writer and _is_write(sql):
+            self._pool.writer.acquire()
+            object.__setattr__(self, '_holds_writer', True)
+
+    def _release_writer(self):
+        if self._holds_writer:
+            object.__setattr__(self, '_holds_writer', False)
+            self._pool.writer.release()
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        if self._pool.writer is None:
+            return cursor
+        return _WriterGuardCursor(self, cursor)
+
+    def execute(self, sql, *args):
+        if self._pool.writer is not None:
+            self._before_statement(sql)
+        return self._raw.execute(sql, *args)
+
+    # --- Escritas adiadas até o commit ---
+    def defer(self, query, params):
+        self._pending.setdefault(query, []).append(tuple(params))
+
+    def _flush_pending(self):
+        if not self._pending:
+            return
+        pending = self._pending
+        object.__setattr__(self, '_pending', {})
+        cursor = self.cursor()
+        try:
+            for query, rows in pending.items():
+                query.executemany(self, cursor, rows)
+        finally:
+            cursor.close()
+
+    def commit(self):
+        try:
+            self._flush_pending()
+            self._raw.commit()
+        finally:
+            self._release_writer()
+
+    def rollback(self):
+        self._pending.clear()
+        try:
+            self._raw.rollback()
+        finally:
+            self._release_writer()
+
+    def close(self):
+        if not self._request_scoped:
+            self.release()
+
+    def release(self):
+        """Devolve a conexão ao pool (idempotente)."""
+        if self._released:
+            return
+        object.__setattr__(self, '_released', True)
+        self._pending.clear()
+        try:
+            self._pool.release(self._raw, self.info)
+        finally:
+            self._release_writer()
+
+
+class ConnectionPool:
+    """Pool de conexões de tamanho fixo, seguro entre greenlets."""
+
+    def __init__(self, connect=_connect, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT, writer=None):
+        self.pid = os.getpid()
+        self.max_size = max_size
+        self.timeout = timeout
+        self.writer = writer
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._stats = {
+            'created': 0, 'discarded': 0, 'acquired': 0,
+            'waits': 0, 'timeouts': 0, 'wait_time_total': 0.0
+        }
+        self._in_use = 0
+
+    def acquire(self, request_scoped=False):
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['waits'] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise PoolTimeout(f"Nenhuma conexão livre após {self.timeout}s (pool com {self.max_size}).")
+            with self._lock:
+                self._stats['wait_time_total'] += time.monotonic() - started
+
+        try:
+            raw_conn, info = self._take_idle()
+            if raw_conn is None:
+                raw_conn, info = self._connect(), {}
+                with self._lock:
+                    self._stats['created'] += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats['acquired'] += 1
+            self._in_use += 1
+        return PooledConnection(self, raw_conn, info, request_scoped)
+
+    def _take_idle(self):
+        while True:
+            try:
+                raw_conn, info = self._idle.get_nowait()
+            except queue.Empty:
+                return None, None
+            if not _is_broken(raw_conn):
+                return raw_conn, info
+            self._discard(raw_conn)
+
+    def release(self, raw_conn, info):
+        try:
+            # Nada de transação pendurada entre requisições: o que não foi
+            # commitado pelo handler é descartado aqui.
+            if not _is_broken(raw_conn):
+                raw_conn.rollback()
+            if _is_broken(raw_conn):
+                self._discard(raw_conn)
+            else:
+                self._idle.put((raw_conn, info))
+        except Exception as e:
+            print(f"Aviso: conexão descartada ao voltar para o pool: {e}")
+            self._discard(raw_conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def _discard(self, raw_conn):
+        with self._lock:
+            self._stats['discarded'] += 1
+        try:
+            raw_conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_use'] = self._in_use
+        stats['idle'] = self._idle.qsize()
+        stats['max_size'] = self.max_size
+        stats['timeout'] = self.timeout
+        stats['pid'] = self.pid
+        if self.writer is not None:
+            stats['sqlite_writer'] = self.writer.stats()
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Retorna o pool do processo atual, criando-o na primeira chamada.
+    Após um fork (workers do Gunicorn) um pool novo é criado, pois as
+    conexões herdadas do processo pai não podem ser compartilhadas.
+    """
+    global _pool
+    if _pool is not None and _pool.pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            writer = WriterGate(_sqlite_busy_timeout_ms() / 1000.0) if sqlite_production_enabled() else None
+            _pool = ConnectionPool(
+                max_size=int(os.environ.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                timeout=float(os.environ.get('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)),
+                writer=writer
+            )
+    return _pool
@@ -7,6 +7,7 @@ import psycopg2
 from psycopg2.extras import DictCursor
 from werkzeug.security import generate_password_hash
 from .utils import get_db_connection
+from .migrations import run_migrations
 
 def initialize_database():
     """Verifica, cria e popula o banco de dados se necessário."""
@@ -137,6 +138,9 @@ def initialize_database():
             print("Banco de dados já populado. Nenhuma ação de população necessária.")
 
         conn.commit()
+
+        # Índices e demais evoluções do esquema, versionados em app/migrations.py
+        run_migrations(conn)
         print("Setup do banco de dados concluído com sucesso!")
 
     except Exception as e:
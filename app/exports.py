@@ -0,0 +1,132 @@
+# Arquivo: app/exports.py
+
+import csv
+import json
+from .queries import Query, dialect_of, POSTGRES
+from .commission_list import build_filters, InvalidListQuery
+
+# Exportação de dados em CSV ou NDJSON, linha a linha. As linhas são lidas
+# em lotes (fetchmany; no PostgreSQL por um cursor nomeado, que fica no
+# servidor) e escritas por um gerador, então a memória não cresce com o
+# tamanho do histórico e o cabeçalho sai antes de a consulta terminar.
+# Usado pela rota /admin/api/export/<conjunto> e por manage_exports.py.
+#
+# Conjuntos e filtros aceitos:
+#   comissoes   os mesmos filtros da listagem (status, payment_status,
+#               artist_id, client_id, client, q, date_from/date_to,
+#               deadline_from/deadline_to; ver commission_list)
+#   transacoes  comissões concluídas; date_from/date_to e os demais filtros
+#               da listagem, menos status
+#   eventos     histórico das comissões; commission_id
+#   mensagens   mensagens de contato
+
+EXPORT_BATCH_SIZE = 500
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+class InvalidExport(ValueError):
+    """Conjunto, formato ou filtro de exportação inválido."""
+
+
+def _commissions(args):
+    clauses, params = build_filters(args)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    columns = ['id', 'client', 'client_id', 'type', 'date', 'deadline', 'price', 'status', 'payment_status', 'description']
+    return columns, f"SELECT {', '.join(columns)} FROM comissoes {where} ORDER BY id", params
+
+
+def _transactions(args):
+    args = {key: value for key, value in args.items() if key != 'status'}
+    clauses, params = build_filters(args)
+    # O ORDER BY usa a mesma expressão do índice idx_comissoes_status_date (migração 18).
+    clauses.insert(0, "status = 'completed'")
+    columns = ['id', 'date', 'client', 'type', 'price', 'payment_status']
+    sql = (f"SELECT {', '.join(columns)} FROM comissoes WHERE {' AND '.join(clauses)} "
+           "ORDER BY COALESCE(date, '0001-01-01'), id")
+    return columns, sql, params
+
+
+def _events(args):
+    columns = ['id', 'commission_id', 'timestamp', 'actor', 'message']
+    commission_id = args.get('commission_id')
+    if commission_id:
+        return columns, f"SELECT {', '.join(columns)} FROM commission_events WHERE commission_id = ? ORDER BY id", [commission_id]
+    return columns, f"SELECT {', '.join(columns)} FROM commission_events ORDER BY id", []
+
+
+def _messages(args):
+    columns = ['id', 'sender_name', 'sender_email', 'message_content', 'received_at', 'is_read']
+    return columns, f"SELECT {', '.join(columns)} FROM contact_messages ORDER BY id", []
+
+
+DATASETS = {
+    'comissoes': _commissions,
+    'transacoes': _transactions,
+    'eventos': _events,
+    'mensagens': _messages,
+}
+
+
+def prepare_export(dataset, fmt, args):
+    """
+    Valida o pedido antes de abrir o cursor (para a rota poder responder 400)
+    e devolve (colunas, sql, parâmetros).
+    """
+    if dataset not in DATASETS:
+        raise InvalidExport(f"Conjunto desconhecido: {dataset}. Use: {', '.join(DATASETS)}.")
+    if fmt not in FORMATS:
+        raise InvalidExport(f"Formato desconhecido: {fmt}. Use: {', '.join(FORMATS)}.")
+    try:
+        return DATASETS[dataset](args)
+    except InvalidListQuery as e:
+        raise InvalidExport(str(e))
+
+
+def iter_batches(conn, columns, sql, params):
+    """
+    Gera as linhas em lotes de EXPORT_BATCH_SIZE (listas de valores na ordem
+    de 'columns'), sem carregar o resultado inteiro. Também usado pelo feed .ics.
+    """
+    if dialect_of(conn) == POSTGRES:
+        # Cursor nomeado = cursor no servidor: cada fetchmany busca só um lote.
+        cursor = conn.cursor(name='export_cursor')
+    else:
+        cursor = conn.cursor()
+    try:
+        Query(sql).execute(conn, cursor, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield [[row[column] for column in columns] for row in rows]
+    finally:
+        cursor.close()
+        if dialect_of(conn) == POSTGRES:
+            # Encerra a transação de leitura que o cursor nomeado abriu.
+            conn.rollback()
+
+
+class _Line:
+    """Destino do csv.writer que só devolve a linha formatada."""
+
+    def write(self, value):
+        return value
+
+
+def _json_value(value):
+    return value if value is None or isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def stream_export(conn, fmt, columns, sql, params):
+    """Gerador de pedaços de texto (um por lote) no formato pedido, começando pelo cabeçalho."""
+    if fmt == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow(columns)
+        for batch in iter_batches(conn, columns, sql, params):
+            yield ''.join(writer.writerow(row) for row in batch)
+    else:
+        for batch in iter_batches(conn, columns, sql, params):
+            yield ''.join(
+                json.dumps({column: _json_value(value) for column, value in zip(columns, row)}, ensure_ascii=False) + '\n'
+                for row in batch
+            )
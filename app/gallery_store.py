@@ -0,0 +1,98 @@
+# Arquivo: app/gallery_store.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from .queries import Query
+
+# Galeria paginada por cursor (keyset) em (created_at, id), do mais novo para
+# o mais antigo. Cada página custa o mesmo, não importa quantas artes existam:
+# o índice idx_gallery_created_id leva direto ao ponto de continuação.
+
+DEFAULT_GALLERY_PAGE_SIZE = 24
+MAX_GALLERY_PAGE_SIZE = 100
+
+GALLERY_COLUMNS = """
+    g.id, g.title, g.description, g.image_url, g.is_nsfw, g.created_at,
+    g.lineart_artist_id, g.color_artist_id,
+    u1.username AS lineart_artist_name,
+    u1.social_links AS lineart_artist_socials,
+    u2.username AS color_artist_name,
+    u2.social_links AS color_artist_socials
+"""
+GALLERY_FROM = """
+    FROM gallery g
+    LEFT JOIN users u1 ON g.lineart_artist_id = u1.id
+    LEFT JOIN users u2 ON g.color_artist_id = u2.id
+"""
+GALLERY_FIRST_PAGE = Query(
+    f'SELECT {GALLERY_COLUMNS} {GALLERY_FROM} ORDER BY g.created_at DESC, g.id DESC LIMIT ?',
+    name='gallery_first_page', prepare=True
+)
+GALLERY_NEXT_PAGE = Query(
+    f'SELECT {GALLERY_COLUMNS} {GALLERY_FROM} WHERE (g.created_at, g.id) < (?, ?) ORDER BY g.created_at DESC, g.id DESC LIMIT ?',
+    name='gallery_next_page', prepare=True
+)
+
+
+class InvalidCursor(ValueError):
+    """Cursor de paginação malformado."""
+
+
+def _timestamp_text(value):
+    # PostgreSQL devolve datetime; o SQLite devolve o texto como foi gravado.
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else value
+
+
+def encode_cursor(created_at, art_id):
+    raw = json.dumps([_timestamp_text(created_at), art_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, art_id = json.loads(raw)
+        # Os valores vão direto para a comparação (created_at, id) < (?, ?):
+        # só aceita a data no formato gravado e um id inteiro.
+        datetime.fromisoformat(created_at)
+        if not isinstance(art_id, int) or isinstance(art_id, bool):
+            raise ValueError('id inválido no cursor')
+        return created_at, art_id
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def _load_socials(value):
+    try:
+        return json.loads(value) if value else []
+    except (json.JSONDecodeError, TypeError):
+        return []
+
+
+def art_to_dict(row):
+    art = dict(row)
+    art['is_nsfw'] = bool(art['is_nsfw'])
+    art['created_at'] = _timestamp_text(art['created_at'])
+    art['lineart_artist_socials'] = _load_socials(art['lineart_artist_socials'])
+    art['color_artist_socials'] = _load_socials(art['color_artist_socials'])
+    return art
+
+
+def gallery_page(conn, cursor, after=None, limit=DEFAULT_GALLERY_PAGE_SIZE):
+    """
+    Uma página da galeria: {'items', 'has_more', 'next_cursor'}.
+    'after' é o next_cursor da página anterior (ou None para a primeira).
+    """
+    limit = max(1, min(int(limit or DEFAULT_GALLERY_PAGE_SIZE), MAX_GALLERY_PAGE_SIZE))
+    if after:
+        created_at, art_id = decode_cursor(after)
+        rows = GALLERY_NEXT_PAGE.execute(conn, cursor, (created_at, art_id, limit + 1)).fetchall()
+    else:
+        rows = GALLERY_FIRST_PAGE.execute(conn, cursor, (limit + 1,)).fetchall()
+
+    has_more = len(rows) > limit
+    items = [art_to_dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(items[-1]['created_at'], items[-1]['id']) if has_more and items else None
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
@@ -0,0 +1,55 @@
+# Arquivo: app/job_lock.py
+
+import random
+import sqlite3
+from .queries import Query, dialect_of, POSTGRES
+
+# Locks entre processos para os jobs de segundo plano. Cada worker do
+# gunicorn/eventlet inicia os mesmos jobs; o lock garante que uma execução
+# (ou um lote) roda em um processo só. Os dois tipos valem até o fim da
+# transação (commit ou rollback):
+#   - PostgreSQL: advisory lock de transação (pg_advisory_xact_lock);
+#   - SQLite: BEGIN IMMEDIATE, o lock de escrita do arquivo.
+# A conexão não pode estar com uma transação aberta ao chamar.
+#
+# Chaves arbitrárias, uma por job (a das migrações fica em migrations.py).
+RETENTION_LOCK_KEY = 48151624
+RECONCILE_LOCK_KEY = 48151625
+
+# O primeiro ciclo de cada job espera o intervalo mais até esta fração dele,
+# sorteada por processo, para os workers não rodarem todos juntos no deploy.
+FIRST_RUN_JITTER = 0.1
+
+ADVISORY_LOCK = Query('SELECT pg_advisory_xact_lock(?)')
+ADVISORY_TRY_LOCK = Query('SELECT pg_try_advisory_xact_lock(?) AS locked')
+
+
+def first_run_delay(interval):
+    return interval + random.uniform(0, interval * FIRST_RUN_JITTER)
+
+
+def lock_job(conn, cursor, key):
+    """Abre a transação do job esperando a vez, se outro processo estiver com o lock."""
+    if dialect_of(conn) == POSTGRES:
+        ADVISORY_LOCK.execute(conn, cursor, (key,))
+    else:
+        cursor.execute('BEGIN IMMEDIATE')
+
+
+def try_lock_job(conn, cursor, key):
+    """
+    Como lock_job(), mas sem esperar: False se outro processo estiver com o
+    lock (no SQLite, se houver qualquer escrita em andamento).
+    """
+    if dialect_of(conn) == POSTGRES:
+        return bool(ADVISORY_TRY_LOCK.execute(conn, cursor, (key,)).fetchone()['locked'])
+    timeout = cursor.execute('PRAGMA busy_timeout').fetchone()[0]
+    cursor.execute('PRAGMA busy_timeout = 0')
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        return True
+    except sqlite3.OperationalError:
+        conn.rollback()
+        return False
+    finally:
+        cursor.execute(f'PRAGMA busy_timeout = {int(timeout)}')
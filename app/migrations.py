@@ -0,0 +1,371 @@
+# Arquivo: app/migrations.py
+
+import json
+from .queries import Query, dialect_of, POSTGRES, SQLITE
+
+# Migrações versionadas do esquema. O db_setup continua criando as tabelas
+# base com "CREATE TABLE IF NOT EXISTS"; tudo que vem depois (índices,
+# tabelas novas, backfills) entra aqui como uma migração numerada, aplicada
+# uma única vez e registrada na tabela 'schema_version'.
+#
+# Cada passo pode ser uma string SQL (igual nos dois bancos), um dict
+# {'postgres': ..., 'sqlite': ...} ou uma função python(conn, cursor, dialect).
+# NUNCA altere uma migração já publicada: crie uma nova com o próximo número.
+
+# Chave arbitrária do advisory lock do PostgreSQL, para que dois workers
+# subindo ao mesmo tempo não apliquem a mesma migração em paralelo. No SQLite
+# cada migração roda num BEGIN IMMEDIATE (lock de escrita do arquivo) e a
+# versão é conferida de novo já com o lock.
+MIGRATION_LOCK_KEY = 48151623
+
+SCHEMA_VERSION_INSERT = Query('INSERT INTO schema_version (version, description) VALUES (?, ?)')
+SCHEMA_VERSION_APPLIED = Query('SELECT 1 FROM schema_version WHERE version = ?')
+
+
+def per_dialect(sql):
+    """
+    Gera a versão de cada banco de um CREATE TABLE, trocando {autoincrement},
+    {bool_false} e {money} pela sintaxe correspondente (como no db_setup).
+    """
+    return {
+        POSTGRES: sql.format(autoincrement='SERIAL PRIMARY KEY', bool_false='FALSE', money='DOUBLE PRECISION'),
+        SQLITE: sql.format(autoincrement='INTEGER PRIMARY KEY AUTOINCREMENT', bool_false='0', money='REAL'),
+    }
+
+
+def _backfill_revenue_rollup(conn, cursor, dialect):
+    from .revenue_rollup import populate
+    populate(conn, cursor)
+
+
+def _refill_revenue_rollup(conn, cursor, dialect):
+    """Refaz o agregado de receita depois de uma migração que muda as datas das comissões."""
+    from .revenue_rollup import ROLLUP_CLEAR, CONTRIBUTIONS_CLEAR, populate
+    ROLLUP_CLEAR.execute(conn, cursor)
+    CONTRIBUTIONS_CLEAR.execute(conn, cursor)
+    populate(conn, cursor)
+
+
+def _backfill_commission_threads(conn, cursor, dialect):
+    """Copia os comentários/prévias dos blobs JSON de 'comissoes' para as tabelas filhas."""
+    from .commission_store import COMMENT_INSERT, PREVIEW_INSERT
+
+    read_cursor = conn.cursor()
+    read_cursor.execute('SELECT id, comments, preview FROM comissoes')
+    while True:
+        rows = read_cursor.fetchmany(200)
+        if not rows:
+            break
+        comments, previews = [], []
+        for row in rows:
+            try:
+                row_comments = json.loads(row['comments']) if row['comments'] else []
+            except (json.JSONDecodeError, TypeError):
+                row_comments = []
+            try:
+                row_previews = json.loads(row['preview']) if row['preview'] else []
+            except (json.JSONDecodeError, TypeError):
+                row_previews = []
+            for c in row_comments:
+                comments.append((
+                    row['id'], c.get('author'), 1 if c.get('is_artist') else 0, c.get('date'), c.get('text') or '',
+                    1 if c.get('is_revision_request') else 0, c.get('phase_name')
+                ))
+            for index, p in enumerate(row_previews):
+                previews.append((row['id'], p.get('version') or f"{index + 1}.0", p.get('date'), p.get('url'), p.get('comment', '')))
+        if comments:
+            COMMENT_INSERT.executemany(conn, cursor, comments)
+        if previews:
+            PREVIEW_INSERT.executemany(conn, cursor, previews)
+    read_cursor.close()
+
+
+def _backfill_commission_events(conn, cursor, dialect):
+    """Copia o histórico do blob comissoes.event_log para commission_events."""
+    from .commission_store import EVENT_INSERT
+
+    read_cursor = conn.cursor()
+    read_cursor.execute('SELECT id, event_log FROM comissoes')
+    while True:
+        rows = read_cursor.fetchmany(200)
+        if not rows:
+            break
+        events = []
+        for row in rows:
+            try:
+                row_events = json.loads(row['event_log']) if row['event_log'] else []
+            except (json.JSONDecodeError, TypeError):
+                row_events = []
+            for e in row_events:
+                events.append((row['id'], e.get('timestamp'), e.get('actor'), e.get('message') or ''))
+        if events:
+            EVENT_INSERT.executemany(conn, cursor, events)
+    read_cursor.close()
+
+
+def _backfill_commission_artists(conn, cursor, dialect):
+    """Preenche commission_artists a partir de comissoes.assigned_artist_ids (JSON)."""
+    from .commission_store import assign_artists
+
+    read_cursor = conn.cursor()
+    read_cursor.execute('SELECT id, assigned_artist_ids FROM comissoes WHERE assigned_artist_ids IS NOT NULL')
+    while True:
+        rows = read_cursor.fetchmany(200)
+        if not rows:
+            break
+        for row in rows:
+            try:
+                artist_ids = json.loads(row['assigned_artist_ids']) if row['assigned_artist_ids'] else []
+            except (json.JSONDecodeError, TypeError):
+                artist_ids = []
+            assign_artists(conn, cursor, row['id'], artist_ids)
+    read_cursor.close()
+
+
+class Migration:
+    def __init__(self, version, description, steps):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+
+MIGRATIONS = [
+    Migration(1, 'Índice de comissões por cliente e data', [
+        'CREATE INDEX IF NOT EXISTS idx_comissoes_client_date ON comissoes (client_id, date)',
+    ]),
+    Migration(2, 'Índices de notificações (lista por usuário e não lidas)', [
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_timestamp ON notifications (user_id, timestamp)',
+        # Parciais: só as não lidas entram no índice, que fica pequeno.
+        'CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications (user_id) WHERE is_read = 0',
+        'CREATE INDEX IF NOT EXISTS idx_notifications_admin_unread ON notifications (id) WHERE user_id IS NULL AND is_read = 0',
+    ]),
+    Migration(3, 'Índice da galeria por data de criação', [
+        'CREATE INDEX IF NOT EXISTS idx_gallery_created_at ON gallery (created_at)',
+    ]),
+    Migration(4, 'Índice de plugin_data por usuário e chave (busca por prefixo)', [{
+        # text_pattern_ops permite usar o índice em "key LIKE 'public_%'" no PostgreSQL;
+        # no SQLite a otimização de LIKE exige a collation NOCASE.
+        POSTGRES: 'CREATE INDEX IF NOT EXISTS idx_plugin_data_user_key ON plugin_data (user_id, key text_pattern_ops)',
+        SQLITE: 'CREATE INDEX IF NOT EXISTS idx_plugin_data_user_key ON plugin_data (user_id, key COLLATE NOCASE)',
+    }]),
+    Migration(5, 'Índice de usuários por nome em minúsculas', [
+        'CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users (LOWER(username))',
+    ]),
+    Migration(6, 'Tabelas filhas de comentários e prévias das comissões', [
+        per_dialect('''
+        CREATE TABLE IF NOT EXISTS commission_comments (
+            id {autoincrement}, commission_id TEXT NOT NULL, author TEXT, is_artist INTEGER NOT NULL DEFAULT 0,
+            date TEXT, text TEXT NOT NULL, is_revision_request INTEGER NOT NULL DEFAULT 0, phase_name TEXT
+        )'''),
+        'CREATE INDEX IF NOT EXISTS idx_commission_comments_commission ON commission_comments (commission_id, id)',
+        per_dialect('''
+        CREATE TABLE IF NOT EXISTS commission_previews (
+            id {autoincrement}, commission_id TEXT NOT NULL, version TEXT, date TEXT, url TEXT, comment TEXT
+        )'''),
+        'CREATE INDEX IF NOT EXISTS idx_commission_previews_commission ON commission_previews (commission_id, id)',
+    ]),
+    # As colunas comissoes.comments/preview ficam congeladas com o histórico
+    # antigo (útil para rollback); a partir daqui a fonte da verdade são as tabelas filhas.
+    Migration(7, 'Backfill de comentários e prévias a partir do JSON', [
+        _backfill_commission_threads,
+    ]),
+    Migration(8, 'Tabela append-only de eventos das comissões', [
+        per_dialect('''
+        CREATE TABLE IF NOT EXISTS commission_events (
+            id {autoincrement}, commission_id TEXT NOT NULL, timestamp TEXT, actor TEXT, message TEXT NOT NULL
+        )'''),
+        'CREATE INDEX IF NOT EXISTS idx_commission_events_commission ON commission_events (commission_id, id)',
+    ]),
+    # Mesma estratégia da migração 7: comissoes.event_log fica congelado.
+    Migration(9, 'Backfill de eventos a partir do JSON', [
+        _backfill_commission_events,
+    ]),
+    # Contadores de versão para invalidar caches em todos os workers.
+    Migration(10, 'Tabela de versões de cache', [
+        'CREATE TABLE IF NOT EXISTS cache_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)',
+        "INSERT INTO cache_versions (name, version) VALUES ('settings', 1)",
+    ]),
+    # Substitui o índice da migração 3: a paginação por cursor ordena por (created_at, id).
+    Migration(11, 'Índice da galeria para paginação por cursor', [
+        'CREATE INDEX IF NOT EXISTS idx_gallery_created_id ON gallery (created_at, id)',
+        'DROP INDEX IF EXISTS idx_gallery_created_at',
+    ]),
+    # Listagem do painel (commission_list): as expressões dos índices são as
+    # mesmas do ORDER BY/cursor, para que o banco pagine direto pelo índice.
+    Migration(12, 'Índices e tabela de artistas para a listagem de comissões', [
+        "CREATE INDEX IF NOT EXISTS idx_comissoes_date_sort ON comissoes ((COALESCE(date, '')), id)",
+        "CREATE INDEX IF NOT EXISTS idx_comissoes_status_date ON comissoes (status, (COALESCE(date, '')), id)",
+        '''CREATE TABLE IF NOT EXISTS commission_artists (
+            commission_id TEXT NOT NULL, artist_id INTEGER NOT NULL, PRIMARY KEY (commission_id, artist_id)
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_commission_artists_artist ON commission_artists (artist_id, commission_id)',
+        _backfill_commission_artists,
+    ]),
+    # Sincronização incremental (commission_sync): versão por linha, contador
+    # global em cache_versions e lápides para as exclusões.
+    Migration(13, 'Versão por linha e lápides das comissões', [
+        {
+            POSTGRES: 'ALTER TABLE comissoes ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0',
+            SQLITE: 'ALTER TABLE comissoes ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0',
+        },
+        'CREATE INDEX IF NOT EXISTS idx_comissoes_row_version ON comissoes (row_version)',
+        '''CREATE TABLE IF NOT EXISTS commission_tombstones (
+            row_version BIGINT PRIMARY KEY, commission_id TEXT NOT NULL,
+            deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        "INSERT INTO cache_versions (name, version) VALUES ('commission_rows', 0)",
+    ]),
+    Migration(14, 'Contadores materializados de notificações não lidas', [
+        'CREATE TABLE IF NOT EXISTS notification_counters (owner_id INTEGER PRIMARY KEY, unread INTEGER NOT NULL DEFAULT 0)',
+        'INSERT INTO notification_counters (owner_id, unread) '
+        'SELECT COALESCE(user_id, 0), COUNT(*) FROM notifications WHERE is_read = 0 GROUP BY COALESCE(user_id, 0)',
+    ]),
+    Migration(15, 'Índice de notificações por usuário, leitura e comissão', [
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_read_commission ON notifications (user_id, is_read, related_commission_id)',
+    ]),
+    Migration(16, 'Listagem de notificações por id e arquivo das antigas', [
+        # A listagem passou a ser por id (keyset); o índice por timestamp sai.
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications (user_id, id)',
+        'DROP INDEX IF EXISTS idx_notifications_user_timestamp',
+        'CREATE INDEX IF NOT EXISTS idx_notifications_read_timestamp ON notifications (timestamp) WHERE is_read = 1',
+        '''CREATE TABLE IF NOT EXISTS notifications_archive (
+            id INTEGER PRIMARY KEY, user_id INTEGER, message TEXT NOT NULL, is_read INTEGER NOT NULL DEFAULT 1,
+            timestamp TIMESTAMP, related_commission_id TEXT, archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_notifications_archive_user ON notifications_archive (user_id, id)',
+    ]),
+    Migration(17, 'Receita mensal pré-agregada das comissões concluídas', [
+        per_dialect('''CREATE TABLE IF NOT EXISTS revenue_monthly (
+            month TEXT NOT NULL, type TEXT NOT NULL, artist_id INTEGER NOT NULL,
+            revenue {money} NOT NULL DEFAULT 0, commissions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, type, artist_id)
+        )'''),
+        per_dialect('''CREATE TABLE IF NOT EXISTS revenue_contributions (
+            commission_id TEXT PRIMARY KEY, month TEXT NOT NULL, type TEXT NOT NULL,
+            price {money} NOT NULL, artist_ids TEXT NOT NULL DEFAULT ''
+        )'''),
+        _backfill_revenue_rollup,
+    ]),
+    # date/deadline viram DATE no PostgreSQL. O SQLite não tem tipo de data
+    # (datas são texto ISO 8601, que ordena certo), então lá só normalizamos
+    # os valores para o mesmo formato. Vazio, fora do padrão AAAA-MM-DD ou
+    # data impossível (ex.: 2024-13-40, 2023-02-30) vira NULL nos dois bancos;
+    # no PostgreSQL um CAST inválido abortaria a migração (e a inicialização),
+    # por isso a conversão passa por uma função temporária que devolve NULL
+    # em vez de erro. Os índices por expressão da migração 12 usavam COALESCE(date, ''),
+    # que não é válido numa coluna DATE: são recriados com '0001-01-01', que
+    # continua ordenando antes de qualquer data real.
+    Migration(18, 'Colunas de data tipadas e índices por data/prazo das comissões', [
+        'DROP INDEX IF EXISTS idx_comissoes_date_sort',
+        'DROP INDEX IF EXISTS idx_comissoes_status_date',
+        {
+            POSTGRES: '''CREATE OR REPLACE FUNCTION pg_temp.try_iso_date(value TEXT) RETURNS DATE AS $$
+                BEGIN
+                    IF value ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' THEN
+                        RETURN CAST(SUBSTR(value, 1, 10) AS DATE);
+                    END IF;
+                    RETURN NULL;
+                EXCEPTION WHEN invalid_datetime_format OR datetime_field_overflow THEN
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql''',
+        },
+        {
+            POSTGRES: '''ALTER TABLE comissoes
+                ALTER COLUMN date TYPE DATE USING pg_temp.try_iso_date(date),
+                ALTER COLUMN deadline TYPE DATE USING pg_temp.try_iso_date(deadline)''',
+            # date(..., '+0 days') normaliza datas impossíveis (2023-02-30 -> 2023-03-02)
+            # e devolve NULL fora do formato; só fica o valor que volta igual.
+            SQLITE: "UPDATE comissoes SET "
+                    "date = CASE WHEN date(SUBSTR(date, 1, 10), '+0 days') = SUBSTR(date, 1, 10) THEN SUBSTR(date, 1, 10) END, "
+                    "deadline = CASE WHEN date(SUBSTR(deadline, 1, 10), '+0 days') = SUBSTR(deadline, 1, 10) THEN SUBSTR(deadline, 1, 10) END",
+        },
+        {POSTGRES: 'DROP FUNCTION IF EXISTS pg_temp.try_iso_date(TEXT)'},
+        "CREATE INDEX IF NOT EXISTS idx_comissoes_date_sort ON comissoes ((COALESCE(date, '0001-01-01')), id)",
+        "CREATE INDEX IF NOT EXISTS idx_comissoes_status_date ON comissoes (status, (COALESCE(date, '0001-01-01')), id)",
+        "CREATE INDEX IF NOT EXISTS idx_comissoes_deadline_sort ON comissoes ((COALESCE(deadline, '0001-01-01')), id)",
+        _refill_revenue_rollup,
+    ]),
+    # Agenda por intervalo de prazo (app/agenda.py). Parcial: só as comissões
+    # em aberto entram no índice, então a busca por prazo não passa pelas
+    # concluídas/canceladas, que são a maior parte da tabela com o tempo.
+    Migration(19, 'Índice de prazos da agenda e tokens do feed .ics', [
+        "CREATE INDEX IF NOT EXISTS idx_comissoes_open_deadline ON comissoes (deadline, id) WHERE status NOT IN ('completed', 'cancelled')",
+        '''CREATE TABLE IF NOT EXISTS calendar_feeds (
+            user_id INTEGER PRIMARY KEY, token TEXT NOT NULL UNIQUE, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+    ]),
+]
+
+
+def _ensure_version_table(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY, description TEXT, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+
+def _run_step(conn, cursor, dialect, step):
+    if callable(step):
+        step(conn, cursor, dialect)
+    elif isinstance(step, dict):
+        if step.get(dialect):
+            cursor.execute(step[dialect])
+    else:
+        cursor.execute(step)
+
+
+def get_schema_version(conn):
+    cursor = conn.cursor()
+    _ensure_version_table(cursor)
+    cursor.execute('SELECT MAX(version) AS version FROM schema_version')
+    row = cursor.fetchone()
+    cursor.close()
+    return (row['version'] if row else None) or 0
+
+
+def run_migrations(conn, migrations=MIGRATIONS):
+    """Aplica, em ordem, as migrações ainda não registradas em schema_version."""
+    dialect = dialect_of(conn)
+    cursor = conn.cursor()
+    applied_now = []
+    try:
+        _ensure_version_table(cursor)
+        conn.commit()
+
+        if dialect == POSTGRES:
+            cursor.execute('SELECT pg_advisory_lock(%s)', (MIGRATION_LOCK_KEY,))
+
+        cursor.execute('SELECT version FROM schema_version')
+        applied = {row['version'] for row in cursor.fetchall()}
+
+        for migration in sorted(migrations, key=lambda m: m.version):
+            if migration.version in applied:
+                continue
+            try:
+                if dialect == SQLITE:
+                    cursor.execute('BEGIN IMMEDIATE')
+                    if SCHEMA_VERSION_APPLIED.execute(conn, cursor, (migration.version,)).fetchone():
+                        # Outro processo aplicou enquanto esperávamos o lock.
+                        conn.commit()
+                        continue
+                print(f"Aplicando migração {migration.version}: {migration.description}...")
+                for step in migration.steps:
+                    _run_step(conn, cursor, dialect, step)
+                SCHEMA_VERSION_INSERT.execute(conn, cursor, (migration.version, migration.description))
+                conn.commit()
+                applied_now.append(migration.version)
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        if dialect == POSTGRES:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', (MIGRATION_LOCK_KEY,))
+            conn.commit()
+        cursor.close()
+
+    if applied_now:
+        print(f"Migrações aplicadas: {applied_now}")
+    else:
+        print("Esquema já está na versão mais recente.")
+    return applied_now
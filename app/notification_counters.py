@@ -0,0 +1,151 @@
+# Arquivo: app/notification_counters.py
+
+import os
+from .queries import Query, POSTGRES, SQLITE
+from .job_lock import try_lock_job, first_run_delay, RECONCILE_LOCK_KEY
+
+# Contadores materializados de notificações não lidas, um por "caixa":
+# owner_id = id do usuário, ou 0 para a caixa compartilhada do painel
+# (notificações com user_id NULL). Inserir uma notificação soma 1 na mesma
+# transação; marcar como lidas subtrai o número de linhas que o UPDATE
+# realmente alterou. Assim o badge é uma leitura pela chave primária em vez
+# de um COUNT na tabela de notificações, e o valor vai junto nos eventos do
+# Socket.IO (ver realtime.py).
+#
+# Um job de reconciliação (reconcile) recalcula tudo de tempos em tempos e
+# corrige o que tiver divergido (ex.: escrita manual no banco). Todo worker
+# inicia o job, mas só um processo por vez recalcula: quem não consegue o
+# lock do job (job_lock.py) pula a rodada.
+
+ADMIN_INBOX = 0
+# Intervalo do job de reconciliação em segundos; 0 desliga.
+DEFAULT_RECONCILE_INTERVAL = 3600
+
+COUNTER_SELECT = Query('SELECT unread FROM notification_counters WHERE owner_id = ?', name='notification_counter_select', prepare=True)
+# Caixa do painel + caixa do dono da comissão, numa leitura só.
+COUNTERS_FOR_COMMISSION = Query(
+    'SELECT owner_id, unread FROM notification_counters WHERE owner_id IN (0, (SELECT client_id FROM comissoes WHERE id = ?))',
+    name='notification_counters_for_commission', prepare=True
+)
+COUNTER_INCREMENT = Query(
+    'INSERT INTO notification_counters (owner_id, unread) VALUES (?, 1) '
+    'ON CONFLICT (owner_id) DO UPDATE SET unread = notification_counters.unread + 1',
+    name='notification_counter_increment', prepare=True
+)
+# Mesma condição do USER_NOTIFICATION_INSERT (utils.py): só conta o que foi gravado.
+USER_COUNTER_INCREMENT = Query(
+    'INSERT INTO notification_counters (owner_id, unread) '
+    'SELECT id, 1 FROM users WHERE id = ? AND notify_on_site = 1 '
+    'ON CONFLICT (owner_id) DO UPDATE SET unread = notification_counters.unread + 1',
+    name='user_notification_counter_increment', prepare=True
+)
+COUNTER_DECREMENT = Query(
+    'UPDATE notification_counters SET unread = CASE WHEN unread > ? THEN unread - ? ELSE 0 END WHERE owner_id = ?',
+    name='notification_counter_decrement', prepare=True
+)
+COUNTER_DELETE = Query('DELETE FROM notification_counters WHERE owner_id = ?')
+COUNTER_UPSERT = Query(
+    'INSERT INTO notification_counters (owner_id, unread) VALUES (?, ?) '
+    'ON CONFLICT (owner_id) DO UPDATE SET unread = excluded.unread'
+)
+COUNTERS_ALL = Query('SELECT owner_id, unread FROM notification_counters')
+UNREAD_BY_OWNER = Query(
+    'SELECT COALESCE(user_id, 0) AS owner_id, COUNT(*) AS unread FROM notifications WHERE is_read = 0 GROUP BY COALESCE(user_id, 0)'
+)
+# Trava os contadores durante a reconciliação: quem grava notificações
+# espera, e o recálculo não perde nem conta em dobro o que entra no meio.
+# No SQLite qualquer escrita já pega o lock de escrita do arquivo.
+COUNTERS_LOCK = Query({
+    POSTGRES: 'LOCK TABLE notification_counters IN SHARE ROW EXCLUSIVE MODE',
+    SQLITE: 'DELETE FROM notification_counters WHERE owner_id < 0',
+})
+
+
+def owner_of(user_id):
+    return ADMIN_INBOX if user_id is None else user_id
+
+
+def increment(conn, user_id):
+    """Soma 1 na caixa; vai para a fila da conexão junto com o INSERT da notificação."""
+    if user_id is None:
+        query, params = COUNTER_INCREMENT, (ADMIN_INBOX,)
+    else:
+        query, params = USER_COUNTER_INCREMENT, (user_id,)
+    if hasattr(conn, 'defer'):
+        conn.defer(query, params)
+    else:
+        cursor = conn.cursor()
+        query.execute(conn, cursor, params)
+        cursor.close()
+
+
+def decrement(conn, cursor, user_id, count):
+    """Subtrai 'count' (o rowcount do UPDATE que marcou como lidas), sem passar de zero."""
+    if count and count > 0:
+        COUNTER_DECREMENT.execute(conn, cursor, (count, count, owner_of(user_id)))
+
+
+def forget(conn, cursor, user_id):
+    """Remove o contador de um usuário excluído."""
+    COUNTER_DELETE.execute(conn, cursor, (user_id,))
+
+
+def unread_count(conn, cursor, user_id):
+    row = COUNTER_SELECT.execute(conn, cursor, (owner_of(user_id),)).fetchone()
+    return row['unread'] if row else 0
+
+
+def counts_for_commission(conn, cursor, commission_id):
+    """(não lidas do painel, não lidas do dono da comissão)."""
+    counts = {row['owner_id']: row['unread'] for row in COUNTERS_FOR_COMMISSION.execute(conn, cursor, (commission_id,)).fetchall()}
+    admin = counts.pop(ADMIN_INBOX, 0)
+    return admin, next(iter(counts.values()), 0)
+
+
+def reconcile(conn):
+    """
+    Recalcula os contadores a partir da tabela de notificações e corrige os
+    que divergiram. Devolve quantos foram corrigidos, ou None se outro
+    processo estava reconciliando (ou, no SQLite, gravando) e a rodada foi pulada.
+    """
+    cursor = conn.cursor()
+    try:
+        if not try_lock_job(conn, cursor, RECONCILE_LOCK_KEY):
+            return None
+        COUNTERS_LOCK.execute(conn, cursor)
+        actual = {row['owner_id']: row['unread'] for row in UNREAD_BY_OWNER.execute(conn, cursor).fetchall()}
+        stored = {row['owner_id']: row['unread'] for row in COUNTERS_ALL.execute(conn, cursor).fetchall()}
+        fixes = [(owner, actual.get(owner, 0)) for owner in set(actual) | set(stored)
+                 if actual.get(owner, 0) != stored.get(owner, 0)]
+        if fixes:
+            COUNTER_UPSERT.executemany(conn, cursor, fixes)
+        conn.commit()
+        return len(fixes)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def start_reconcile_job(app, socketio):
+    """Roda reconcile() em segundo plano a cada NOTIFICATION_RECONCILE_INTERVAL segundos."""
+    interval = int(os.environ.get('NOTIFICATION_RECONCILE_INTERVAL', DEFAULT_RECONCILE_INTERVAL))
+    if interval <= 0:
+        return
+
+    def job():
+        from .utils import get_db_connection
+        delay = first_run_delay(interval)
+        while True:
+            socketio.sleep(delay)
+            delay = interval
+            try:
+                with app.app_context():
+                    fixed = reconcile(get_db_connection())
+                if fixed:
+                    print(f"Contadores de notificações reconciliados: {fixed} corrigido(s).")
+            except Exception as e:
+                print(f"Erro ao reconciliar contadores de notificações: {e}")
+
+    socketio.start_background_task(job)
@@ -0,0 +1,139 @@
+# Arquivo: app/notification_history.py
+
+import os
+import time
+from datetime import datetime, timedelta
+from .queries import Query
+from .job_lock import lock_job, first_run_delay, RETENTION_LOCK_KEY
+
+# Histórico de notificações: listagem paginada por id (keyset, ?before=) e
+# retenção. As notificações LIDAS mais velhas que NOTIFICATION_RETENTION_DAYS
+# são copiadas para notifications_archive e apagadas da tabela principal, em
+# lotes pequenos (uma transação curta por lote), para a tabela quente não
+# crescer para sempre. Não lidas nunca são arquivadas, então os contadores
+# de notification_counters não mudam.
+#
+# A retenção apaga dados dos usuários, então só liga quando
+# NOTIFICATION_RETENTION_DAYS é definido. Todo worker inicia o job, mas cada
+# lote roda com o lock do job (job_lock.py) e escolhe os ids já com o lock:
+# dois processos nunca pegam o mesmo lote, e a cópia ignora ids que já
+# estejam no arquivo.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+DEFAULT_RETENTION_DAYS = 0  # desligada
+DEFAULT_RETENTION_BATCH = 500
+DEFAULT_RETENTION_INTERVAL = 86400
+# Pausa entre lotes: deixa as requisições gravarem entre uma transação e outra.
+RETENTION_PAUSE_SECONDS = 0.05
+
+# O id cresce com a inserção, então "mais recente primeiro" é id DESC e o
+# cursor é só o último id visto (índice (user_id, id), migração 16).
+ADMIN_LATEST = Query(
+    'SELECT * FROM notifications WHERE user_id IS NULL ORDER BY id DESC LIMIT ?',
+    name='admin_notifications_latest', prepare=True
+)
+ADMIN_BEFORE = Query(
+    'SELECT * FROM notifications WHERE user_id IS NULL AND id < ? ORDER BY id DESC LIMIT ?',
+    name='admin_notifications_before', prepare=True
+)
+USER_LATEST = Query(
+    'SELECT * FROM notifications WHERE user_id = ? ORDER BY id DESC LIMIT ?',
+    name='user_notifications_latest', prepare=True
+)
+USER_BEFORE = Query(
+    'SELECT * FROM notifications WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?',
+    name='user_notifications_before', prepare=True
+)
+
+EXPIRED_BATCH = Query('SELECT id FROM notifications WHERE is_read = 1 AND timestamp < ? ORDER BY timestamp LIMIT ?')
+ARCHIVE_COLUMNS = 'id, user_id, message, is_read, timestamp, related_commission_id'
+ARCHIVE_INSERT_SQL = (
+    f'INSERT INTO notifications_archive ({ARCHIVE_COLUMNS}) '
+    f'SELECT {ARCHIVE_COLUMNS} FROM notifications WHERE id IN ({{placeholders}}) '
+    'ON CONFLICT (id) DO NOTHING'
+)
+
+
+def notifications_page(conn, cursor, user_id=None, before=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Notificações do usuário (None = painel), mais recentes primeiro:
+    {'items', 'has_more', 'next_cursor': {'before': id} ou None}.
+    """
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    if user_id is None:
+        if before is not None:
+            rows = ADMIN_BEFORE.execute(conn, cursor, (int(before), limit + 1)).fetchall()
+        else:
+            rows = ADMIN_LATEST.execute(conn, cursor, (limit + 1,)).fetchall()
+    else:
+        if before is not None:
+            rows = USER_BEFORE.execute(conn, cursor, (user_id, int(before), limit + 1)).fetchall()
+        else:
+            rows = USER_LATEST.execute(conn, cursor, (user_id, limit + 1)).fetchall()
+
+    has_more = len(rows) > limit
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = {'before': items[-1]['id']} if has_more and items else None
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
+
+
+def archive_expired(conn, days, batch_size=DEFAULT_RETENTION_BATCH, sleep=time.sleep):
+    """
+    Arquiva e apaga, em lotes, as notificações lidas com mais de 'days' dias.
+    Cada lote é uma transação própria, com o lock do job. Devolve quantas
+    foram arquivadas.
+    """
+    cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    total = 0
+    cursor = conn.cursor()
+    try:
+        while True:
+            lock_job(conn, cursor, RETENTION_LOCK_KEY)
+            ids = [row['id'] for row in EXPIRED_BATCH.execute(conn, cursor, (cutoff, batch_size)).fetchall()]
+            if not ids:
+                conn.commit()
+                break
+            placeholders = ', '.join(['?'] * len(ids))
+            Query(ARCHIVE_INSERT_SQL.format(placeholders=placeholders)).execute(conn, cursor, ids)
+            Query(f'DELETE FROM notifications WHERE is_read = 1 AND id IN ({placeholders})').execute(conn, cursor, ids)
+            conn.commit()
+            total += len(ids)
+            if len(ids) < batch_size:
+                break
+            sleep(RETENTION_PAUSE_SECONDS)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return total
+
+
+def start_retention_job(app, socketio):
+    """
+    Roda archive_expired() em segundo plano a cada NOTIFICATION_RETENTION_INTERVAL
+    segundos, a primeira vez só depois de um intervalo. Só liga com
+    NOTIFICATION_RETENTION_DAYS maior que 0; intervalo 0 também desliga.
+    """
+    days = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', DEFAULT_RETENTION_DAYS))
+    interval = int(os.environ.get('NOTIFICATION_RETENTION_INTERVAL', DEFAULT_RETENTION_INTERVAL))
+    batch_size = int(os.environ.get('NOTIFICATION_RETENTION_BATCH', DEFAULT_RETENTION_BATCH))
+    if days <= 0 or interval <= 0:
+        return
+
+    def job():
+        from .utils import get_db_connection
+        socketio.sleep(first_run_delay(interval))
+        while True:
+            try:
+                with app.app_context():
+                    archived = archive_expired(get_db_connection(), days, max(1, batch_size), sleep=socketio.sleep)
+                if archived:
+                    print(f"Notificações arquivadas (lidas há mais de {days} dias): {archived}.")
+            except Exception as e:
+                print(f"Erro ao arquivar notificações antigas: {e}")
+            socketio.sleep(interval)
+
+    socketio.start_background_task(job)
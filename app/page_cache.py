@@ -0,0 +1,133 @@
+# Arquivo: app/page_cache.py
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, session, make_response, g
+from .queries import Query
+from .utils import get_db_connection
+
+# Cache de páginas públicas já renderizadas, só para visitantes anônimos.
+# A chave de validade é a "versão do conteúdo": as versões de 'settings',
+# 'plugins' e 'public_content' em cache_versions (incrementadas por quem
+# grava configurações, plugins, galeria ou perfis). Além disso cada página
+# expira depois de PAGE_CACHE_TTL segundos (padrão 60; 0 desliga o cache),
+# cobrindo mudanças feitas por fora da API (ex.: manage_admin.py).
+#
+# Em um pico de acessos só a primeira requisição renderiza; as outras
+# esperam pelo lock da página e recebem o resultado. Navegadores recebem
+# ETag/Last-Modified e, na revalidação, um 304 sem corpo.
+
+PUBLIC_CONTENT_VERSION_KEY = 'public_content'
+PAGE_VERSION_KEYS = ('settings', 'plugins', PUBLIC_CONTENT_VERSION_KEY)
+DEFAULT_PAGE_CACHE_TTL = 60
+
+CONTENT_VERSIONS = Query(
+    f"SELECT name, version FROM cache_versions WHERE name IN ({', '.join(['?'] * len(PAGE_VERSION_KEYS))})",
+    name='content_versions', prepare=True
+)
+
+_pages = {}
+_page_locks = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'bypass': 0}
+
+
+def _ttl():
+    return float(os.environ.get('PAGE_CACHE_TTL', DEFAULT_PAGE_CACHE_TTL))
+
+
+def _count(stat):
+    with _lock:
+        _stats[stat] += 1
+
+
+def content_version():
+    """Tupla com as versões que afetam as páginas públicas (lida uma vez por requisição)."""
+    if '_content_version' not in g:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        rows = CONTENT_VERSIONS.execute(conn, cursor, PAGE_VERSION_KEYS).fetchall()
+        cursor.close()
+        conn.close()
+        versions = {row['name']: row['version'] for row in rows}
+        g._content_version = tuple(versions.get(key, 0) for key in PAGE_VERSION_KEYS)
+    return g._content_version
+
+
+def _is_cacheable():
+    # Usuário logado vê avatar/menus próprios; mensagens flash são de uma pessoa só.
+    return request.method in ('GET', 'HEAD') and 'user_id' not in session and not session.get('_flashes')
+
+
+def _page_lock(key):
+    with _lock:
+        lock = _page_locks.get(key)
+        if lock is None:
+            lock = _page_locks[key] = threading.Lock()
+        return lock
+
+
+def _fresh(entry, version):
+    return entry is not None and entry['version'] == version and time.monotonic() - entry['created'] < _ttl()
+
+
+def _respond(entry):
+    response = make_response(entry['body'], 200)
+    response.mimetype = entry['mimetype']
+    response.set_etag(entry['etag'])
+    response.last_modified = entry['last_modified']
+    response.headers['Cache-Control'] = 'public, no-cache'
+    response.vary.add('Cookie')
+    response.make_conditional(request)
+    if response.status_code == 304:
+        _count('not_modified')
+    return response
+
+
+def cached_page(view):
+    """Decorator para views públicas cujo HTML só depende da versão do conteúdo."""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        if _ttl() <= 0 or not _is_cacheable():
+            _count('bypass')
+            return view(*args, **kwargs)
+
+        key = request.path
+        version = content_version()
+        entry = _pages.get(key)
+        if _fresh(entry, version):
+            _count('hits')
+            return _respond(entry)
+
+        with _page_lock(key):
+            entry = _pages.get(key)
+            if _fresh(entry, version):
+                _count('hits')
+                return _respond(entry)
+
+            _count('misses')
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough or session.modified:
+                return response
+
+            body = response.get_data()
+            entry = {
+                'body': body, 'mimetype': response.mimetype, 'version': version, 'created': time.monotonic(),
+                'etag': hashlib.md5(body).hexdigest(),
+                'last_modified': datetime.now(timezone.utc).replace(microsecond=0),
+            }
+            _pages[key] = entry
+            return _respond(entry)
+    return decorated_function
+
+
+def page_cache_stats():
+    with _lock:
+        stats = dict(_stats)
+    stats['pages'] = sorted(_pages.keys())
+    stats['ttl'] = _ttl()
+    return stats
@@ -1,70 +1,54 @@
 # --- Código modificado para: app/public/routes.py ---
 
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, Response, render_template, request, jsonify, flash, redirect, url_for, stream_with_context
 from app.utils import get_db_connection, add_notification
-from app import socketio
+from app.realtime import emit_to_admins
 import json
 from app.telegram_utils import send_telegram_message
+from app.settings_cache import get_raw_settings, get_settings
+from app.page_cache import cached_page
+from app.gallery_store import gallery_page, InvalidCursor
+from app import agenda
 
 # Cria o Blueprint para as rotas públicas
 public_bp = Blueprint('public', __name__, template_folder='../../templates')
 
 
 @public_bp.route('/')
+@cached_page
 def home():
+    # Só a primeira página vem renderizada; o resto chega por /api/gallery no scroll.
     conn = get_db_connection()
     cursor = conn.cursor()
-
-    # Query complexa para buscar a arte e os dados dos artistas associados
-    query = """
-        SELECT 
-            g.id, g.title, g.description, g.image_url, g.is_nsfw,
-            g.lineart_artist_id, g.color_artist_id,
-            u1.username AS lineart_artist_name,
-            u1.social_links AS lineart_artist_socials,
-            u2.username AS color_artist_name,
-            u2.social_links AS color_artist_socials
-        FROM 
-            gallery g
-        LEFT JOIN 
-            users u1 ON g.lineart_artist_id = u1.id
-        LEFT JOIN 
-            users u2 ON g.color_artist_id = u2.id
-        ORDER BY 
-            g.created_at DESC
-    """
-    cursor.execute(query)
-    arts_db = cursor.fetchall()
+    page = gallery_page(conn, cursor)
     cursor.close()
     conn.close()
 
-    # Processa os resultados para converter o JSON das redes sociais em listas
-    arts = []
-    for row in arts_db:
-        art = dict(row)
-        try:
-            art['lineart_artist_socials'] = json.loads(art['lineart_artist_socials']) if art['lineart_artist_socials'] else []
-        except (json.JSONDecodeError, TypeError):
-            art['lineart_artist_socials'] = []
-        
-        try:
-            art['color_artist_socials'] = json.loads(art['color_artist_socials']) if art['color_artist_socials'] else []
-        except (json.JSONDecodeError, TypeError):
-            art['color_artist_socials'] = []
-            
-        arts.append(art)
+    return render_template('index.html', arts=page['items'], next_cursor=page['next_cursor'])
 
-    return render_template('index.html', arts=arts)
+
+@public_bp.route('/api/gallery')
+def gallery_feed():
+    """Galeria paginada por cursor: ?cursor=<next_cursor da página anterior>&limit=."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        page = gallery_page(conn, cursor, after=request.args.get('cursor'), limit=request.args.get('limit', type=int))
+        return jsonify(page)
+    except InvalidCursor:
+        return jsonify({'success': False, 'message': 'Cursor inválido.'}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
 
 @public_bp.route('/artistas')
+@cached_page
 def artistas():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute('SELECT key, value FROM settings')
-    settings_db = cursor.fetchall()
-    settings = {row['key']: row['value'] for row in settings_db}
+    settings = get_raw_settings(conn)
     site_mode = settings.get('site_mode', 'individual')
     
     artists = []
@@ -103,6 +87,7 @@ def artistas():
 
 # --- INÍCIO DA MODIFICAÇÃO: Rota 'sobre' simplificada ---
 @public_bp.route('/sobre')
+@cached_page
 def sobre():
     """ 
     Renderiza a página 'Sobre'. 
@@ -178,21 +163,15 @@ def handle_contact_form():
         query_insert = f'INSERT INTO contact_messages (sender_name, sender_email, message_content) VALUES ({placeholder}, {placeholder}, {placeholder})'
         cursor.execute(query_insert, (name, email, message))
         
-        keys_to_fetch = ['TELEGRAM_ENABLED', 'TELEGRAM_TEMPLATE_CONTACT']
-        placeholders_settings = ','.join([placeholder] * len(keys_to_fetch))
-        query_settings = f"SELECT key, value FROM settings WHERE key IN ({placeholders_settings})"
-        cursor.execute(query_settings, tuple(keys_to_fetch))
-        settings_db = cursor.fetchall()
-        
-        settings = {row['key']: row['value'] for row in settings_db}
+        settings = get_settings(conn)
         
+        notification_message = f"Nova mensagem de contato de {name}."
+        add_notification(notification_message, conn=conn)
         conn.commit()
         cursor.close()
         conn.close()
         
-        notification_message = f"Nova mensagem de contato de {name}."
-        add_notification(notification_message)
-        socketio.emit('new_message', {
+        emit_to_admins('new_message', {
             'message_for_admin': notification_message
         })
 
@@ -200,7 +179,8 @@ def handle_contact_form():
             template = settings.get('TELEGRAM_TEMPLATE_CONTACT')
             if template:
                 message_body = template.format(name=name, email=email, message=message)
-                send_telegram_message(message_body)
+                # Só enfileira: o envio acontece fora da requisição (telegram_utils).
+                send_telegram_message(message_body, settings=settings)
         
         return jsonify({'success': True, 'message': 'Mensagem enviada com sucesso! Entraremos em contato em breve.'})
     
@@ -208,6 +188,25 @@ def handle_contact_form():
         print(f"Erro ao processar mensagem de contato: {e}")
         return jsonify({'success': False, 'message': 'Ocorreu um erro no servidor ao tentar enviar sua mensagem.'}), 500
 
+@public_bp.route('/agenda/<string:token>.ics')
+def agenda_feed(token):
+    """Prazos em aberto do artista dono do token, em iCalendar (para assinar sem login)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    owner = agenda.feed_owner(conn, cursor, token)
+    cursor.close()
+    if owner is None:
+        conn.close()
+        return 'Calendário não encontrado.', 404
+
+    artist_id, artist_name = owner
+    response = Response(stream_with_context(agenda.stream_feed(conn, artist_id, artist_name, request.host)),
+                        mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename="prazos.ics"'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @public_bp.route('/ping')
 def ping():
     """Endpoint leve apenas para verificar se o servidor está no ar."""
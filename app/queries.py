@@ -0,0 +1,119 @@
+# Arquivo: app/queries.py
+
+import hashlib
+import os
+
+# Camada fina de consultas: cada SQL é escrito UMA vez com placeholders '?',
+# compilado para o dialeto da conexão (SQLite ou PostgreSQL) na primeira vez
+# que é usado e guardado em cache. No PostgreSQL as consultas marcadas com
+# 'prepare=True' viram prepared statements do servidor (PREPARE/EXECUTE),
+# reaproveitados enquanto a conexão do pool estiver viva.
+#
+# Defina DB_PREPARED_STATEMENTS=0 quando houver um pooler em modo
+# "transaction" (ex.: PgBouncer) entre o app e o banco.
+
+POSTGRES = 'postgres'
+SQLITE = 'sqlite'
+
+
+def dialect_of(conn):
+    """Retorna 'postgres' ou 'sqlite' para uma conexão (do pool ou crua)."""
+    return POSTGRES if hasattr(conn, 'cursor_factory') else SQLITE
+
+
+def _prepared_enabled():
+    return os.environ.get('DB_PREPARED_STATEMENTS', '1') != '0'
+
+
+def _split_placeholders(sql):
+    """Quebra o SQL nos '?' que estão fora de literais ('...' ou "...")."""
+    parts, current, quote = [], [], None
+    for char in sql:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+            current.append(char)
+        elif char == '?':
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+class Query:
+    """
+    Um comando SQL compilado sob demanda para cada dialeto.
+    'sql' pode ser uma string (mesmo SQL nos dois bancos) ou um dict
+    {'postgres': ..., 'sqlite': ...} para comandos com sintaxe diferente.
+    """
+
+    def __init__(self, sql, name=None, prepare=False):
+        self._sources = sql if isinstance(sql, dict) else {POSTGRES: sql, SQLITE: sql}
+        source_id = hashlib.md5(self._sources[POSTGRES].encode('utf-8')).hexdigest()[:12]
+        # O hash no nome evita colisão entre consultas diferentes com o mesmo
+        # apelido; consultas idênticas em módulos diferentes compartilham o statement.
+        self.name = f"q_{name}_{source_id[:6]}" if name else f"q_{source_id}"
+        self.prepare = prepare
+        self._compiled = {}
+
+    def compile(self, dialect):
+        compiled = self._compiled.get(dialect)
+        if compiled is None:
+            parts = _split_placeholders(self._sources[dialect])
+            if dialect == POSTGRES:
+                # psycopg2 interpreta '%' quando há parâmetros; escapamos os literais.
+                escaped = [p.replace('%', '%%') for p in parts]
+                compiled = {
+                    'sql': '%s'.join(escaped),
+                    'prepare': 'PREPARE {} AS {}'.format(
+                        self.name, ''.join(p + (f'${i}' if i < len(parts) else '') for i, p in enumerate(parts, 1))
+                    ),
+                    'execute': 'EXECUTE {}{}'.format(
+                        self.name, f" ({', '.join(['%s'] * (len(parts) - 1))})" if len(parts) > 1 else ''
+                    )
+                }
+            else:
+                compiled = {'sql': '?'.join(parts)}
+            self._compiled[dialect] = compiled
+        return compiled
+
+    def execute(self, conn, cursor, params=()):
+        """Executa a consulta no cursor e o retorna (para encadear fetchone/fetchall)."""
+        dialect = dialect_of(conn)
+        compiled = self.compile(dialect)
+        info = getattr(conn, 'info', None)
+
+        if dialect == POSTGRES and self.prepare and isinstance(info, dict) and _prepared_enabled():
+            prepared = info.setdefault('prepared', set())
+            if self.name not in prepared:
+                cursor.execute(compiled['prepare'])
+                prepared.add(self.name)
+            try:
+                cursor.execute(compiled['execute'], tuple(params))
+            except Exception as e:
+                # 26000 = invalid_sql_statement_name: o statement sumiu da sessão
+                # (ex.: DISCARD ALL). Esquecemos o nome para prepará-lo de novo.
+                if getattr(e, 'pgcode', None) == '26000':
+                    prepared.discard(self.name)
+                raise
+        else:
+            cursor.execute(compiled['sql'], tuple(params))
+        return cursor
+
+    def executemany(self, conn, cursor, seq_of_params):
+        dialect = dialect_of(conn)
+        sql = self.compile(dialect)['sql']
+        rows = [tuple(p) for p in seq_of_params]
+        if dialect == POSTGRES:
+            # O executemany do psycopg2 faz uma ida ao servidor por linha;
+            # execute_batch junta os comandos em poucas idas.
+            from psycopg2.extras import execute_batch
+            execute_batch(cursor, sql, rows)
+        else:
+            cursor.executemany(sql, rows)
+        return cursor
@@ -0,0 +1,133 @@
+# Arquivo: app/realtime.py
+
+from flask import session
+from flask_socketio import join_room
+from . import socketio
+from .queries import Query
+from .utils import get_db_connection
+from . import notification_counters
+
+# Salas do Socket.IO. A conexão só é aceita com sessão de login e entra
+# automaticamente nas salas de quem está conectado:
+#   user:<id>        todas as abas do usuário
+#   admins           painel do artista (recebe os eventos de todas as comissões)
+#   commission:<id>  cada pedido do cliente (as mensagens só vão para o dono)
+# Assim cada evento chega só a quem se interessa por ele, em vez de ser
+# transmitido para todos os sockets abertos.
+#
+# Os eventos levam 'unread_count' (o contador materializado de quem recebe,
+# ver notification_counters.py): o badge se atualiza sem outra requisição.
+
+ADMINS_ROOM = 'admins'
+
+CLIENT_COMMISSION_IDS = Query('SELECT id FROM comissoes WHERE client_id = ?', name='client_commission_ids', prepare=True)
+COMMISSION_OWNED_BY = Query('SELECT id FROM comissoes WHERE id = ? AND client_id = ?', name='commission_owned_by', prepare=True)
+
+
+def user_room(user_id):
+    return f'user:{user_id}'
+
+
+def commission_room(commission_id):
+    return f'commission:{commission_id}'
+
+
+@socketio.on('connect')
+def handle_connect(auth=None):
+    user_id = session.get('user_id')
+    if not user_id:
+        # Visitante sem login: recusa a conexão.
+        return False
+
+    join_room(user_room(user_id))
+    if session.get('is_admin'):
+        join_room(ADMINS_ROOM)
+        return
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        for row in CLIENT_COMMISSION_IDS.execute(conn, cursor, (user_id,)).fetchall():
+            join_room(commission_room(row['id']))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@socketio.on('join_commission')
+def handle_join_commission(data):
+    """Entra na sala de um pedido criado depois da conexão (só o dono do pedido)."""
+    user_id = session.get('user_id')
+    commission_id = (data or {}).get('commission_id')
+    if not user_id or not commission_id or session.get('is_admin'):
+        return
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if COMMISSION_OWNED_BY.execute(conn, cursor, (commission_id, user_id)).fetchone():
+            join_room(commission_room(commission_id))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _read_counts(reader, *args):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        return reader(conn, cursor, *args)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _counts_for(commission_id, client_id=None):
+    """(não lidas do painel, não lidas do cliente) para o payload dos eventos."""
+    if client_id is None:
+        return _read_counts(notification_counters.counts_for_commission, commission_id)
+    return (_read_counts(notification_counters.unread_count, None),
+            _read_counts(notification_counters.unread_count, client_id))
+
+
+def emit_to_admins(event, data):
+    data = dict(data, unread_count=_read_counts(notification_counters.unread_count, None))
+    socketio.emit(event, data, to=ADMINS_ROOM)
+
+
+def emit_unread_count(user_id=None):
+    """Novo total de não lidas para todas as abas do usuário (None = painel), ex.: depois de marcar como lidas."""
+    count = _read_counts(notification_counters.unread_count, user_id)
+    socketio.emit('notifications_count', {'unread_count': count}, to=ADMINS_ROOM if user_id is None else user_room(user_id))
+
+
+def emit_commission_updated(commission_id, message_for_admin=None, deleted=False, client_id=None):
+    """
+    Avisa o painel (com a mensagem para o artista) e o dono do pedido
+    (sem ela). Numa exclusão, a sala do pedido é fechada depois do aviso;
+    passe 'client_id', já que a comissão não existe mais para ser consultada.
+    """
+    payload = {'commission_id': commission_id}
+    if deleted:
+        payload['deleted'] = True
+    admin_unread, client_unread = _counts_for(commission_id, client_id)
+    admin_payload = dict(payload, unread_count=admin_unread)
+    if message_for_admin:
+        admin_payload['message_for_admin'] = message_for_admin
+
+    socketio.emit('commission_updated', admin_payload, to=ADMINS_ROOM)
+    socketio.emit('commission_updated', dict(payload, unread_count=client_unread), to=commission_room(commission_id))
+    if deleted:
+        socketio.close_room(commission_room(commission_id))
+
+
+def emit_commission_created(commission_id, client_id=None, message_for_admin=None):
+    """Pedido novo: o painel é avisado e as abas do cliente entram na sala do pedido (join_commission)."""
+    payload = {'commission_id': commission_id}
+    admin_unread, client_unread = _counts_for(commission_id, client_id)
+    admin_payload = dict(payload, unread_count=admin_unread)
+    if message_for_admin:
+        admin_payload['message_for_admin'] = message_for_admin
+    socketio.emit('commission_updated', admin_payload, to=ADMINS_ROOM)
+    if client_id:
+        socketio.emit('commission_created', dict(payload, unread_count=client_unread), to=user_room(client_id))
@@ -0,0 +1,155 @@
+# Arquivo: app/result_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response, g
+from .queries import Query
+from .utils import get_db_connection
+
+# Cache de resultados dos endpoints de relatório do painel (financeiro,
+# relatórios, agenda). A chave é o endpoint mais os parâmetros já resolvidos
+# (ex.: o período com a data de hoje). A validade depende das "tags": versões
+# em cache_versions que a escrita incrementa na mesma transação. Para as
+# comissões a tag é 'commission_rows', o contador que commission_sync.touch()
+# e mark_deleted() já incrementam em toda escrita. Assim qualquer alteração
+# numa comissão, em qualquer worker, invalida os resultados.
+#
+# Com vários admins abrindo a mesma página só a primeira requisição calcula;
+# as outras esperam o lock da chave e recebem o mesmo resultado.
+#
+# Variáveis de ambiente:
+#   RESULT_CACHE_TTL          segundos até expirar mesmo sem escrita (padrão
+#                             300; cobre alterações feitas direto no banco).
+#                             0 desliga o cache.
+#   RESULT_CACHE_MAX_ENTRIES  resultados guardados por processo (padrão 256);
+#                             os usados há mais tempo saem primeiro.
+
+COMMISSIONS_TAG = 'commission_rows'
+DEFAULT_RESULT_CACHE_TTL = 300
+DEFAULT_RESULT_CACHE_MAX_ENTRIES = 256
+
+_results = OrderedDict()
+_key_locks = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'bypass': 0, 'evictions': 0}
+
+
+def _ttl():
+    return float(os.environ.get('RESULT_CACHE_TTL', DEFAULT_RESULT_CACHE_TTL))
+
+
+def _max_entries():
+    return max(1, int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', DEFAULT_RESULT_CACHE_MAX_ENTRIES)))
+
+
+def _count(stat):
+    with _lock:
+        _stats[stat] += 1
+
+
+def tag_versions(tags):
+    """Tupla com as versões das tags (lida uma vez por requisição)."""
+    memo = g.setdefault('_result_cache_tags', {})
+    if tags not in memo:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        rows = Query(
+            f"SELECT name, version FROM cache_versions WHERE name IN ({', '.join(['?'] * len(tags))})"
+        ).execute(conn, cursor, tags).fetchall()
+        cursor.close()
+        conn.close()
+        versions = {row['name']: row['version'] for row in rows}
+        memo[tags] = tuple(versions.get(tag, 0) for tag in tags)
+    return memo[tags]
+
+
+def _key_lock(key):
+    with _lock:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = threading.Lock()
+        return lock
+
+
+def _lookup(key, version):
+    with _lock:
+        entry = _results.get(key)
+        if entry is None or entry['version'] != version or time.monotonic() - entry['created'] >= _ttl():
+            return None
+        _results.move_to_end(key)
+        _stats['hits'] += 1
+        return entry
+
+
+def _store(key, entry):
+    with _lock:
+        _results[key] = entry
+        _results.move_to_end(key)
+        while len(_results) > _max_entries():
+            old_key, _ = _results.popitem(last=False)
+            _key_locks.pop(old_key, None)
+            _stats['evictions'] += 1
+
+
+def _respond(entry):
+    response = make_response(entry['body'], 200)
+    response.mimetype = entry['mimetype']
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_result(*tags, key=None):
+    """
+    Decorator para views cujo JSON só depende dos parâmetros e das tags.
+    'key' é uma função sem argumentos que devolve os parâmetros já resolvidos
+    da requisição; sem ela a chave é a query string. Só respostas 200 entram no cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            if _ttl() <= 0:
+                _count('bypass')
+                return view(*args, **kwargs)
+
+            params = key() if key else tuple(sorted(request.args.items(multi=True)))
+            cache_key = (request.endpoint, params)
+            version = tag_versions(tags)
+            entry = _lookup(cache_key, version)
+            if entry is not None:
+                return _respond(entry)
+
+            with _key_lock(cache_key):
+                entry = _lookup(cache_key, version)
+                if entry is not None:
+                    return _respond(entry)
+
+                _count('misses')
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    with _lock:
+                        if cache_key not in _results:
+                            _key_locks.pop(cache_key, None)
+                    return response
+                entry = {
+                    'body': response.get_data(), 'mimetype': response.mimetype,
+                    'version': version, 'created': time.monotonic(),
+                }
+                _store(cache_key, entry)
+                return _respond(entry)
+        return decorated_function
+    return decorator
+
+
+def result_cache_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_results)
+        stats['endpoints'] = sorted({endpoint for endpoint, _ in _results})
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+    stats['ttl'] = _ttl()
+    stats['max_entries'] = _max_entries()
+    return stats
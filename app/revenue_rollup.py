@@ -0,0 +1,237 @@
+# Arquivo: app/revenue_rollup.py
+
+import base64
+import binascii
+import json
+from datetime import date as date_cls, datetime, timedelta
+from .queries import Query, POSTGRES, SQLITE
+from .versioned_cache import bump_version
+from .result_cache import COMMISSIONS_TAG
+
+# Receita mensal pré-agregada para a página financeira. 'revenue_monthly'
+# guarda, por mês (AAAA-MM, da coluna 'date' da comissão) e tipo, a receita
+# e o número de comissões concluídas:
+#   artist_id = 0      total do mês/tipo (cada comissão conta uma vez)
+#   artist_id = <id>   parte de cada artista atribuído (uma comissão com dois
+#                      artistas aparece nos dois; não some essas linhas)
+#
+# 'revenue_contributions' lembra com o que cada comissão concluída entrou no
+# agregado. refresh() compara isso com o estado atual da comissão e aplica só
+# a diferença; chame-o na mesma transação de qualquer escrita que mude status,
+# preço, tipo ou data (ou exclua a comissão). rebuild() refaz tudo do zero e
+# invalida os resultados em cache dos endpoints (result_cache).
+
+DEFAULT_TRANSACTIONS_PAGE_SIZE = 50
+MAX_TRANSACTIONS_PAGE_SIZE = 500
+
+CONTRIBUTION_SELECT = Query({
+    # FOR UPDATE: duas transações na mesma comissão aplicam a diferença uma depois da outra.
+    POSTGRES: 'SELECT month, type, price, artist_ids FROM revenue_contributions WHERE commission_id = ? FOR UPDATE',
+    SQLITE: 'SELECT month, type, price, artist_ids FROM revenue_contributions WHERE commission_id = ?',
+}, name='revenue_contribution_select', prepare=True)
+COMMISSION_STATE = Query('SELECT status, price, date, type FROM comissoes WHERE id = ?', name='revenue_commission_state', prepare=True)
+COMMISSION_ARTISTS = Query('SELECT artist_id FROM commission_artists WHERE commission_id = ? ORDER BY artist_id', name='revenue_commission_artists', prepare=True)
+CONTRIBUTION_DELETE = Query('DELETE FROM revenue_contributions WHERE commission_id = ?', name='revenue_contribution_delete', prepare=True)
+CONTRIBUTION_INSERT = Query('INSERT INTO revenue_contributions (commission_id, month, type, price, artist_ids) VALUES (?, ?, ?, ?, ?)')
+ROLLUP_APPLY = Query(
+    'INSERT INTO revenue_monthly (month, type, artist_id, revenue, commissions) VALUES (?, ?, ?, ?, ?) '
+    'ON CONFLICT (month, type, artist_id) DO UPDATE SET '
+    'revenue = revenue_monthly.revenue + excluded.revenue, commissions = revenue_monthly.commissions + excluded.commissions'
+)
+
+ROLLUP_MONTHS = Query(
+    'SELECT month, SUM(revenue) AS revenue, SUM(commissions) AS commissions FROM revenue_monthly '
+    'WHERE artist_id = 0 AND month BETWEEN ? AND ? GROUP BY month',
+    name='revenue_rollup_months', prepare=True
+)
+# Meses cobertos só em parte pelo período: soma direto das comissões (poucos dias).
+PARTIAL_MONTHS = Query({
+    POSTGRES: "SELECT TO_CHAR(date, 'YYYY-MM') AS month, SUM(COALESCE(price, 0)) AS revenue, COUNT(*) AS commissions FROM comissoes "
+              "WHERE status = 'completed' AND COALESCE(date, '0001-01-01') BETWEEN ? AND ? GROUP BY TO_CHAR(date, 'YYYY-MM')",
+    SQLITE: "SELECT SUBSTR(date, 1, 7) AS month, SUM(COALESCE(price, 0)) AS revenue, COUNT(*) AS commissions FROM comissoes "
+            "WHERE status = 'completed' AND COALESCE(date, '0001-01-01') BETWEEN ? AND ? GROUP BY SUBSTR(date, 1, 7)",
+})
+
+# Rebuild: trava o agregado (no SQLite, a primeira escrita já pega o lock do arquivo).
+ROLLUP_LOCK = Query({
+    POSTGRES: 'LOCK TABLE revenue_monthly, revenue_contributions IN SHARE ROW EXCLUSIVE MODE',
+    SQLITE: 'DELETE FROM revenue_monthly',
+})
+ROLLUP_CLEAR = Query('DELETE FROM revenue_monthly')
+CONTRIBUTIONS_CLEAR = Query('DELETE FROM revenue_contributions')
+COMPLETED_COMMISSIONS = Query("SELECT id, price, date, type FROM comissoes WHERE status = 'completed'")
+COMPLETED_ARTISTS = Query(
+    "SELECT ca.commission_id, ca.artist_id FROM commission_artists ca "
+    "JOIN comissoes c ON c.id = ca.commission_id WHERE c.status = 'completed' ORDER BY ca.artist_id"
+)
+
+
+class InvalidPeriod(ValueError):
+    """Datas do período ou cursor de transações inválidos."""
+
+
+def _contribution(price, commission_date, commission_type, artist_ids):
+    return {
+        'month': (commission_date or '')[:7],
+        'type': commission_type or '',
+        'price': float(price or 0),
+        'artist_ids': ','.join(str(a) for a in artist_ids),
+    }
+
+
+def _rollup_rows(contribution, sign):
+    """Linhas (month, type, artist_id, receita, comissões) que a contribuição soma (+1) ou tira (-1)."""
+    month, ctype, price = contribution['month'], contribution['type'], contribution['price']
+    artists = [int(a) for a in contribution['artist_ids'].split(',') if a] if contribution['artist_ids'] else []
+    return [(month, ctype, artist_id, sign * price, sign) for artist_id in [0] + artists]
+
+
+def refresh(conn, cursor, commission_id):
+    """Acerta o agregado com o estado atual da comissão; chame na mesma transação da escrita."""
+    old = CONTRIBUTION_SELECT.execute(conn, cursor, (commission_id,)).fetchone()
+    old = dict(old) if old else None
+    state = COMMISSION_STATE.execute(conn, cursor, (commission_id,)).fetchone()
+
+    new = None
+    if state and state['status'] == 'completed':
+        artists = [row['artist_id'] for row in COMMISSION_ARTISTS.execute(conn, cursor, (commission_id,)).fetchall()]
+        new = _contribution(state['price'], state['date'], state['type'], artists)
+
+    if old is not None:
+        old['price'] = float(old['price'] or 0)
+    if old == new:
+        return
+
+    rows = []
+    if old is not None:
+        rows += _rollup_rows(old, -1)
+        CONTRIBUTION_DELETE.execute(conn, cursor, (commission_id,))
+    if new is not None:
+        rows += _rollup_rows(new, 1)
+        CONTRIBUTION_INSERT.execute(conn, cursor, (commission_id, new['month'], new['type'], new['price'], new['artist_ids']))
+    ROLLUP_APPLY.executemany(conn, cursor, rows)
+
+
+def populate(conn, cursor):
+    """Soma no agregado (vazio) todas as comissões concluídas. Devolve quantas entraram."""
+    artists = {}
+    for row in COMPLETED_ARTISTS.execute(conn, cursor).fetchall():
+        artists.setdefault(row['commission_id'], []).append(row['artist_id'])
+
+    totals, contributions = {}, []
+    for row in COMPLETED_COMMISSIONS.execute(conn, cursor).fetchall():
+        contribution = _contribution(row['price'], row['date'], row['type'], artists.get(row['id'], []))
+        contributions.append((row['id'], contribution['month'], contribution['type'], contribution['price'], contribution['artist_ids']))
+        for month, ctype, artist_id, revenue, count in _rollup_rows(contribution, 1):
+            current = totals.get((month, ctype, artist_id), (0.0, 0))
+            totals[(month, ctype, artist_id)] = (current[0] + revenue, current[1] + count)
+
+    if contributions:
+        CONTRIBUTION_INSERT.executemany(conn, cursor, contributions)
+        ROLLUP_APPLY.executemany(conn, cursor, [key + value for key, value in totals.items()])
+    return len(contributions)
+
+
+def rebuild(conn):
+    """Refaz revenue_monthly e revenue_contributions a partir das comissões. Devolve quantas comissões entraram."""
+    cursor = conn.cursor()
+    try:
+        ROLLUP_LOCK.execute(conn, cursor)
+        ROLLUP_CLEAR.execute(conn, cursor)
+        CONTRIBUTIONS_CLEAR.execute(conn, cursor)
+        count = populate(conn, cursor)
+        bump_version(conn, cursor, COMMISSIONS_TAG)
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _parse_day(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise InvalidPeriod(f"Data inválida em '{name}' (use AAAA-MM-DD).")
+
+
+def _month_end(day):
+    next_month = date_cls(day.year + (day.month == 12), day.month % 12 + 1, 1)
+    return next_month - timedelta(days=1)
+
+
+def monthly_revenue(conn, cursor, start, end):
+    """
+    {'AAAA-MM': (receita, comissões)} das comissões concluídas com data entre
+    'start' e 'end' (AAAA-MM-DD, inclusive). Meses inteiros vêm do agregado;
+    as pontas que cobrem só parte de um mês são somadas direto das comissões.
+    """
+    start_day, end_day = _parse_day(start, 'inicio'), _parse_day(end, 'fim')
+    if start_day > end_day:
+        return {}
+
+    full_start = start_day if start_day.day == 1 else _month_end(start_day) + timedelta(days=1)
+    full_end = end_day if end_day == _month_end(end_day) else end_day.replace(day=1) - timedelta(days=1)
+
+    months = {}
+    partial_ranges = []
+    if full_start > full_end:
+        partial_ranges.append((start_day, end_day))
+    else:
+        for row in ROLLUP_MONTHS.execute(conn, cursor, (full_start.strftime('%Y-%m'), full_end.strftime('%Y-%m'))).fetchall():
+            months[row['month']] = (float(row['revenue'] or 0), int(row['commissions'] or 0))
+        if start_day < full_start:
+            partial_ranges.append((start_day, full_start - timedelta(days=1)))
+        if end_day > full_end:
+            partial_ranges.append((full_end + timedelta(days=1), end_day))
+
+    for range_start, range_end in partial_ranges:
+        params = (range_start.strftime('%Y-%m-%d'), range_end.strftime('%Y-%m-%d'))
+        for row in PARTIAL_MONTHS.execute(conn, cursor, params).fetchall():
+            revenue, count = months.get(row['month'], (0.0, 0))
+            months[row['month']] = (revenue + float(row['revenue'] or 0), count + int(row['commissions'] or 0))
+    # Meses que ficaram zerados depois de estornos não aparecem no gráfico.
+    return {month: value for month, value in months.items() if value[1] > 0}
+
+
+def _encode_cursor(commission_date, commission_id):
+    raw = json.dumps([commission_date, commission_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(token):
+    try:
+        commission_date, commission_id = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        # A data vai direto para a comparação com COALESCE(date, ...): só AAAA-MM-DD.
+        datetime.strptime(commission_date, '%Y-%m-%d')
+        if not isinstance(commission_id, str):
+            raise ValueError('id inválido no cursor')
+        return commission_date, commission_id
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidPeriod('Cursor inválido.')
+
+
+def transactions_page(conn, cursor, start, end, after=None, limit=DEFAULT_TRANSACTIONS_PAGE_SIZE):
+    """Comissões concluídas do período, mais recentes primeiro: {'items', 'has_more', 'next_cursor'}."""
+    _parse_day(start, 'inicio')
+    _parse_day(end, 'fim')
+    limit = max(1, min(int(limit or DEFAULT_TRANSACTIONS_PAGE_SIZE), MAX_TRANSACTIONS_PAGE_SIZE))
+
+    # Mesma expressão do índice idx_comissoes_status_date (migração 18).
+    sql = ("SELECT id, date, price, COALESCE(date, '0001-01-01') AS sort_date FROM comissoes "
+           "WHERE status = 'completed' AND COALESCE(date, '0001-01-01') BETWEEN ? AND ?")
+    params = [start, end]
+    if after:
+        last_date, last_id = _decode_cursor(after)
+        sql += " AND COALESCE(date, '0001-01-01') <= ? AND (COALESCE(date, '0001-01-01'), id) < (?, ?)"
+        params += [last_date, last_date, last_id]
+    sql += " ORDER BY COALESCE(date, '0001-01-01') DESC, id DESC LIMIT ?"
+    rows = Query(sql).execute(conn, cursor, tuple(params) + (limit + 1,)).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [{'id': row['id'], 'date': row['date'], 'price': row['price']} for row in rows]
+    next_cursor = _encode_cursor(rows[-1]['sort_date'], rows[-1]['id']) if has_more and rows else None
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
@@ -0,0 +1,54 @@
+# Arquivo: app/settings_cache.py
+
+import json
+from types import MappingProxyType
+from .queries import Query
+from .versioned_cache import VersionedCache, bump_version
+
+# Cache em memória da tabela 'settings', com as chaves JSON já decodificadas
+# (listas/dicts). É invalidado pela versão 'settings' em 'cache_versions',
+# incrementada pelo POST de /admin/api/settings (ver versioned_cache).
+
+SETTINGS_VERSION_KEY = 'settings'
+
+# Configurações guardadas como JSON; inválidas ou ausentes viram [].
+JSON_SETTINGS_KEYS = ('social_links', 'commission_types', 'commission_extras', 'default_phases', 'support_contacts')
+
+SETTINGS_ALL = Query('SELECT key, value FROM settings', name='settings_all', prepare=True)
+
+
+def decode_settings(raw):
+    values = dict(raw)
+    for key in JSON_SETTINGS_KEYS:
+        try:
+            values[key] = json.loads(raw[key]) if raw.get(key) else []
+        except (json.JSONDecodeError, TypeError):
+            values[key] = []
+    return values
+
+
+def encode_setting(value):
+    """Converte um valor vindo da API para o texto guardado na tabela."""
+    return json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+
+
+def _load_settings(conn, cursor):
+    raw = {row['key']: row['value'] for row in SETTINGS_ALL.execute(conn, cursor).fetchall()}
+    return {'raw': MappingProxyType(raw), 'values': MappingProxyType(decode_settings(raw))}
+
+
+_settings = VersionedCache(SETTINGS_VERSION_KEY, _load_settings)
+
+
+def get_settings(conn=None):
+    """Configurações do site com as chaves JSON já decodificadas (somente leitura)."""
+    return _settings.get(conn)['values']
+
+
+def get_raw_settings(conn=None):
+    """Mesmas configurações, com os valores em texto como estão no banco."""
+    return _settings.get(conn)['raw']
+
+
+def invalidate():
+    _settings.invalidate()
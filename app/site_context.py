@@ -0,0 +1,123 @@
+# Arquivo: app/site_context.py
+
+import json
+from flask import g, session
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.local import LocalProxy
+from .queries import Query
+from .settings_cache import get_settings
+from .versioned_cache import VersionedCache
+
+# Variáveis globais dos templates (injetadas pelo context_processor).
+# Cada uma é um LocalProxy "preguiçoso": nada é consultado até o template
+# usar o valor, e o resultado é memorizado na requisição (flask.g). As partes
+# que dependem do banco vêm de caches versionados, compartilhados entre
+# requisições; assim uma página que não usa plugins não paga por eles.
+
+PLUGINS_VERSION_KEY = 'plugins'
+PUBLIC_PLUGIN_DATA_VERSION_KEY = 'public_plugin_data'
+
+ACTIVE_PLUGINS = Query('SELECT id, code, scope FROM plugins WHERE is_active = 1', name='active_plugins', prepare=True)
+MAIN_ARTIST_ID = Query('SELECT id FROM users WHERE is_admin = TRUE ORDER BY id ASC LIMIT 1', name='main_artist_id', prepare=True)
+PUBLIC_PLUGIN_DATA = Query('SELECT key, value FROM plugin_data WHERE user_id = ? AND key LIKE ?', name='public_plugin_data', prepare=True)
+
+
+def _load_active_plugins(conn, cursor):
+    plugins = {'public': [], 'admin': []}
+    for row in ACTIVE_PLUGINS.execute(conn, cursor).fetchall():
+        if row['scope'] in plugins:
+            plugins[row['scope']].append({'id': row['id'], 'code': row['code']})
+    return plugins
+
+
+def _load_public_plugin_data(conn, cursor):
+    main_artist = MAIN_ARTIST_ID.execute(conn, cursor).fetchone()
+    public_plugin_data = {}
+    if main_artist:
+        for row in PUBLIC_PLUGIN_DATA.execute(conn, cursor, (main_artist['id'], 'public_%')).fetchall():
+            clean_key = row['key'].replace('public_', '', 1)
+            try:
+                public_plugin_data[clean_key] = json.loads(row['value'])
+            except (json.JSONDecodeError, TypeError):
+                public_plugin_data[clean_key] = row['value']
+    return public_plugin_data
+
+
+active_plugins_cache = VersionedCache(PLUGINS_VERSION_KEY, _load_active_plugins)
+public_plugin_data_cache = VersionedCache(PUBLIC_PLUGIN_DATA_VERSION_KEY, _load_public_plugin_data)
+
+
+def _memoized(name, compute, fallback):
+    memo = g.setdefault('_site_context', {})
+    if name not in memo:
+        try:
+            memo[name] = compute()
+        except Exception as e:
+            print(f"Aviso: Não foi possível carregar '{name}' para o template (pode ser o primeiro build): {e}")
+            memo[name] = fallback
+    return memo[name]
+
+
+def _lazy(name, compute, fallback=None):
+    return LocalProxy(lambda: _memoized(name, compute, fallback))
+
+
+def _site_identity():
+    settings = get_settings()
+    # No modo Individual, todos os dados vêm EXCLUSIVAMENTE das configurações gerais.
+    # No modo Estúdio, o nome é o do estúdio; os dados de cada artista são
+    # carregados em suas respectivas páginas.
+    if settings.get('site_mode', 'individual') == 'individual':
+        return {
+            'artist_name': settings.get('artist_name', 'Nome do Artista'),
+            'artist_bio': settings.get('artist_bio', ''),
+        }
+    return {
+        'artist_name': settings.get('studio_name', 'Nome do Estúdio'),
+        'artist_bio': settings.get('artist_bio'),
+    }
+
+
+def _identity(key, fallback):
+    return _lazy(key, lambda: _memoized('_identity', _site_identity, {}).get(key, fallback), fallback)
+
+
+def _setting(key, default=None, fallback=None):
+    return _lazy(key, lambda: get_settings().get(key, default), fallback if fallback is not None else default)
+
+
+def _admin_plugins():
+    return active_plugins_cache.get()['admin'] if session.get('is_admin') else []
+
+
+def site_context():
+    """Dicionário de proxies preguiçosos para o context_processor."""
+    return dict(
+        artist_name=_identity('artist_name', 'Site de Arte'),
+        artist_bio=_identity('artist_bio', ''),
+        artist_avatar=_setting('artist_avatar'),
+        social_links=_lazy('social_links', lambda: get_settings()['social_links'], []),
+        site_mode=_setting('site_mode', 'individual'),
+        session_avatar_url=session.get('avatar_url', None),
+        artist_email=_setting('artist_email', 'contato@email.com'),
+        artist_location=_setting('artist_location', 'Localização Padrão'),
+        artist_process=_setting('artist_process', 'Processo criativo padrão.'),
+        artist_inspirations=_setting('artist_inspirations', 'Inspirações padrão.'),
+        home_headline=_setting('home_headline', 'Bem-vindo à Galeria'),
+        home_subheadline=_setting('home_subheadline', 'Explore as obras.'),
+        public_plugin_data=_lazy('public_plugin_data', public_plugin_data_cache.get, {}),
+        custom_css=_setting('custom_css_theme'),
+        paypal_email=_setting('paypal_email'),
+        paypal_hosted_button_id=_setting('paypal_hosted_button_id'),
+        pix_key=_setting('pix_key'),
+        payment_currency_code=_setting('payment_currency_code', 'BRL'),
+        public_plugins=_lazy('public_plugins', lambda: active_plugins_cache.get()['public'], []),
+        admin_plugins=_lazy('admin_plugins', _admin_plugins, []),
+    )
+
+
+def json_default(o):
+    """Permite usar '| tojson' direto nos proxies (resolve o valor antes de serializar)."""
+    if isinstance(o, LocalProxy):
+        return o._get_current_object()
+    return DefaultJSONProvider.default(o)
@@ -0,0 +1,201 @@
+# Arquivo: app/socket_queue.py
+
+import os
+import select
+import sqlite3
+import threading
+import time
+import socketio
+
+# Fila de mensagens do Socket.IO. Sem fila, um emit só alcança os sockets
+# ligados ao MESMO processo; com ela, cada worker/servidor publica o evento
+# na fila e todos os outros o entregam aos seus sockets. Também permite
+# emitir de fora do servidor (scripts de linha de comando, ver emit_external).
+#
+# Configuração por SOCKETIO_MESSAGE_QUEUE:
+#   (vazio)                 sem fila: um processo só (padrão)
+#   postgres                LISTEN/NOTIFY no banco de DATABASE_URL
+#   postgresql://...        LISTEN/NOTIFY em outro PostgreSQL
+#   sqlite[:///caminho]     fila local numa tabela SQLite (padrão: database.db),
+#                           substituto de broker para desenvolvimento/uma máquina
+#   redis://, amqp://, ...  repassado ao Flask-SocketIO (Redis, RabbitMQ, Kafka, ZMQ)
+# SOCKETIO_CHANNEL muda o nome do canal (padrão 'flask-socketio').
+
+DEFAULT_CHANNEL = 'flask-socketio'
+# Limite do payload do NOTIFY no PostgreSQL (8000 bytes na configuração padrão).
+NOTIFY_MAX_PAYLOAD = 7900
+LISTEN_RETRY_SECONDS = 5
+SQLITE_POLL_SECONDS = 0.2
+SQLITE_RETENTION_SECONDS = 60
+
+
+class PostgresNotifyManager(socketio.PubSubManager):
+    """Gerenciador pub/sub sobre LISTEN/NOTIFY do PostgreSQL (sem broker extra)."""
+
+    name = 'postgres'
+
+    def __init__(self, dsn, channel=DEFAULT_CHANNEL, write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.dsn = dsn
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self):
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        # NOTIFY fora de transação: é entregue na hora, não no commit.
+        conn.autocommit = True
+        return conn
+
+    def _publish(self, data):
+        import psycopg2
+        payload = self.json.dumps(data)
+        if len(payload.encode('utf-8')) > NOTIFY_MAX_PAYLOAD:
+            self._get_logger().error(f"Evento do Socket.IO grande demais para o NOTIFY ({len(payload)} bytes); não foi propagado.")
+            return
+        for attempt in range(2):
+            try:
+                with self._publish_lock:
+                    if self._publish_conn is None or self._publish_conn.closed:
+                        self._publish_conn = self._connect()
+                    with self._publish_conn.cursor() as cursor:
+                        cursor.execute('SELECT pg_notify(%s, %s)', (self.channel, payload))
+                return
+            except psycopg2.Error as e:
+                self._publish_conn = None
+                if attempt == 1:
+                    self._get_logger().error(f"Falha ao publicar evento do Socket.IO no PostgreSQL: {e}")
+
+    def _listen(self):
+        import psycopg2
+        from psycopg2 import sql
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+                while True:
+                    if select.select([conn], [], [], LISTEN_RETRY_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        yield conn.notifies.pop(0).payload
+            except psycopg2.Error as e:
+                self._get_logger().error(f"Conexão LISTEN do Socket.IO caiu ({e}); reconectando em {LISTEN_RETRY_SECONDS}s.")
+                if conn is not None and not conn.closed:
+                    conn.close()
+                self.server.sleep(LISTEN_RETRY_SECONDS)
+
+
+class SQLiteQueueManager(socketio.PubSubManager):
+    """
+    Substituto local de um broker: os eventos vão para uma tabela SQLite
+    e cada processo lê as linhas novas por polling. Serve para rodar vários
+    workers (ou emitir de scripts) na mesma máquina sem Redis/PostgreSQL.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path='database.db', channel=DEFAULT_CHANNEL, write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.path = path
+        self._ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS socketio_queue ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _publish(self, data):
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute('INSERT INTO socketio_queue (channel, payload, created_at) VALUES (?, ?, ?)',
+                         (self.channel, self.json.dumps(data), now))
+            # Limpeza oportunista: quem publica apaga o que já expirou.
+            conn.execute('DELETE FROM socketio_queue WHERE created_at < ?', (now - SQLITE_RETENTION_SECONDS,))
+            conn.commit()
+        except sqlite3.Error as e:
+            self._get_logger().error(f"Falha ao publicar evento do Socket.IO na fila SQLite: {e}")
+        finally:
+            conn.close()
+
+    def _listen(self):
+        conn = self._connect()
+        # Só interessam os eventos publicados depois que o processo subiu.
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM socketio_queue').fetchone()[0]
+        while True:
+            try:
+                rows = conn.execute(
+                    'SELECT id, payload FROM socketio_queue WHERE channel = ? AND id > ? ORDER BY id',
+                    (self.channel, last_id)
+                ).fetchall()
+            except sqlite3.Error as e:
+                self._get_logger().error(f"Falha ao ler a fila SQLite do Socket.IO: {e}")
+                rows = []
+            for row_id, payload in rows:
+                last_id = row_id
+                yield payload
+            self.server.sleep(SQLITE_POLL_SECONDS)
+
+
+def _queue_config():
+    return os.environ.get('SOCKETIO_MESSAGE_QUEUE', '').strip(), os.environ.get('SOCKETIO_CHANNEL', DEFAULT_CHANNEL)
+
+
+def _build_manager(url, channel, write_only):
+    """Instância do gerenciador próprio para a URL, ou None se a URL é do Flask-SocketIO."""
+    if url == 'postgres':
+        dsn = os.environ.get('DATABASE_URL')
+        if not dsn:
+            raise RuntimeError("SOCKETIO_MESSAGE_QUEUE=postgres exige DATABASE_URL.")
+        return PostgresNotifyManager(dsn, channel=channel, write_only=write_only)
+    if url.startswith(('postgres://', 'postgresql://')):
+        return PostgresNotifyManager(url, channel=channel, write_only=write_only)
+    if url == 'sqlite' or url.startswith('sqlite:///'):
+        path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else 'database.db'
+        return SQLiteQueueManager(path or 'database.db', channel=channel, write_only=write_only)
+    return None
+
+
+def socketio_options():
+    """Argumentos de fila para socketio.init_app() conforme SOCKETIO_MESSAGE_QUEUE."""
+    url, channel = _queue_config()
+    if not url:
+        return {}
+    manager = _build_manager(url, channel, write_only=False)
+    print(f"Socket.IO usando fila de mensagens '{url.split('://')[0]}' (canal '{channel}').")
+    if manager is not None:
+        return {'client_manager': manager}
+    return {'message_queue': url, 'channel': channel}
+
+
+_external = None
+
+
+def emit_external(event, data, to=None, namespace='/'):
+    """
+    Emite um evento a partir de um processo que não é o servidor (ex.:
+    manage_admin.py). Sem fila configurada não há como alcançar os sockets:
+    devolve False e o chamador segue normalmente.
+    """
+    global _external
+    url, channel = _queue_config()
+    if not url:
+        return False
+    if _external is None:
+        manager = _build_manager(url, channel, write_only=True)
+        if manager is None:
+            from flask_socketio import SocketIO
+            _external = SocketIO(message_queue=url, channel=channel)
+        else:
+            _external = manager
+    _external.emit(event, data, to=to, namespace=namespace)
+    return True
@@ -1,80 +1,263 @@
 # --- Conteúdo do arquivo: app/telegram_utils.py ---
 
-import sqlite3
 import os
-import psycopg2
-from psycopg2.extras import DictCursor
+import queue
+import threading
+import time
+from collections import OrderedDict
+from .utils import get_db_connection
+from .settings_cache import get_settings
+
+# Envio de mensagens para o Telegram fora da requisição. A rota só coloca a
+# mensagem numa fila em memória (send_telegram_message) e responde; uma
+# thread do processo (verde, com o monkey_patch do eventlet) faz o envio:
+#   - uma requests.Session reaproveitada (keep-alive) com timeout;
+#   - novas tentativas com espera exponencial em erro de rede, 5xx e 429
+#     (neste caso respeitando o 'retry_after' devolvido pelo Telegram);
+#   - limite por chat (1 msg/s em conversas, 20/min em grupos) e global
+#     (30 msg/s por bot), como pede a documentação do Telegram;
+#   - mensagens que chegam em rajada para o mesmo chat enquanto o envio
+#     espera a vez (ou durante uma espera curta, se já há outras na fila)
+#     são juntadas numa só (até o limite de 4096 caracteres).
+#     Se o Telegram recusar a mensagem juntada (ex.: o Markdown de uma delas
+#     é inválido), cada uma é reenviada sozinha, e só a ruim se perde.
+#
+# Variáveis de ambiente:
+#   TELEGRAM_API_BASE      URL base da API (padrão https://api.telegram.org;
+#                          aponte para um servidor local em testes)
+#   TELEGRAM_TIMEOUT       timeout de cada chamada em segundos (padrão 10)
+#   TELEGRAM_MAX_RETRIES   novas tentativas depois da primeira (padrão 4)
+#   TELEGRAM_QUEUE_SIZE    mensagens ainda não enviadas (na fila ou já
+#                          separadas por chat) antes de descartar (padrão 1000)
+
+DEFAULT_API_BASE = 'https://api.telegram.org'
+DEFAULT_TIMEOUT = 10
+CONNECT_TIMEOUT = 5
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_QUEUE_SIZE = 1000
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 60
+CHAT_INTERVAL_SECONDS = 1.0
+GROUP_INTERVAL_SECONDS = 3.0
+GLOBAL_INTERVAL_SECONDS = 1 / 30
+# Espera curta antes de enviar quando há uma rajada em andamento, para
+# juntá-la numa mensagem só. Mensagem avulsa sai sem essa espera.
+COALESCE_SECONDS = 0.5
+MAX_MESSAGE_LENGTH = 4096
+COALESCE_SEPARATOR = '\n\n———\n\n'
+
+# Resultado de _deliver().
+SENT = 'sent'
+REJECTED = 'rejected'  # 4xx (menos 429): o pedido em si é inválido
+FAILED = 'failed'      # tentativas esgotadas
+
 
 def get_db_connection_for_utils():
-    """Cria uma conexão de DB específica para este utilitário."""
- 
-    database_url = os.environ.get('DATABASE_URL')
-    if database_url:
-        conn = psycopg2.connect(database_url)
-        conn.cursor_factory = DictCursor
-    else:
-        conn = sqlite3.connect('database.db')
-        conn.row_factory = sqlite3.Row
-    return conn
-
-def send_telegram_message(message_body):
-    """
-    Busca as configurações do Telegram no banco de dados e envia uma mensagem.
-    Esta versão é autônoma e não depende do contexto da aplicação Flask.
-    """
-    import requests
-    conn = None  # Garante que 'conn' exista no escopo do 'finally'
-    
-    try:
-        # --- INÍCIO DA CORREÇÃO ---
-        # Removemos a criação desnecessária do app (create_app) e o app_context.
-        # A função agora gerencia sua própria conexão de banco de dados diretamente.
-        conn = get_db_connection_for_utils()
-        cursor = conn.cursor()
-        cursor.execute("SELECT key, value FROM settings WHERE key LIKE 'TELEGRAM_%'")
-        settings_db = cursor.fetchall()
-        settings = {row['key']: row['value'] for row in settings_db}
-        # --- FIM DA CORREÇÃO ---
-
-        if settings.get('TELEGRAM_ENABLED') != 'true':
-            print(">>> AVISO: Envio via Telegram desabilitado nas configurações.")
-            return False
+    """Mantido por compatibilidade: usa a mesma conexão (do pool) do resto do app."""
+    return get_db_connection()
+
+
+class TelegramDispatcher:
+    """Fila de saída para a API do Telegram, consumida por uma thread do processo."""
 
-        bot_token = settings.get('TELEGRAM_BOT_TOKEN')
-        chat_id = settings.get('TELEGRAM_CHAT_ID')
+    def __init__(self, api_base=None, timeout=None, max_retries=None, queue_size=None, sleep=time.sleep):
+        self.api_base = (api_base or os.environ.get('TELEGRAM_API_BASE') or DEFAULT_API_BASE).rstrip('/')
+        self.timeout = float(timeout or os.environ.get('TELEGRAM_TIMEOUT', DEFAULT_TIMEOUT))
+        self.max_retries = int(max_retries if max_retries is not None else os.environ.get('TELEGRAM_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        self.sleep = sleep
+        self.queue_size = int(queue_size or os.environ.get('TELEGRAM_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+        # O limite vale até o envio terminar, não só enquanto a mensagem está
+        # na fila: cada vaga é devolvida em _done().
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._queue = queue.Queue()
+        self._pending = OrderedDict()  # (bot_token, chat_id) -> textos já retirados da fila, na ordem de chegada
+        self._next_send = {}     # chat_id -> quando pode enviar de novo (time.monotonic)
+        self._next_global = 0.0
+        self._session = None
+        self._thread = None
+        self._start_lock = threading.Lock()
 
-        if not all([bot_token, chat_id]):
-            print("!!! ERRO: O Token do Bot ou o Chat ID do Telegram estão faltando no banco de dados.")
+    # --- Lado da requisição ---
+    def enqueue(self, bot_token, chat_id, text):
+        """Coloca a mensagem na fila sem esperar o envio. False se a fila estiver cheia."""
+        self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            print("!!! ERRO: Fila do Telegram cheia; mensagem descartada.")
             return False
-        
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        payload = {
-            'chat_id': chat_id,
-            'text': message_body,
-            'parse_mode': 'Markdown'
-        }
-  
-        print(f">>> Tentando enviar mensagem para o Telegram Chat ID: {chat_id}...")
-       
-        response = requests.post(url, data=payload)
-        response_data = response.json()
-
-        if response.status_code == 200 and response_data.get('ok'):
-            print(">>> Mensagem de Telegram enviada com sucesso!")
-            return True
+        self._queue.put_nowait((bot_token, str(chat_id), text))
+        return True
+
+    def flush(self, timeout=None):
+        """Espera a fila esvaziar (útil em scripts e testes). True se esvaziou a tempo."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='telegram-dispatcher', daemon=True)
+                self._thread.start()
+
+    # --- Thread de envio ---
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+            self._session = session
+        return self._session
+
+    def _run(self):
+        while True:
+            if not self._pending:
+                self._stash(self._queue.get())
+            bot_token, chat_id = key = next(iter(self._pending))
+            texts = []
+            try:
+                self._wait_turn(key)
+                texts = self._coalesce(key)
+                self._send_batch(bot_token, chat_id, texts)
+            except Exception as e:
+                print(f"!!! ERRO INESPERADO ao enviar mensagem via Telegram: {e}")
+            finally:
+                # Os textos retirados contam como concluídos mesmo se o envio falhou.
+                self._done(len(texts))
+
+    def _stash(self, item):
+        bot_token, chat_id, text = item
+        self._pending.setdefault((bot_token, chat_id), []).append(text)
+
+    def _drain(self):
+        while True:
+            try:
+                self._stash(self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _done(self, count):
+        for _ in range(count):
+            self._slots.release()
+            self._queue.task_done()
+
+    def _wait_turn(self, key):
+        """
+        Espera o limite do chat e o global; a rajada que chegar nesse meio
+        tempo é juntada. Se já há outras mensagens para o mesmo chat, espera
+        pelo menos COALESCE_SECONDS para a rajada terminar de chegar.
+        """
+        self._drain()
+        if len(self._pending[key]) > 1:
+            wait = max(self._next_send.get(key[1], 0.0), self._next_global, time.monotonic() + COALESCE_SECONDS) - time.monotonic()
+            if wait > 0:
+                self.sleep(wait)
         else:
-            print(f"!!! ERRO ao enviar mensagem para o Telegram. Resposta da API: {response_data}")
-            return False
+            self._wait_for_limits(key[1])
 
-    except requests.exceptions.RequestException as e:
-        print(f"!!! ERRO DE CONEXÃO ao tentar contatar a API do Telegram: {e}")
+    def _coalesce(self, key):
+        """
+        Separa por bot/chat o que chegou na fila e retira do chat 'key' as
+        primeiras mensagens que cabem juntas numa só. O resto do chat vai para
+        o fim da vez, depois dos outros chats.
+        """
+        self._drain()
+        pending = self._pending[key]
+        count, length = 1, len(pending[0])
+        while count < len(pending) and length + len(COALESCE_SEPARATOR) + len(pending[count]) <= MAX_MESSAGE_LENGTH:
+            length += len(COALESCE_SEPARATOR) + len(pending[count])
+            count += 1
+        texts = pending[:count]
+        if count == len(pending):
+            del self._pending[key]
+        else:
+            del pending[:count]
+            self._pending.move_to_end(key)
+        return texts
+
+    def _send_batch(self, bot_token, chat_id, texts):
+        if self._deliver(bot_token, chat_id, COALESCE_SEPARATOR.join(texts)) != REJECTED or len(texts) == 1:
+            return
+        print(f">>> Telegram recusou {len(texts)} mensagens juntadas; reenviando uma a uma.")
+        for text in texts:
+            self._wait_for_limits(chat_id)
+            self._deliver(bot_token, chat_id, text)
+
+    def _wait_for_limits(self, chat_id):
+        wait = max(self._next_send.get(chat_id, 0.0), self._next_global) - time.monotonic()
+        if wait > 0:
+            self.sleep(wait)
+
+    def _mark_sent(self, chat_id):
+        now = time.monotonic()
+        interval = GROUP_INTERVAL_SECONDS if chat_id.startswith('-') else CHAT_INTERVAL_SECONDS
+        self._next_send[chat_id] = now + interval
+        self._next_global = now + GLOBAL_INTERVAL_SECONDS
+
+    def _deliver(self, bot_token, chat_id, text):
+        import requests
+        url = f"{self.api_base}/bot{bot_token}/sendMessage"
+        payload = {'chat_id': chat_id, 'text': text, 'parse_mode': 'Markdown'}
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self._get_session().post(url, data=payload, timeout=(CONNECT_TIMEOUT, self.timeout))
+                self._mark_sent(chat_id)
+                try:
+                    response_data = response.json()
+                except ValueError:
+                    response_data = {}
+
+                if response.status_code == 200 and response_data.get('ok'):
+                    print(f">>> Mensagem de Telegram enviada com sucesso (chat {chat_id}).")
+                    return SENT
+                if response.status_code == 429:
+                    retry_after = (response_data.get('parameters') or {}).get('retry_after')
+                elif response.status_code < 500:
+                    # Erro do pedido (token, chat ou Markdown inválidos): repetir não adianta.
+                    print(f"!!! ERRO ao enviar mensagem para o Telegram. Resposta da API: {response_data}")
+                    return REJECTED
+                error = f"HTTP {response.status_code}: {response_data}"
+            except requests.exceptions.RequestException as e:
+                error = f"erro de conexão: {e}"
+
+            if attempt == self.max_retries:
+                print(f"!!! ERRO: Telegram falhou depois de {attempt + 1} tentativa(s) ({error}); mensagem descartada.")
+                return FAILED
+            delay = retry_after or min(BACKOFF_BASE_SECONDS * 2 ** attempt, BACKOFF_MAX_SECONDS)
+            print(f">>> Telegram indisponível ({error}); nova tentativa em {delay}s.")
+            self.sleep(delay)
+        return FAILED
+
+
+dispatcher = TelegramDispatcher()
+
+
+def send_telegram_message(message_body, settings=None):
+    """
+    Enfileira uma mensagem para o Telegram com as configurações do site
+    (TELEGRAM_*). Não espera o envio: devolve True se a mensagem entrou na fila.
+    Passe 'settings' quando a rota já as tiver lido, para não consultar de novo.
+    """
+    if settings is None:
+        settings = get_settings(get_db_connection_for_utils())
+
+    if settings.get('TELEGRAM_ENABLED') != 'true':
+        print(">>> AVISO: Envio via Telegram desabilitado nas configurações.")
         return False
-        
-    except Exception as e:
-        print(f"!!! ERRO INESPERADO ao enviar mensagem via Telegram: {e}")
+
+    bot_token = settings.get('TELEGRAM_BOT_TOKEN')
+    chat_id = settings.get('TELEGRAM_CHAT_ID')
+
+    if not all([bot_token, chat_id]):
+        print("!!! ERRO: O Token do Bot ou o Chat ID do Telegram estão faltando no banco de dados.")
         return False
-    
-    finally:
-        # Garante que a conexão com o banco de dados sempre seja fechada.
-        if conn:
-            conn.close()
+
+    return dispatcher.enqueue(bot_token, chat_id, message_body)
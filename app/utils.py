@@ -1,13 +1,12 @@
 # --- Código modificado para: app/utils.py ---
 
-import sqlite3
-import json
-import os
-import psycopg2
-from psycopg2.extras import DictCursor
 from datetime import datetime
 from functools import wraps
-from flask import flash, session, redirect, url_for
+from flask import flash, session, redirect, url_for, g, has_app_context
+from .db_pool import get_pool
+from .queries import Query, POSTGRES, SQLITE
+from . import notification_counters
+from .commission_store import append_event
 
 # --- INÍCIO DA MODIFICAÇÃO: Adição de novos ícones ao dicionário central ---
 def get_icon_for_network(network_name):
@@ -44,21 +43,31 @@ def get_icon_for_network(network_name):
 
 def get_db_connection():
     """
-    Cria e retorna uma conexão com o banco de dados.
+    Retorna uma conexão com o banco de dados, emprestada do pool.
     Conecta-se ao PostgreSQL se a DATABASE_URL estiver definida (no Render),
     caso contrário, usa o SQLite local.
+
+    Dentro de uma requisição (ou app context) todas as chamadas recebem a
+    MESMA conexão, guardada em flask.g; 'conn.close()' não faz nada e a conexão
+    volta ao pool no teardown. Fora do Flask, 'conn.close()' a devolve ao pool.
     """
-    database_url = os.environ.get('DATABASE_URL')
-    if database_url:
-        # Conexão com o PostgreSQL no Render
-        conn = psycopg2.connect(database_url)
-        # Usa DictCursor para que as linhas se comportem como dicionários (ex: row['id'])
-        conn.cursor_factory = DictCursor
-    else:
-        # Conexão com o SQLite para desenvolvimento local
-        conn = sqlite3.connect('database.db')
-        conn.row_factory = sqlite3.Row
-    return conn
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = get_pool().acquire(request_scoped=True)
+            g._db_conn = conn
+        return conn
+    return get_pool().acquire()
+
+def release_db_connection(exception=None):
+    """Devolve ao pool a conexão da requisição atual (usado no teardown)."""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn.release()
+
+def get_db_pool_stats():
+    """Retorna as estatísticas do pool de conexões deste processo."""
+    return get_pool().stats()
 
 def translate_status(status_key):
     """Traduz uma chave de status do sistema para um texto em português."""
@@ -72,23 +81,19 @@ def translate_status(status_key):
     }
     return status_map.get(status_key, status_key.replace('_', ' ').capitalize())
 
+def parse_date_field(value):
+    """
+    Normaliza uma data vinda de formulário para gravar em comissoes.date/deadline:
+    'AAAA-MM-DD', ou None se vazia. Levanta ValueError se estiver em outro formato.
+    """
+    if value is None or not str(value).strip():
+        return None
+    return datetime.strptime(str(value).strip()[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+
 def add_event_to_log(conn, commission_id, actor, message):
-    """Busca o log de eventos atual, adiciona um novo evento e o salva de volta no banco."""
+    """Registra um evento no histórico da comissão (gravado no próximo commit da conexão)."""
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT event_log FROM comissoes WHERE id = %s', (commission_id,))
-        log_row = cursor.fetchone()
-        
-        event_log = json.loads(log_row['event_log']) if log_row and log_row['event_log'] else []
-        new_event = {
-            "timestamp": datetime.now().isoformat(),
-            "actor": actor,
-            "message": message
-        }
-        event_log.append(new_event)
-        
-        # PostgreSQL usa %s como placeholder
-        cursor.execute('UPDATE comissoes SET event_log = %s WHERE id = %s', (json.dumps(event_log), commission_id))
+        append_event(conn, commission_id, actor, message)
     except Exception as e:
         print(f"Erro inesperado no log: {e}")
 
@@ -112,16 +117,47 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def add_notification(message, commission_id=None, user_id=None):
-    """Adiciona uma nova notificação ao banco de dados."""
+NOTIFICATION_INSERT = Query(
+    'INSERT INTO notifications (message, timestamp, related_commission_id, is_read, user_id) VALUES (?, ?, ?, 0, ?)',
+    name='notification_insert', prepare=True
+)
+# Notificação para um cliente: só é gravada se ele aceita notificações no site
+# (users.notify_on_site); a checagem vai no próprio INSERT, sem consulta extra.
+# No PostgreSQL o timestamp precisa do CAST: parâmetros num SELECT chegam como texto.
+USER_NOTIFICATION_INSERT = Query({
+    POSTGRES: 'INSERT INTO notifications (message, timestamp, related_commission_id, is_read, user_id) '
+              'SELECT ?, CAST(? AS TIMESTAMP), ?, 0, id FROM users WHERE id = ? AND notify_on_site = 1',
+    SQLITE: 'INSERT INTO notifications (message, timestamp, related_commission_id, is_read, user_id) '
+            'SELECT ?, ?, ?, 0, id FROM users WHERE id = ? AND notify_on_site = 1',
+}, name='user_notification_insert', prepare=True)
+
+def add_notification(message, commission_id=None, user_id=None, conn=None):
+    """
+    Adiciona uma nova notificação ao banco de dados.
+    Com 'conn', a notificação entra na transação de quem chamou: fica na fila
+    da conexão e é gravada num executemany só, junto com as outras da
+    requisição, no commit (e some num rollback). Sem 'conn', grava e confirma na hora.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    query = NOTIFICATION_INSERT if user_id is None else USER_NOTIFICATION_INSERT
+    params = (message, timestamp, commission_id, user_id)
+
+    if conn is not None:
+        if hasattr(conn, 'defer'):
+            conn.defer(query, params)
+        else:
+            cursor = conn.cursor()
+            query.execute(conn, cursor, params)
+            cursor.close()
+        notification_counters.increment(conn, user_id)
+        return
+
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # PostgreSQL usa %s como placeholder
-        query = 'INSERT INTO notifications (message, timestamp, related_commission_id, is_read, user_id) VALUES (%s, %s, %s, 0, %s)'
-        cursor.execute(query, (message, timestamp, commission_id, user_id))
+        query.execute(conn, cursor, params)
+        notification_counters.increment(conn, user_id)
         
         conn.commit()
         cursor.close()
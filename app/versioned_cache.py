@@ -0,0 +1,88 @@
+# Arquivo: app/versioned_cache.py
+
+import threading
+from flask import g, has_app_context
+from .queries import Query
+
+# Caches em memória invalidados por um número de versão guardado no banco
+# (tabela 'cache_versions'). Quem altera os dados de origem chama
+# bump_version() na mesma transação; cada processo confere a versão uma vez
+# por requisição (leitura pela chave primária) e recarrega quando ela muda,
+# então todos os workers do Gunicorn enxergam a alteração.
+#
+# O lock é de 'threading': com o monkey_patch do eventlet ele vira verde.
+
+CACHE_VERSION_SELECT = Query('SELECT version FROM cache_versions WHERE name = ?', name='cache_version_select', prepare=True)
+# UPSERT: funciona mesmo que a linha da versão ainda não exista.
+CACHE_VERSION_BUMP = Query(
+    'INSERT INTO cache_versions (name, version) VALUES (?, 1) '
+    'ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1',
+    name='cache_version_bump', prepare=True
+)
+
+
+def read_version(conn, cursor, name):
+    row = CACHE_VERSION_SELECT.execute(conn, cursor, (name,)).fetchone()
+    return row['version'] if row else 0
+
+
+def bump_version(conn, cursor, name):
+    """Incrementa a versão; deve rodar na mesma transação da escrita que invalida o cache."""
+    CACHE_VERSION_BUMP.execute(conn, cursor, (name,))
+
+
+class VersionedCache:
+    """
+    Um valor calculado por 'loader(conn, cursor)' e guardado até a versão
+    'name' mudar. Trate o valor devolvido como somente leitura.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._entry = (None, None)  # (versão, valor), trocados juntos
+
+    def _load(self, conn):
+        cursor = conn.cursor()
+        try:
+            version = read_version(conn, cursor, self.name)
+            cached_version, value = self._entry
+            if cached_version == version:
+                return value
+            with self._lock:
+                cached_version, value = self._entry
+                if cached_version != version:
+                    value = self.loader(conn, cursor)
+                    self._entry = (version, value)
+                    print(f"Cache '{self.name}' recarregado (versão {version}).")
+                return value
+        finally:
+            cursor.close()
+
+    def get(self, conn=None):
+        """Valor atual; dentro de uma requisição a versão é conferida uma única vez."""
+        memo = g.setdefault('_versioned_cache', {}) if has_app_context() else None
+        if memo is not None and self.name in memo:
+            return memo[self.name]
+
+        own_conn = conn is None
+        if own_conn:
+            from .utils import get_db_connection
+            conn = get_db_connection()
+        try:
+            value = self._load(conn)
+        finally:
+            if own_conn:
+                conn.close()
+
+        if memo is not None:
+            memo[self.name] = value
+        return value
+
+    def invalidate(self):
+        """Esquece o valor local (os outros processos percebem pela versão)."""
+        with self._lock:
+            self._entry = (None, None)
+        if has_app_context():
+            g.get('_versioned_cache', {}).pop(self.name, None)
@@ -1,5 +1,6 @@
 import sqlite3
 import sys
+from app.socket_queue import emit_external
 
 DATABASE = 'database.db'
 
@@ -49,6 +50,9 @@ def manage_admin_status(username_arg, action):
         status_text = "promovido a administrador" if new_status == 1 else "rebaixado para usuário comum"
         print(f"Sucesso! O usuário '{username_arg}' foi {status_text}.")
 
+        # Avisa os painéis abertos (só funciona com SOCKETIO_MESSAGE_QUEUE configurada).
+        emit_external('system_notice', {'message_for_admin': f"O usuário '{username_arg}' foi {status_text}."}, to='admins')
+
     except sqlite3.Error as e:
         print(f"Erro no banco de dados: {e}")
     finally:
@@ -0,0 +1,50 @@
+import sys
+from app.utils import get_db_connection
+from app.exports import prepare_export, stream_export, InvalidExport, DATASETS, FORMATS
+
+# Exporta dados do banco em CSV ou NDJSON para a saída padrão (redirecione
+# para um arquivo). Mesmos conjuntos e filtros da rota /admin/api/export
+# (ver app/exports.py); os filtros vão como chave=valor.
+#
+#   python manage_exports.py comissoes csv status=completed > comissoes.csv
+#   python manage_exports.py transacoes ndjson date_from=2024-01-01 > transacoes.ndjson
+
+USAGE = (f"Uso: python manage_exports.py [{'|'.join(DATASETS)}] [{'|'.join(FORMATS)}] [filtro=valor ...]")
+
+def export(dataset, fmt, filters):
+    """Escreve o conjunto na saída padrão, lote a lote."""
+    try:
+        columns, sql, params = prepare_export(dataset, fmt, filters)
+    except InvalidExport as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = get_db_connection()
+    try:
+        for chunk in stream_export(conn, fmt, columns, sql, params):
+            sys.stdout.write(chunk)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: '| head'): não é erro.
+        pass
+    except Exception as e:
+        print(f"Erro ao exportar '{dataset}': {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in DATASETS:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    dataset_arg = sys.argv[1]
+    format_arg = 'csv'
+    filter_args = sys.argv[2:]
+    if filter_args and '=' not in filter_args[0]:
+        format_arg, filter_args = filter_args[0], filter_args[1:]
+    if any('=' not in arg for arg in filter_args):
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    export(dataset_arg, format_arg, dict(arg.split('=', 1) for arg in filter_args))
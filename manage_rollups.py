@@ -0,0 +1,30 @@
+import sys
+from app.utils import get_db_connection
+from app.migrations import run_migrations
+from app import revenue_rollup
+
+# Manutenção dos agregados da página financeira (app/revenue_rollup.py).
+# O agregado é mantido pelas próprias rotas; use 'rebuild' depois de
+# alterações feitas direto no banco ou para conferir uma divergência.
+
+COMMANDS = ('rebuild',)
+
+def rebuild_rollups():
+    """Recalcula a receita mensal (revenue_monthly) a partir das comissões concluídas."""
+    conn = get_db_connection()
+    try:
+        run_migrations(conn)
+        count = revenue_rollup.rebuild(conn)
+        print(f"Receita mensal recalculada a partir de {count} comissão(ões) concluída(s).")
+    except Exception as e:
+        print(f"Erro ao recalcular a receita mensal: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS:
+        print("Uso: python manage_rollups.py rebuild")
+        sys.exit(1)
+    
+    rebuild_rollups()
@@ -2,16 +2,64 @@
 
 // Responsável por todas as comunicações com o backend (API).
 
-async function fetchComissoes() {
+/**
+ * Busca uma página da listagem de comissões.
+ * @param {object} params - Filtros da API (status, payment_status, artist_id, client_id, q,
+ *   date_from, date_to, deadline_from, deadline_to, sort, fields, cursor, limit).
+ * @returns {Promise<{items: Array, has_more: boolean, next_cursor: (string|null)}>}
+ */
+async function fetchComissoesPage(params = {}) {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') query.set(key, value);
+    });
     try {
-        const response = await fetch('/admin/api/comissoes');
+        const response = await fetch(`/admin/api/comissoes?${query.toString()}`);
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         return await response.json();
     } catch (error) {
         console.error("Erro ao buscar comissões:", error);
-        return [];
+        return { items: [], has_more: false, next_cursor: null };
+    }
+}
+
+async function fetchComissoes(params = {}) {
+    const page = await fetchComissoesPage(params);
+    return page.items;
+}
+
+async function fetchComissoesSummary() {
+    try {
+        const response = await fetch('/admin/api/comissoes/summary');
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error("Erro ao buscar resumo das comissões:", error);
+        return { total: 0, by_status: {}, monthly_revenue: 0 };
+    }
+}
+
+/**
+ * Busca as comissões alteradas/excluídas desde o cursor de sincronização.
+ * Sem cursor, devolve só o cursor atual (ponto de partida).
+ * @param {(number|null)} since - O cursor devolvido pela chamada anterior.
+ * @returns {Promise<{changed: Array, deleted: Array, cursor: number, has_more: boolean}|null>}
+ */
+async function fetchComissoesChanges(since = null) {
+    const query = since === null ? '' : `?since=${encodeURIComponent(since)}`;
+    try {
+        const response = await fetch(`/admin/api/comissoes/changes${query}`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error("Erro ao sincronizar comissões:", error);
+        return null;
     }
 }
 
@@ -236,17 +284,27 @@ async function fetchUnreadCount() {
     }
 }
 
-async function fetchAllNotifications() {
+/**
+ * Busca uma página de notificações do painel (mais recentes primeiro).
+ * @param {number|null} before - O id da última notificação já exibida, para buscar as anteriores.
+ * @returns {Promise<{items: Array, has_more: boolean, next_cursor: ?{before: number}}>}
+ */
+async function fetchNotificationsPage(before = null) {
     try {
-        const response = await fetch('/admin/api/notifications');
+        const query = before ? `?before=${encodeURIComponent(before)}` : '';
+        const response = await fetch(`/admin/api/notifications${query}`);
         if (!response.ok) throw new Error('Erro ao buscar notificações');
         return await response.json();
     } catch (error) {
         console.error("Erro ao buscar todas as notificações:", error);
-        return [];
+        return { items: [], has_more: false, next_cursor: null };
     }
 }
 
+async function fetchAllNotifications() {
+    return (await fetchNotificationsPage()).items;
+}
+
 async function markNotificationsAsRead() {
     try {
         const response = await fetch('/admin/api/notifications/mark_read', { method: 'POST' });
@@ -258,9 +316,15 @@ async function markNotificationsAsRead() {
     }
 }
 
-async function fetchAgendaComissoes() {
+/**
+ * Comissões em aberto por prazo. 'from'/'to' (AAAA-MM-DD) limitam ao intervalo; sem eles vêm todas.
+ */
+async function fetchAgendaComissoes(from, to) {
+    const params = new URLSearchParams();
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
     try {
-        const response = await fetch('/admin/api/agenda/comissoes');
+        const response = await fetch(`/admin/api/agenda/comissoes${params.toString() ? '?' + params : ''}`);
         if (!response.ok) throw new Error('Falha ao carregar dados da agenda');
         return await response.json();
     } catch (error) {
@@ -2,6 +2,33 @@
 
 // Lógica principal e unificada do painel de administração.
 let allComissoesParaCalendario = [];
+let calendarMonth = new Date().getMonth();
+let calendarYear = new Date().getFullYear();
+
+/**
+ * Carrega da agenda só as comissões em aberto com prazo no mês exibido e redesenha o calendário.
+ */
+async function refreshCalendar() {
+    const pad = n => String(n).padStart(2, '0');
+    const lastDay = new Date(calendarYear, calendarMonth + 1, 0).getDate();
+    allComissoesParaCalendario = await fetchAgendaComissoes(
+        `${calendarYear}-${pad(calendarMonth + 1)}-01`,
+        `${calendarYear}-${pad(calendarMonth + 1)}-${pad(lastDay)}`
+    );
+    renderCalendar(calendarMonth, calendarYear, allComissoesParaCalendario);
+}
+
+/**
+ * Atualiza os cards e a tabela de comissões recentes do dashboard.
+ */
+async function refreshDashboard() {
+    const [recentes, summary] = await Promise.all([
+        fetchComissoes({ limit: 5 }),
+        fetchComissoesSummary()
+    ]);
+    renderComissoesTable(recentes);
+    updateDashboardCards(summary);
+}
 
 /**
  * Prepara e ativa a lógica de responsividade para o painel de admin.
@@ -72,15 +99,18 @@ function initializeAdminResponsiveness() {
 
 
 /**
- * Busca a contagem de notificações não lidas e atualiza o badge.
+ * Atualiza o badge de notificações não lidas.
+ * @param {number} [count] - A contagem que veio no evento do Socket.IO; sem ela, busca na API.
  */
-async function updateNotificationBadge() {
+async function updateNotificationBadge(count) {
     try {
-        const data = await fetchUnreadCount();
+        if (typeof count !== 'number') {
+            count = (await fetchUnreadCount()).count;
+        }
         const badge = document.getElementById('notification-badge');
         if (badge) {
-            if (data.count > 0) {
-                badge.textContent = data.count;
+            if (count > 0) {
+                badge.textContent = count;
                 badge.style.display = 'flex';
             } else {
                 badge.style.display = 'none';
@@ -103,19 +133,15 @@ function setupSocketIOListeners() {
         console.log('Evento de atualização de comissão recebido no admin:', data);
         const notificationMessage = data.message_for_admin || `O pedido #${data.commission_id} foi atualizado.`;
         showNotification(notificationMessage, 'info');
-        updateNotificationBadge();
-
-        const comissoesData = await fetchComissoes();
-        allComissoesParaCalendario = comissoesData;
+        updateNotificationBadge(data.unread_count);
 
         const comissoesTableBody = document.getElementById('comissoes-table-body');
         const dashboardCards = document.getElementById('card-total-comissoes');
 
         if (dashboardCards) {
-            updateDashboardCards(comissoesData);
-            renderComissoesTable(comissoesData.slice(0, 5));
-        } else if (comissoesTableBody) {
-            renderComissoesTable(comissoesData);
+            await Promise.all([refreshDashboard(), refreshCalendar()]);
+        } else if (comissoesTableBody && typeof syncComissoesList === 'function') {
+            await syncComissoesList();
         }
         
         const orderDetailsModal = document.getElementById('orderDetailsModal');
@@ -125,7 +151,6 @@ function setupSocketIOListeners() {
         if (isModalVisible && modalCommissionId === data.commission_id) {
             if (data.deleted) {
                 orderDetailsModal.style.display = 'none';
-                renderComissoesTable(comissoesData);
             } else {
                 const updatedData = await fetchSingleComissao(data.commission_id);
                 if (updatedData) {
@@ -134,6 +159,16 @@ function setupSocketIOListeners() {
             }
         }
     });
+    // Notificações marcadas como lidas (nesta ou em outra aba).
+    socket.on('notifications_count', (data) => {
+        updateNotificationBadge(data.unread_count);
+    });
+    // Avisos gerados fora do site (ex.: scripts como manage_admin.py).
+    socket.on('system_notice', (data) => {
+        if (data.message_for_admin) {
+            showNotification(data.message_for_admin, 'info');
+        }
+    });
     socket.on('new_message', (data) => {
         console.log('Nova mensagem de contato recebida via Socket.IO:', data);
 
@@ -141,7 +176,7 @@ function setupSocketIOListeners() {
             showNotification(data.message_for_admin, 'info');
         }
 
-        updateNotificationBadge();
+        updateNotificationBadge(data.unread_count);
 
         if (window.location.pathname.includes('/admin/mensagens')) {
             console.log("Na página de mensagens, recarregando para exibir a nova mensagem.");
@@ -184,10 +219,10 @@ document.addEventListener('DOMContentLoaded', async () => {
                 notificationDropdown.style.display = 'none';
             } else {
                 notificationDropdown.style.display = 'block';
-                const notifications = await fetchAllNotifications();
-                renderNotifications(notifications);
-                await markNotificationsAsRead();
-                setTimeout(updateNotificationBadge, 2000);
+                const page = await fetchNotificationsPage();
+                renderNotifications(page.items, page.next_cursor);
+                const result = await markNotificationsAsRead();
+                updateNotificationBadge(result.unread_count);
             }
         });
     }
@@ -203,44 +238,32 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     const isDashboardPage = document.getElementById('card-total-comissoes') && document.getElementById('calendar-days');
     if (isDashboardPage) {
-        let currentDate = new Date();
-        let currentMonth = currentDate.getMonth();
-        let currentYear = currentDate.getFullYear();
-
         console.log("Página do Dashboard detetada. A carregar dados...");
-        const [comissoesData, notificationsData] = await Promise.all([
-            fetchComissoes(),
-            fetchAllNotifications()
+        const [notificationsData] = await Promise.all([
+            fetchAllNotifications(),
+            refreshDashboard(),
+            refreshCalendar()
         ]);
-        allComissoesParaCalendario = comissoesData;
-
-        if (allComissoesParaCalendario) {
-            renderComissoesTable(allComissoesParaCalendario.slice(0, 5));
-            updateDashboardCards(allComissoesParaCalendario);
-            renderCalendar(currentMonth, currentYear, allComissoesParaCalendario);
-            renderActivityFeed(notificationsData);
-        } else {
-            console.log("Não foi possível carregar os dados do dashboard.");
-        }
+        renderActivityFeed(notificationsData);
 
         const prevMonthBtn = document.getElementById('prev-month-btn');
         const nextMonthBtn = document.getElementById('next-month-btn');
         if (prevMonthBtn && nextMonthBtn) {
             prevMonthBtn.addEventListener('click', () => {
-                currentMonth--;
-                if (currentMonth < 0) {
-                    currentMonth = 11;
-                    currentYear--;
+                calendarMonth--;
+                if (calendarMonth < 0) {
+                    calendarMonth = 11;
+                    calendarYear--;
                 }
-                renderCalendar(currentMonth, currentYear, allComissoesParaCalendario);
+                refreshCalendar();
             });
             nextMonthBtn.addEventListener('click', () => {
-                currentMonth++;
-                if (currentMonth > 11) {
-                    currentMonth = 0;
-                    currentYear++;
+                calendarMonth++;
+                if (calendarMonth > 11) {
+                    calendarMonth = 0;
+                    calendarYear++;
                 }
-                renderCalendar(currentMonth, currentYear, allComissoesParaCalendario);
+                refreshCalendar();
             });
         }
     }
@@ -8,22 +8,46 @@ document.addEventListener('DOMContentLoaded', () => {
 
     if (!timelineContainer || !filters) return;
 
-    let allCommissions = []; 
+    const pad = n => String(n).padStart(2, '0');
+    const isoDate = d => `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
 
-    async function carregarAgenda() {
+    // Intervalo de prazo de cada filtro; o servidor devolve só as comissões dele.
+    function intervaloDoFiltro(filtro) {
+        const hoje = new Date();
+        hoje.setHours(0, 0, 0, 0);
+        switch (filtro) {
+            case 'week': {
+                const umaSemanaDepois = new Date(hoje);
+                umaSemanaDepois.setDate(hoje.getDate() + 7);
+                return [isoDate(hoje), isoDate(umaSemanaDepois)];
+            }
+            case 'month':
+                return [isoDate(hoje), isoDate(new Date(hoje.getFullYear(), hoje.getMonth() + 1, 0))];
+            case 'overdue': {
+                const ontem = new Date(hoje);
+                ontem.setDate(hoje.getDate() - 1);
+                return [null, isoDate(ontem)];
+            }
+            default: // 'all'
+                return [null, null];
+        }
+    }
+
+    async function carregarAgenda(filtro) {
         showLoadingState(true);
+        const [from, to] = intervaloDoFiltro(filtro);
+        const params = new URLSearchParams();
+        if (from) params.set('from', from);
+        if (to) params.set('to', to);
         try {
-            const response = await fetch('/admin/api/agenda/comissoes');
+            const response = await fetch(`/admin/api/agenda/comissoes${params.toString() ? '?' + params : ''}`);
             if (!response.ok) {
                 throw new Error('Falha ao carregar dados da agenda');
             }
-            allCommissions = await response.json();
-            filtrarErenderizar('all');
+            renderAgenda(await response.json(), filtro);
         } catch (error) {
             console.error("Erro ao buscar dados para a agenda:", error);
             timelineContainer.innerHTML = '<div class="empty-state"><i class="fas fa-exclamation-triangle"></i><p>Não foi possível carregar a agenda.</p></div>';
-        } finally {
-            showLoadingState(false);
         }
     }
 
@@ -33,40 +57,32 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function filtrarErenderizar(filtro) {
-        const hoje = new Date();
-        hoje.setHours(0, 0, 0, 0); 
-        let comissoesFiltradas = [];
-
-        switch(filtro) {
-            case 'week':
-                const umaSemanaDepois = new Date(hoje);
-                umaSemanaDepois.setDate(hoje.getDate() + 7);
-                comissoesFiltradas = allCommissions.filter(c => new Date(c.deadline) >= hoje && new Date(c.deadline) <= umaSemanaDepois);
-                break;
-            case 'month':
-                const fimDoMes = new Date(hoje.getFullYear(), hoje.getMonth() + 1, 0);
-                comissoesFiltradas = allCommissions.filter(c => new Date(c.deadline) >= hoje && new Date(c.deadline) <= fimDoMes);
-                break;
-            case 'overdue':
-                comissoesFiltradas = allCommissions.filter(c => new Date(c.deadline) < hoje);
-                break;
-            default: // 'all'
-                comissoesFiltradas = allCommissions;
-        }
-
-        // FUNÇÃO CORRIGIDA: de renderTimeline para renderAgenda
-        renderAgenda(comissoesFiltradas, filtro);
-    }
-
     filters.addEventListener('click', (e) => {
-        if (e.target.tagName === 'BUTTON') {
+        if (e.target.tagName === 'BUTTON' && e.target.dataset.filter) {
             filters.querySelector('.active').classList.remove('active');
             e.target.classList.add('active');
             const filtro = e.target.dataset.filter;
-            filtrarErenderizar(filtro);
+            carregarAgenda(filtro);
         }
     });
 
-    carregarAgenda();
+    // Endereço .ics para assinar os prazos num aplicativo de calendário.
+    const feedButton = document.getElementById('agenda-feed-btn');
+    if (feedButton) {
+        feedButton.addEventListener('click', async () => {
+            try {
+                let data = await (await fetch('/admin/api/agenda/feed')).json();
+                if (!data.url) {
+                    data = await (await fetch('/admin/api/agenda/feed', { method: 'POST' })).json();
+                }
+                if (!data.success) throw new Error(data.message);
+                window.prompt('Copie este endereço e adicione-o como calendário assinado (não o compartilhe):', data.url);
+            } catch (error) {
+                console.error("Erro ao obter o endereço do calendário:", error);
+                alert('Não foi possível obter o endereço do calendário.');
+            }
+        });
+    }
+
+    carregarAgenda('all');
 });
\ No newline at end of file
@@ -1,32 +1,109 @@
 // Arquivo: static/js/admin_js/pages/comissoes.js
 // Script específico para a página de gerenciamento de comissões.
 
+// Busca e paginação acontecem no servidor (/admin/api/comissoes);
+// a página guarda só o termo atual e o cursor da próxima página. Depois
+// de carregada, a tabela é atualizada no lugar a partir de
+// /admin/api/comissoes/changes (só as linhas alteradas/excluídas).
+let comissoesSearchTerm = '';
+let comissoesNextCursor = null;
+let comissoesSyncCursor = null;
+
+/**
+ * Carrega uma página da listagem com o termo de busca atual.
+ * @param {boolean} append - Se verdadeiro, busca a próxima página e acrescenta à tabela.
+ */
+async function loadComissoesList(append = false) {
+    if (!append) {
+        // O cursor é lido ANTES da lista: o que mudar no meio do caminho volta na próxima sincronização.
+        const start = await fetchComissoesChanges();
+        comissoesSyncCursor = start ? start.cursor : null;
+    }
+    const page = await fetchComissoesPage({
+        q: comissoesSearchTerm,
+        cursor: append ? comissoesNextCursor : null
+    });
+    renderComissoesTable(page.items, append);
+    comissoesNextCursor = page.next_cursor;
+
+    const tableContainer = document.querySelector('.recent-orders .table-responsive');
+    if (!tableContainer) return;
+    tableContainer.parentElement.querySelector('.load-more-comissoes')?.remove();
+    if (page.has_more) {
+        const loadMoreBtn = document.createElement('button');
+        loadMoreBtn.className = 'btn btn-secondary load-more-comissoes';
+        loadMoreBtn.textContent = 'Carregar mais';
+        loadMoreBtn.addEventListener('click', () => {
+            loadMoreBtn.disabled = true;
+            loadComissoesList(true);
+        });
+        tableContainer.after(loadMoreBtn);
+    }
+}
+
+/**
+ * Recarrega a primeira página.
+ */
+async function reloadComissoesList() {
+    await loadComissoesList(false);
+}
+
+/**
+ * Aplica na tabela as linhas alteradas e excluídas.
+ * @param {{changed: Array, deleted: Array}} changes - A resposta de /admin/api/comissoes/changes.
+ */
+function applyComissoesChanges(changes) {
+    const tableBody = document.getElementById('comissoes-table-body');
+    if (!tableBody) return;
+    const findRow = id => tableBody.querySelector(`tr[data-id="${CSS.escape(id)}"]`);
+
+    changes.deleted.forEach(id => findRow(id)?.remove());
+    changes.changed.forEach(comissao => {
+        const existing = findRow(comissao.id);
+        // Comissões novas só entram sem busca ativa (não sabemos se casam com o termo).
+        if (!existing && comissoesSearchTerm) return;
+        const row = createComissaoRow(comissao);
+        const wrapper = document.createDocumentFragment();
+        wrapper.appendChild(row);
+        addTableButtonListeners(wrapper);
+        if (existing) {
+            existing.replaceWith(row);
+        } else {
+            tableBody.querySelector('tr:not([data-id])')?.remove();
+            tableBody.prepend(row);
+        }
+    });
+}
+
+/**
+ * Busca as alterações desde o último cursor e atualiza a tabela no lugar
+ * (usada pelo listener do Socket.IO em main.js).
+ */
+async function syncComissoesList() {
+    if (comissoesSyncCursor === null) return reloadComissoesList();
+    let changes;
+    do {
+        changes = await fetchComissoesChanges(comissoesSyncCursor);
+        if (!changes) return reloadComissoesList();
+        applyComissoesChanges(changes);
+        comissoesSyncCursor = changes.cursor;
+    } while (changes.has_more);
+}
+
 document.addEventListener('DOMContentLoaded', async () => {
-    // Declara e busca a variável 'allComissoes' no escopo desta página.
-    let allComissoes = [];
-    
     console.log("Buscando comissões para a página de comissões.");
-    allComissoes = await fetchComissoes();
-    
-    // A função renderComissoesTable (de render.js) já anexa os listeners aos botões da tabela.
-    // Passamos a lista completa de comissões para ela.
-    renderComissoesTable(allComissoes);
+    await loadComissoesList();
 
-    // Adiciona listener para o campo de busca
+    // Adiciona listener para o campo de busca (com espera para não consultar a cada tecla)
     const searchInput = document.getElementById('search-input');
     if (searchInput) {
+        let searchTimeout = null;
         searchInput.addEventListener('input', (event) => {
-            const searchTerm = event.target.value.toLowerCase().trim();
-            if (!allComissoes) return;
-            
-            const comissoesFiltradas = allComissoes.filter(comissao => {
-                const id = String(comissao.id).toLowerCase();
-                const client = comissao.client.toLowerCase();
-                const type = comissao.type.toLowerCase();
-                return id.includes(searchTerm) || client.includes(searchTerm) || type.includes(searchTerm);
-            });
-            // Renderiza a tabela novamente com a lista filtrada
-            renderComissoesTable(comissoesFiltradas);
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(() => {
+                comissoesSearchTerm = event.target.value.trim();
+                loadComissoesList();
+            }, 300);
         });
     }
 });
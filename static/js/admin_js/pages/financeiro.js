@@ -43,16 +43,9 @@ document.addEventListener('DOMContentLoaded', () => {
             if (data.transacoes.length === 0) {
                 transactionsTableBody.innerHTML = '<tr><td colspan="2" style="text-align:center;">Nenhuma transação no período.</td></tr>';
             } else {
-                data.transacoes.forEach(transacao => {
-                    const row = `
-                        <tr>
-                            <td>${new Date(transacao.date + 'T00:00:00').toLocaleDateString('pt-BR')}</td>
-                             <td>${formatCurrency(transacao.price)}</td>
-                        </tr>
-                    `;
-                    transactionsTableBody.innerHTML += row;
-                });
+                appendTransactions(data.transacoes);
             }
+            renderLoadMoreTransactions(inicio, fim, data.transacoes_has_more ? data.transacoes_next_cursor : null);
 
             updateChart(data.grafico_data);
         } catch (error) {
@@ -63,6 +56,44 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // As transações chegam paginadas; as próximas páginas vêm de /admin/api/financeiro/transacoes.
+    function appendTransactions(transacoes) {
+        const fragment = document.createDocumentFragment();
+        transacoes.forEach(transacao => {
+            const row = document.createElement('tr');
+            row.innerHTML = `
+                <td>${new Date(transacao.date + 'T00:00:00').toLocaleDateString('pt-BR')}</td>
+                <td>${formatCurrency(transacao.price)}</td>
+            `;
+            fragment.appendChild(row);
+        });
+        transactionsTableBody.appendChild(fragment);
+    }
+
+    function renderLoadMoreTransactions(inicio, fim, nextCursor) {
+        const table = transactionsTableBody.closest('table');
+        table?.parentElement.querySelector('.load-more-transactions')?.remove();
+        if (!nextCursor || !table) return;
+
+        const loadMoreBtn = document.createElement('button');
+        loadMoreBtn.className = 'btn btn-secondary load-more-transactions';
+        loadMoreBtn.textContent = 'Carregar mais';
+        loadMoreBtn.addEventListener('click', async () => {
+            loadMoreBtn.disabled = true;
+            try {
+                const response = await fetch(`/admin/api/financeiro/transacoes?inicio=${inicio}&fim=${fim}&cursor=${encodeURIComponent(nextCursor)}`);
+                if (!response.ok) throw new Error('Falha ao carregar transações');
+                const page = await response.json();
+                appendTransactions(page.items);
+                renderLoadMoreTransactions(inicio, fim, page.has_more ? page.next_cursor : null);
+            } catch (error) {
+                console.error("Erro:", error);
+                loadMoreBtn.disabled = false;
+            }
+        });
+        table.after(loadMoreBtn);
+    }
+
     function updateChart(graficoData) {
         if (revenueChart) {
             revenueChart.destroy();
@@ -39,26 +39,36 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
 
-    // Função para buscar e renderizar as artes existentes
-    async function loadGallery() {
-        galleryPreviewGrid.innerHTML = '<div class="loading-overlay" style="display: flex; position: relative; background: none; grid-column: 1 / -1;"><div class="spinner"></div></div>';
+    // Cursor da próxima página da galeria (mesmo endpoint paginado do site público)
+    let nextCursor = null;
+
+    // Função para buscar e renderizar as artes existentes.
+    // Sem 'append' recomeça da primeira página; com 'append' busca a próxima.
+    async function loadGallery(append = false) {
+        if (!append) {
+            nextCursor = null;
+            galleryPreviewGrid.innerHTML = '<div class="loading-overlay" style="display: flex; position: relative; background: none; grid-column: 1 / -1;"><div class="spinner"></div></div>';
+        }
         try {
-            const response = await fetch('/admin/api/gallery');
+            const url = append && nextCursor ? `/api/gallery?cursor=${encodeURIComponent(nextCursor)}` : '/api/gallery';
+            const response = await fetch(url);
             if (!response.ok) throw new Error('Falha ao carregar a galeria');
             
-            const arts = await response.json();
-            renderGallery(arts);
+            const page = await response.json();
+            nextCursor = page.next_cursor;
+            renderGallery(page.items, append);
 
         } catch (error) {
             console.error("Erro ao carregar galeria:", error);
-            galleryPreviewGrid.innerHTML = '<p>Não foi possível carregar as artes.</p>';
+            if (!append) galleryPreviewGrid.innerHTML = '<p>Não foi possível carregar as artes.</p>';
         }
     }
 
     // Função para desenhar as artes na grelha
-    function renderGallery(arts) {
-        galleryPreviewGrid.innerHTML = '';
-        if (arts.length === 0) {
+    function renderGallery(arts, append = false) {
+        galleryPreviewGrid.querySelector('.load-more-gallery')?.remove();
+        if (!append) galleryPreviewGrid.innerHTML = '';
+        if (!append && arts.length === 0) {
             galleryPreviewGrid.innerHTML = '<p style="grid-column: 1 / -1; text-align: center; color: var(--cor-texto-secundario);">Nenhuma arte na galeria ainda. Adicione uma no formulário ao lado.</p>';
             return;
         }
@@ -81,17 +91,28 @@ document.addEventListener('DOMContentLoaded', () => {
                 </div>
                 <button class="delete-art-btn" data-id="${art.id}" title="Excluir Arte"><i class="fas fa-trash-alt"></i></button>
             `;
-            galleryPreviewGrid.appendChild(artCard);
-        });
-        // Adiciona listeners para os botões de apagar
-        document.querySelectorAll('.delete-art-btn').forEach(button => {
-            button.addEventListener('click', async (e) => {
+            // Adiciona o listener do botão de apagar
+            artCard.querySelector('.delete-art-btn').addEventListener('click', async (e) => {
                 const artId = e.currentTarget.dataset.id;
                 if (confirm('Tem certeza que deseja excluir esta arte da galeria?')) {
                     await deleteArt(artId);
                 }
             });
+            galleryPreviewGrid.appendChild(artCard);
         });
+
+        if (nextCursor) {
+            const loadMoreBtn = document.createElement('button');
+            loadMoreBtn.type = 'button';
+            loadMoreBtn.className = 'btn btn-secondary load-more-gallery';
+            loadMoreBtn.style.gridColumn = '1 / -1';
+            loadMoreBtn.textContent = 'Carregar mais';
+            loadMoreBtn.addEventListener('click', () => {
+                loadMoreBtn.disabled = true;
+                loadGallery(true);
+            });
+            galleryPreviewGrid.appendChild(loadMoreBtn);
+        }
     }
 
     // Função para adicionar uma nova arte
@@ -2,31 +2,17 @@
 
 /**
  * Atualiza os cards de KPI na página do dashboard.
- * @param {Array} comissoes - A lista completa de comissões.
+ * @param {object} summary - O resumo de /admin/api/comissoes/summary.
  */
-function updateDashboardCards(comissoes) {
+function updateDashboardCards(summary) {
     const cardTotal = document.getElementById('card-total-comissoes');
     if (!cardTotal) return;
 
-    const totalComissoes = comissoes.length;
-    const emAndamento = comissoes.filter(c => c.status === 'in_progress').length;
-    const aguardandoAprovacao = comissoes.filter(c => c.status === 'waiting_approval').length;
-    
-    const hoje = new Date(); 
-    const mesAtual = hoje.getMonth();
-    const anoAtual = hoje.getFullYear();
-    
-    const receitaMensal = comissoes
-        .filter(c => {
-            const dataComissao = new Date(c.date + 'T00:00:00');
-            return c.status === 'completed' && dataComissao.getMonth() === mesAtual && dataComissao.getFullYear() === anoAtual;
-        })
-        .reduce((total, c) => total + c.price, 0);
-
-    cardTotal.textContent = totalComissoes;
-    document.getElementById('card-em-andamento').textContent = emAndamento; 
-    document.getElementById('card-aguardando-aprovacao').textContent = aguardandoAprovacao;
-    document.getElementById('card-receita-mensal').textContent = receitaMensal.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
+    const byStatus = summary.by_status || {};
+    cardTotal.textContent = summary.total || 0;
+    document.getElementById('card-em-andamento').textContent = byStatus.in_progress || 0;
+    document.getElementById('card-aguardando-aprovacao').textContent = byStatus.waiting_approval || 0;
+    document.getElementById('card-receita-mensal').textContent = (summary.monthly_revenue || 0).toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
 }
 
 /**
@@ -67,13 +53,16 @@ function renderActivityFeed(notifications) {
 /**
  * Renderiza a lista de notificações no dropdown da barra de navegação.
  * @param {Array} notifications - A lista de notificações.
+ * @param {?{before: number}} nextCursor - Cursor das notificações mais antigas, se houver.
+ * @param {boolean} append - Se verdadeiro, acrescenta ao fim da lista.
  */
-function renderNotifications(notifications) {
+function renderNotifications(notifications, nextCursor = null, append = false) {
     const notificationList = document.getElementById('notification-list');
     if (!notificationList) return;
-    notificationList.innerHTML = '';
+    notificationList.querySelector('.load-more-notifications')?.remove();
+    if (!append) notificationList.innerHTML = '';
     
-    if (notifications.length === 0) { 
+    if (notifications.length === 0 && !append) { 
         notificationList.innerHTML = '<div style="padding: 20px; text-align: center; color: var(--cor-texto-secundario);">Nenhuma notificação recente.</div>';
         return; 
     }
@@ -91,6 +80,20 @@ function renderNotifications(notifications) {
             </div>`;
         notificationList.appendChild(notifItem);
     }); 
+
+    if (nextCursor) {
+        const loadMore = document.createElement('a');
+        loadMore.href = "#";
+        loadMore.className = 'notification-item load-more-notifications';
+        loadMore.textContent = 'Ver notificações anteriores';
+        loadMore.addEventListener('click', async (event) => {
+            event.preventDefault();
+            event.stopPropagation();
+            const page = await fetchNotificationsPage(nextCursor.before);
+            renderNotifications(page.items, page.next_cursor, true);
+        });
+        notificationList.appendChild(loadMore);
+    }
 }
 
 /**
@@ -18,76 +18,88 @@ function getAdminStatusInfo(comissao) {
     };
 }
 
+/**
+ * Cria a linha (<tr>) de uma comissão, sem listeners.
+ * @param {object} comissao - A comissão (colunas de resumo).
+ * @returns {HTMLTableRowElement}
+ */
+function createComissaoRow(comissao) {
+    const precoFormatado = comissao.price.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
+    const dataFormatada = new Date(comissao.date + 'T00:00:00').toLocaleDateString('pt-BR');
+    const prazoFormatado = new Date(comissao.deadline + 'T00:00:00').toLocaleDateString('pt-BR');
+    const statusInfo = getAdminStatusInfo(comissao);
+
+    const row = document.createElement('tr');
+    row.dataset.id = comissao.id;
+    // ==========================================================
+    // INÍCIO DA MODIFICAÇÃO: Adição do botão de chat
+    // ==========================================================
+    row.innerHTML = `
+        <td>${comissao.id}</td>
+        <td>${comissao.client}</td>
+        <td>${comissao.type}</td>
+        <td>${dataFormatada}</td>
+        <td>${prazoFormatado}</td>
+        <td>${precoFormatado}</td>
+        <td><span class="status ${statusInfo.className}">${statusInfo.text}</span></td>
+        <td>
+            <div class="action-buttons">
+                <button class="btn btn-sm btn-light chat-trigger-btn" data-id="${comissao.id}" title="Abrir Chat Rápido">
+                    <i class="fas fa-comments"></i>
+                </button>
+                <button class="btn btn-sm btn-light view-btn" data-id="${comissao.id}" title="Ver Detalhes">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="btn btn-sm btn-light edit-btn" data-id="${comissao.id}" title="Editar Comissão">
+                    <i class="fas fa-edit"></i>
+                </button>
+                <button class="btn btn-sm btn-danger delete-btn" data-id="${comissao.id}" title="Excluir Comissão">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </td>
+    `;
+    // ========================================================
+    // FIM DA MODIFICAÇÃO
+    // ========================================================
+    return row;
+}
+
 /**
  * Renderiza a tabela de comissões.
  * @param {Array} comissoes - A lista de comissões a ser renderizada.
+ * @param {boolean} append - Se verdadeiro, acrescenta as linhas (próxima página) em vez de substituir.
  */
-function renderComissoesTable(comissoes) {
+function renderComissoesTable(comissoes, append = false) {
     const tableBody = document.getElementById('comissoes-table-body');
     if (!tableBody) return;
-    tableBody.innerHTML = '';
-    if (comissoes.length === 0) {
+    if (!append) tableBody.innerHTML = '';
+    if (comissoes.length === 0 && !append) {
         tableBody.innerHTML = '<tr><td colspan="8" style="text-align: center;">Nenhuma comissão encontrada.</td></tr>';
         return;
     }
 
-    comissoes.forEach(comissao => {
-        const precoFormatado = comissao.price.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
-        const dataFormatada = new Date(comissao.date + 'T00:00:00').toLocaleDateString('pt-BR');
-        const prazoFormatado = new Date(comissao.deadline + 'T00:00:00').toLocaleDateString('pt-BR');
-        const statusInfo = getAdminStatusInfo(comissao);
-
-        const row = document.createElement('tr');
-        // ==========================================================
-        // INÍCIO DA MODIFICAÇÃO: Adição do botão de chat
-        // ==========================================================
-        row.innerHTML = `
-            <td>${comissao.id}</td>
-            <td>${comissao.client}</td>
-            <td>${comissao.type}</td>
-            <td>${dataFormatada}</td>
-            <td>${prazoFormatado}</td>
-            <td>${precoFormatado}</td>
-            <td><span class="status ${statusInfo.className}">${statusInfo.text}</span></td>
-            <td>
-                <div class="action-buttons">
-                    <button class="btn btn-sm btn-light chat-trigger-btn" data-id="${comissao.id}" title="Abrir Chat Rápido">
-                        <i class="fas fa-comments"></i>
-                    </button>
-                    <button class="btn btn-sm btn-light view-btn" data-id="${comissao.id}" title="Ver Detalhes">
-                        <i class="fas fa-eye"></i>
-                    </button>
-                    <button class="btn btn-sm btn-light edit-btn" data-id="${comissao.id}" title="Editar Comissão">
-                        <i class="fas fa-edit"></i>
-                    </button>
-                    <button class="btn btn-sm btn-danger delete-btn" data-id="${comissao.id}" title="Excluir Comissão">
-                        <i class="fas fa-trash"></i>
-                    </button>
-                </div>
-            </td>
-        `;
-        // ========================================================
-        // FIM DA MODIFICAÇÃO
-        // ========================================================
-        tableBody.appendChild(row);
-    });
+    const fragment = document.createDocumentFragment();
+    comissoes.forEach(comissao => fragment.appendChild(createComissaoRow(comissao)));
 
-    addTableButtonListeners(comissoes);
+    // Listeners só nas linhas novas, para não duplicar nos botões das páginas anteriores.
+    addTableButtonListeners(fragment);
+    tableBody.appendChild(fragment);
 }
 
 /**
  * Adiciona os event listeners para os botões de ação na tabela de comissões.
- * @param {Array} comissoes - A lista de comissões (usada para referência).
+ * @param {ParentNode} root - Onde procurar os botões (as linhas recém-renderizadas).
  */
-function addTableButtonListeners(comissoes) {
-    document.querySelectorAll('.view-btn').forEach(button => {
+function addTableButtonListeners(root = document) {
+    root.querySelectorAll('.view-btn').forEach(button => {
         button.addEventListener('click', async (event) => {
             const comissaoId = event.currentTarget.getAttribute('data-id');
             const comissaoData = await fetchSingleComissao(comissaoId);
             if (comissaoData) renderModalDetails(comissaoData);
         });
     });
-    document.querySelectorAll('.delete-btn').forEach(button => {
+    root.querySelectorAll('.delete-btn').forEach(button => {
         button.addEventListener('click', async (event) => {
             const comissaoId = event.currentTarget.getAttribute('data-id');
             if (confirm(`Você tem certeza que deseja excluir a comissão #${comissaoId}?`)) {
@@ -101,7 +113,7 @@ function addTableButtonListeners(comissoes) {
             }
         });
     });
-    document.querySelectorAll('.edit-btn').forEach(button => {
+    root.querySelectorAll('.edit-btn').forEach(button => {
         button.addEventListener('click', async (event) => {
             const comissaoId = event.currentTarget.getAttribute('data-id');
             const comissaoData = await fetchSingleComissao(comissaoId);
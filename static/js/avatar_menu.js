@@ -111,11 +111,11 @@ document.addEventListener('DOMContentLoaded', () => {
                             document.removeEventListener('click', closeDropdown);
                         }
                     });
-                    if (typeof window.fetchAllClientNotifications === 'function') {
-                        const notifications = await window.fetchAllClientNotifications();
-                        window.renderClientNotifications(notifications);
-                        await window.markClientNotificationsAsRead();
-                        setTimeout(window.updateClientNotificationBadge, 1500);
+                    if (typeof window.fetchClientNotificationsPage === 'function') {
+                        const page = await window.fetchClientNotificationsPage();
+                        window.renderClientNotifications(page.items, page.next_cursor);
+                        const result = await window.markClientNotificationsAsRead();
+                        window.updateClientNotificationBadge(result.unread_count);
                     }
                 }
             };
@@ -41,11 +41,11 @@ document.addEventListener('DOMContentLoaded', () => {
         
         // Se for cliente, marca as notificações como lidas ao abrir o chat
         if (isClientPage && unreadNotifications.has(commissionId)) {
-            try {
-                await fetch(`/api/client/notifications/mark_read/commission/${commissionId}`, { method: 'POST' });
+            const result = await window.markClientCommissionsAsRead([commissionId]);
+            if (result.success) {
                 unreadNotifications.delete(commissionId);
                 updateChatIconBadge(commissionId, 0);
-            } catch (error) { console.error("Falha ao marcar notificações como lidas:", error); }
+            }
         }
         
         try {
@@ -206,23 +206,28 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // --- Inicialização e Socket.IO ---
 
+    // As contagens por comissão vêm prontas do servidor (GROUP BY), não da lista de notificações.
     const initializeUnreadCount = async () => {
         if (isClientPage) {
-            const notifications = await fetchAllClientNotifications();
-            notifications.forEach(n => {
-                if (!n.is_read && n.related_commission_id) {
-                    const count = (unreadNotifications.get(n.related_commission_id) || 0) + 1;
-                    unreadNotifications.set(n.related_commission_id, count);
-                }
+            const counts = await window.fetchClientUnreadByCommission();
+            // Zera os badges que sumiram desde a última contagem
+            unreadNotifications.forEach((count, commissionId) => {
+                if (!(commissionId in counts)) updateChatIconBadge(commissionId, 0);
             });
+            unreadNotifications = new Map(Object.entries(counts));
             // Atualiza os badges para os cards que já estão na tela
             unreadNotifications.forEach((count, commissionId) => {
                 updateChatIconBadge(commissionId, count);
             });
         }
     };
+
+    const totalUnread = () => Array.from(unreadNotifications.values()).reduce((sum, count) => sum + count, 0);
     
     const socket = window.io();
+    socket.on('commission_created', (data) => {
+        socket.emit('join_commission', { commission_id: data.commission_id });
+    });
     socket.on('commission_updated', async (data) => {
         if (!data.commission_id) return;
         
@@ -230,11 +235,9 @@ document.addEventListener('DOMContentLoaded', () => {
         if (widget.classList.contains('visible') && currentChatCommissionId === data.commission_id) {
             openChatWidget(data.commission_id);
         } 
-        // Se for cliente e o chat estiver fechado, atualiza o contador de mensagens não lidas
-        else if (isClientPage && data.message_for_client) {
-            const count = (unreadNotifications.get(data.commission_id) || 0) + 1;
-            unreadNotifications.set(data.commission_id, count);
-            updateChatIconBadge(data.commission_id, count);
+        // Se for cliente e o chat estiver fechado, recontagem só quando o total de não lidas mudou
+        else if (isClientPage && typeof data.unread_count === 'number' && data.unread_count !== totalUnread()) {
+            await initializeUnreadCount();
         }
     });
 
@@ -190,16 +190,58 @@ window.fetchClientUnreadCount = async function() {
 }
 
 /**
- * Busca todas as notificações para o cliente.
+ * Busca uma página de notificações do cliente (mais recentes primeiro).
+ * @param {number|null} before - O id da última notificação já exibida, para buscar as anteriores.
  */
-window.fetchAllClientNotifications = async function() {
+window.fetchClientNotificationsPage = async function(before = null) {
     try {
-        const response = await fetch('/api/client/notifications');
+        const query = before ? `?before=${encodeURIComponent(before)}` : '';
+        const response = await fetch(`/api/client/notifications${query}`);
         if (!response.ok) throw new Error('Erro ao buscar notificações');
         return await response.json();
     } catch (error) {
         console.error("Erro ao buscar todas as notificações:", error);
-        return [];
+        return { items: [], has_more: false, next_cursor: null };
+    }
+}
+
+/**
+ * Busca as notificações mais recentes do cliente.
+ */
+window.fetchAllClientNotifications = async function() {
+    return (await window.fetchClientNotificationsPage()).items;
+}
+
+/**
+ * Busca as notificações não lidas agrupadas por comissão ({commission_id: quantidade}).
+ */
+window.fetchClientUnreadByCommission = async function() {
+    try {
+        const response = await fetch('/api/client/notifications/unread_by_commission');
+        if (!response.ok) throw new Error('Erro ao buscar não lidas por comissão');
+        return await response.json();
+    } catch (error) {
+        console.error("Erro ao buscar não lidas por comissão:", error);
+        return {};
+    }
+}
+
+/**
+ * Marca como lidas, numa chamada só, as notificações de várias comissões.
+ * @param {Array<string>} commissionIds - Os ids das comissões.
+ */
+window.markClientCommissionsAsRead = async function(commissionIds) {
+    try {
+        const response = await fetch('/api/client/notifications/mark_read/commissions', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ commission_ids: commissionIds })
+        });
+        if (!response.ok) throw new Error('Erro ao marcar como lido');
+        return await response.json();
+    } catch (error) {
+        console.error("Erro ao marcar notificações das comissões como lidas:", error);
+        return { success: false };
     }
 }
 
@@ -1,14 +1,17 @@
 // --- Código Unificado e Otimizado: static/js/client/main.js ---
 
 /**
- * Busca a contagem de notificações não lidas do cliente e atualiza o badge.
+ * Atualiza o badge de notificações não lidas do cliente.
+ * @param {number} [count] - A contagem que veio no evento do Socket.IO; sem ela, busca na API.
  */
-window.updateClientNotificationBadge = async function() {
+window.updateClientNotificationBadge = async function(count) {
     try {
-        const data = await window.fetchClientUnreadCount();
+        if (typeof count !== 'number') {
+            count = (await window.fetchClientUnreadCount()).count;
+        }
         if (DOM.clientNotificationBadge) {
-            if (data.count > 0) {
-                DOM.clientNotificationBadge.textContent = data.count;
+            if (count > 0) {
+                DOM.clientNotificationBadge.textContent = count;
                 DOM.clientNotificationBadge.style.display = 'flex';
             } else {
                 DOM.clientNotificationBadge.style.display = 'none';
@@ -22,11 +25,14 @@ window.updateClientNotificationBadge = async function() {
 /**
  * Renderiza a lista de notificações no dropdown do cliente.
  * @param {Array} notifications - A lista de notificações.
+ * @param {?{before: number}} nextCursor - Cursor das notificações mais antigas, se houver.
+ * @param {boolean} append - Se verdadeiro, acrescenta ao fim da lista.
  */
-window.renderClientNotifications = function(notifications) {
+window.renderClientNotifications = function(notifications, nextCursor = null, append = false) {
     if (!DOM.clientNotificationList) return;
-    DOM.clientNotificationList.innerHTML = '';
-    if (notifications.length === 0) {
+    DOM.clientNotificationList.querySelector('.load-more-notifications')?.remove();
+    if (!append) DOM.clientNotificationList.innerHTML = '';
+    if (notifications.length === 0 && !append) {
         DOM.clientNotificationList.innerHTML = '<div style="padding: 20px; text-align: center; color: var(--cor-texto-secundario);">Nenhuma notificação recente.</div>';
         return;
     }
@@ -53,6 +59,20 @@ window.renderClientNotifications = function(notifications) {
             </div>`;
         DOM.clientNotificationList.appendChild(notifItem);
     });
+
+    if (nextCursor) {
+        const loadMore = document.createElement('a');
+        loadMore.href = "#";
+        loadMore.className = 'notification-item load-more-notifications';
+        loadMore.textContent = 'Ver notificações anteriores';
+        loadMore.addEventListener('click', async (e) => {
+            e.preventDefault();
+            e.stopPropagation();
+            const page = await window.fetchClientNotificationsPage(nextCursor.before);
+            window.renderClientNotifications(page.items, page.next_cursor, true);
+        });
+        DOM.clientNotificationList.appendChild(loadMore);
+    }
 }
 
 /**
@@ -63,6 +83,19 @@ function setupSocketIOListeners() {
     socket.on('connect', () => {
         console.log('Conectado ao servidor de tempo real (Painel do Cliente).');
     });
+    // Pedido novo (feito nesta ou em outra aba): entra na sala dele para receber as atualizações.
+    socket.on('commission_created', async (data) => {
+        socket.emit('join_commission', { commission_id: data.commission_id });
+        window.updateClientNotificationBadge(data.unread_count);
+        if (DOM.orderList) {
+            state.orders = await window.fetchOrders();
+            renderOrders();
+        }
+    });
+    // Notificações marcadas como lidas (nesta ou em outra aba).
+    socket.on('notifications_count', (data) => {
+        window.updateClientNotificationBadge(data.unread_count);
+    });
     socket.on('commission_updated', async (data) => {
         console.log('Evento de atualização de comissão recebido:', data);
 
@@ -70,7 +103,7 @@ function setupSocketIOListeners() {
             showNotification(data.message_for_client, 'info');
         }
 
-        window.updateClientNotificationBadge();
+        window.updateClientNotificationBadge(data.unread_count);
 
         if (DOM.orderList) {
             const updatedOrders = await window.fetchOrders();
@@ -119,86 +119,213 @@ function toggleTheme() {
     applyTheme(newTheme);
 }
 
+// Instância do Masonry da galeria pública (usada para encaixar as páginas carregadas no scroll).
+let galleryMasonry = null;
+
 /**
  * Inicializa a galeria com layout Masonry.
  */
 function initMasonryGallery() {
     const grid = document.querySelector('.gallery-grid');
     if (!grid) return;
-    imagesLoaded(grid, function() {
-        new Masonry(grid, {
-            itemSelector: '.art-card',
-            columnWidth: '.art-card',
-            gutter: 20,
-            percentPosition: true
-        });
+    galleryMasonry = new Masonry(grid, {
+        itemSelector: '.art-card',
+        columnWidth: '.art-card',
+        gutter: 20,
+        percentPosition: true
     });
+    imagesLoaded(grid, () => galleryMasonry.layout());
 }
 
 /**
- * Orquestra toda a funcionalidade do filtro NSFW.
+ * Escapa texto para ser inserido com segurança em HTML.
+ * @param {string} text - O texto a ser escapado.
+ * @returns {string}
  */
-function initializeNSFWFilter() {
-    const nsfwCards = document.querySelectorAll('.art-card[data-nsfw="true"]');
-    const ageGateModal = document.getElementById('nsfw-age-gate');
+function escapeHTML(text) {
+    const div = document.createElement('div');
+    div.textContent = text == null ? '' : String(text);
+    return div.innerHTML.replace(/"/g, '&quot;');
+}
 
-    if (nsfwCards.length === 0 || !ageGateModal) {
-        return; // Se não há conteúdo NSFW ou modal, não faz nada
+/**
+ * Gera os ícones sociais de um artista (mesma lógica do macro em index.html).
+ * @param {Array} socialLinks - Lista de {network, url}.
+ * @returns {string} HTML dos ícones.
+ */
+function renderSocialIcons(socialLinks) {
+    const iconFor = (network) => {
+        const n = (network || '').toLowerCase();
+        if (n.includes('instagram')) return 'fab fa-instagram';
+        if (n.includes('twitter')) return 'fab fa-twitter';
+        if (n.includes('artstation')) return 'fab fa-artstation';
+        if (n.includes('behance')) return 'fab fa-behance';
+        if (n.includes('facebook')) return 'fab fa-facebook';
+        if (n.includes('whatsapp')) return 'fab fa-whatsapp';
+        if (n.includes('telegram')) return 'fab fa-telegram';
+        if (n.includes('ko-fi') || n.includes('kofi')) return 'fas fa-coffee';
+        return 'fas fa-link';
+    };
+    const links = (socialLinks || []).map(link =>
+        `<a href="${escapeHTML(link.url)}" target="_blank" rel="noopener noreferrer" title="${escapeHTML(link.network)}"><i class="${iconFor(link.network)}"></i></a>`
+    ).join('');
+    return `<div class="social-icons">${links}</div>`;
+}
+
+/**
+ * Cria o card de uma arte vinda de /api/gallery, igual ao renderizado pelo servidor.
+ * @param {object} art - Item da página da galeria.
+ * @returns {HTMLElement}
+ */
+function createArtCard(art) {
+    const card = document.createElement('div');
+    card.className = 'art-card' + (art.is_nsfw ? ' nsfw-blur' : '');
+    card.dataset.imgSrc = art.image_url;
+    card.dataset.title = art.title;
+    card.dataset.description = art.description || '';
+    card.dataset.nsfw = art.is_nsfw ? 'true' : 'false';
+    if (art.lineart_artist_name) card.dataset.lineartArtist = art.lineart_artist_name;
+    if (art.color_artist_name) card.dataset.colorArtist = art.color_artist_name;
+
+    const description = art.description
+        ? `<p>${escapeHTML(art.description.length > 80 ? art.description.substring(0, 77) + '...' : art.description)}</p>`
+        : '';
+
+    let credits = '';
+    if (art.lineart_artist_id && art.lineart_artist_id === art.color_artist_id) {
+        credits = `<div class="artist-credit-line"><span>Arte e Cores por: <strong>${escapeHTML(art.lineart_artist_name)}</strong></span>${renderSocialIcons(art.lineart_artist_socials)}</div>`;
+    } else {
+        if (art.lineart_artist_name) {
+            credits += `<div class="artist-credit-line"><span>Arte por: <strong>${escapeHTML(art.lineart_artist_name)}</strong></span>${renderSocialIcons(art.lineart_artist_socials)}</div>`;
+        }
+        if (art.color_artist_name) {
+            credits += `<div class="artist-credit-line"><span>Cores por: <strong>${escapeHTML(art.color_artist_name)}</strong></span>${renderSocialIcons(art.color_artist_socials)}</div>`;
+        }
     }
 
-    const confirmBtn = document.getElementById('nsfw-confirm-btn');
-    const cancelBtn = document.getElementById('nsfw-cancel-btn');
-    const isVerified = sessionStorage.getItem('isAgeVerified') === 'true';
-
-    // Função para ativar os botões de toggle em cada card
-    const enableNSFWToggle = () => {
-        nsfwCards.forEach(card => {
-            const toggleBtn = card.querySelector('.nsfw-toggle-icon-btn');
-            
-            if (toggleBtn) {
-                const icon = toggleBtn.querySelector('i');
-                // Garante que o ícone inicial esteja correto
-                icon.className = card.classList.contains('revealed') ? 'fas fa-eye' : 'fas fa-eye-slash';
+    const nsfwHTML = art.is_nsfw ? `
+        <div class="nsfw-overlay">
+            <div class="nsfw-overlay-text">
+                <i class="fas fa-exclamation-triangle" style="font-size: 1.5rem; margin-bottom: 0.5rem;"></i>
+                <p>Conteúdo +18</p>
+            </div>
+        </div>
+        <button class="nsfw-toggle-icon-btn" aria-label="Revelar ou ocultar conteúdo">
+            <i class="fas fa-eye-slash"></i>
+        </button>` : '';
+
+    card.innerHTML = `
+        <img src="${escapeHTML(art.image_url)}" alt="${escapeHTML(art.title)}" referrerpolicy="no-referrer" loading="lazy"
+             onerror="this.onerror=null;this.src='https://placehold.co/400x300/ff0000/ffffff?text=Erro+ao+carregar';">
+        ${nsfwHTML}
+        <div class="art-card-info">
+            <h3>${escapeHTML(art.title)}</h3>
+            ${description}
+            ${credits ? `<div class="art-card-credits">${credits}</div>` : ''}
+        </div>`;
+    return card;
+}
 
-                toggleBtn.addEventListener('click', (e) => {
-                    e.stopPropagation(); // Impede que o clique no botão abra o viewer de imagem
-                    e.preventDefault();
-                    
-                    card.classList.toggle('revealed');
-                    // Alterna o ícone com base na classe 'revealed'
-                    icon.className = card.classList.contains('revealed') ? 'fas fa-eye' : 'fas fa-eye-slash';
-                });
+/**
+ * Carrega as próximas páginas da galeria (/api/gallery) quando o fim da grade aparece na tela.
+ */
+function initInfiniteGallery() {
+    const grid = document.querySelector('.gallery-grid');
+    const sentinel = document.getElementById('gallery-sentinel');
+    if (!grid || !sentinel || !('IntersectionObserver' in window)) return;
+
+    let nextCursor = grid.dataset.nextCursor;
+    let loading = false;
+
+    const observer = new IntersectionObserver(async (entries) => {
+        if (!entries.some(entry => entry.isIntersecting) || loading || !nextCursor) return;
+        loading = true;
+        try {
+            const response = await fetch(`/api/gallery?cursor=${encodeURIComponent(nextCursor)}`);
+            if (!response.ok) throw new Error('Falha ao carregar mais artes');
+            const page = await response.json();
+
+            const cards = page.items.map(createArtCard);
+            cards.forEach(card => grid.appendChild(card));
+            if (galleryMasonry) {
+                galleryMasonry.appended(cards);
+                imagesLoaded(cards, () => galleryMasonry.layout());
             }
-        });
-    };
+            bindNSFWCards(cards);
 
-    // Função para lidar com a necessidade de verificação
-    const promptForAgeVerification = () => {
-        // Mostra o modal ao clicar em qualquer card NSFW
-        nsfwCards.forEach(card => {
-            card.addEventListener('click', (e) => {
-                // Se a idade ainda não foi verificada, mostra o modal em vez de abrir o viewer
-                if (sessionStorage.getItem('isAgeVerified') !== 'true') {
-                    e.stopPropagation();
-                    e.preventDefault();
-                    ageGateModal.style.display = 'flex';
-                }
-            }, true); // Usa captura para impedir o viewer de abrir
-        });
-    };
+            nextCursor = page.next_cursor;
+            if (!nextCursor) {
+                observer.disconnect();
+                sentinel.remove();
+            }
+        } catch (error) {
+            console.error('Erro ao carregar a galeria:', error);
+        } finally {
+            loading = false;
+        }
+    }, { rootMargin: '600px 0px' });
 
-    // Lógica principal
-    if (isVerified) {
-        enableNSFWToggle();
-    } else {
-        promptForAgeVerification();
+    observer.observe(sentinel);
+}
+
+/**
+ * Liga o filtro NSFW (aviso de idade + botão de revelar) a um conjunto de cards.
+ * Pode ser chamada de novo para cards adicionados depois (scroll infinito).
+ * @param {Iterable<HTMLElement>} cards - Os cards da galeria.
+ */
+function bindNSFWCards(cards) {
+    const ageGateModal = document.getElementById('nsfw-age-gate');
+    if (!ageGateModal) return;
+
+    Array.from(cards).forEach(card => {
+        if (card.dataset.nsfw !== 'true' || card.dataset.nsfwBound === 'true') return;
+        card.dataset.nsfwBound = 'true';
+
+        // Se a idade ainda não foi verificada, mostra o modal em vez de abrir o viewer
+        card.addEventListener('click', (e) => {
+            if (sessionStorage.getItem('isAgeVerified') !== 'true') {
+                e.stopPropagation();
+                e.preventDefault();
+                ageGateModal.style.display = 'flex';
+            }
+        }, true); // Usa captura para impedir o viewer de abrir
+
+        const toggleBtn = card.querySelector('.nsfw-toggle-icon-btn');
+        if (toggleBtn) {
+            const icon = toggleBtn.querySelector('i');
+            // Garante que o ícone inicial esteja correto
+            icon.className = card.classList.contains('revealed') ? 'fas fa-eye' : 'fas fa-eye-slash';
+
+            toggleBtn.addEventListener('click', (e) => {
+                e.stopPropagation(); // Impede que o clique no botão abra o viewer de imagem
+                e.preventDefault();
+
+                card.classList.toggle('revealed');
+                // Alterna o ícone com base na classe 'revealed'
+                icon.className = card.classList.contains('revealed') ? 'fas fa-eye' : 'fas fa-eye-slash';
+            });
+        }
+    });
+}
+
+/**
+ * Orquestra toda a funcionalidade do filtro NSFW.
+ */
+function initializeNSFWFilter() {
+    const ageGateModal = document.getElementById('nsfw-age-gate');
+    if (!ageGateModal) {
+        return; // Sem o modal não há o que fazer
     }
 
+    const confirmBtn = document.getElementById('nsfw-confirm-btn');
+    const cancelBtn = document.getElementById('nsfw-cancel-btn');
+
+    bindNSFWCards(document.querySelectorAll('.art-card[data-nsfw="true"]'));
+
     // Listeners do modal
     confirmBtn.addEventListener('click', () => {
         sessionStorage.setItem('isAgeVerified', 'true');
         ageGateModal.style.display = 'none';
-        enableNSFWToggle();
     });
 
     cancelBtn.addEventListener('click', () => {
@@ -256,6 +383,9 @@ document.addEventListener('DOMContentLoaded', async () => {
     // --- INICIALIZAÇÃO DO FILTRO NSFW ---
     initializeNSFWFilter();
 
+    // --- SCROLL INFINITO DA GALERIA ---
+    initInfiniteGallery();
+
     // INÍCIO DA MODIFICAÇÃO: Lógica para abrir e fechar os modais
     document.querySelectorAll('[data-modal-target]').forEach(trigger => {
         trigger.addEventListener('click', (e) => {